@@ -0,0 +1,54 @@
+"""
+Helpers voor set-based schrijfacties (Core i.p.v. ORM-objecten per rij).
+"""
+from __future__ import annotations
+
+from itertools import islice
+from typing import Iterable, Iterator, Sequence, TypeVar
+
+from sqlalchemy import Table, insert
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+# ruim onder de parameterlimieten van SQLite (32766) en Postgres (65535)
+IN_CHUNK = 5000
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def dialect_name(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def insert_stmt(db: Session, table: Table):
+    """Dialect-specifieke insert, zodat on_conflict_do_nothing beschikbaar is."""
+    name = dialect_name(db)
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+        return pg_insert(table)
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+    return insert(table)
+
+
+def insert_ignore(db: Session, table: Table, rows: Sequence[dict], index_elements: Sequence[str]) -> None:
+    """Bulk-insert (executemany); rijen die botsen op `index_elements` worden overgeslagen."""
+    if not rows:
+        return
+    stmt = insert_stmt(db, table)
+    if hasattr(stmt, "on_conflict_do_nothing"):
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    db.execute(stmt, list(rows))
+
+
+def ignore_conflicts(db: Session, stmt, index_elements: Sequence[str]):
+    """Zelfde conflict-gedrag voor een INSERT ... SELECT gebouwd met `insert_stmt`."""
+    if hasattr(stmt, "on_conflict_do_nothing"):
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    return stmt
@@ -0,0 +1,165 @@
+"""
+In-memory prefix-index voor company-autocomplete, per organisatie.
+
+Per org en per veld een gesorteerde lijst (term, company_id) met bisect: de
+naam, sector en e-maildomein als geheel én per woord ("Zorggroep Noord" is
+te vinden op "zorg" en op "noo"). Elk veld heeft een eigen lijst en een
+eigen scanbudget, zodat een veelvoorkomend sector-prefix de naam-matches
+niet verdringt. Een index wordt pas geladen bij de eerste
+suggest voor die org en daarna bijgehouden door de company-endpoints.
+Over orgs heen begrensd met een LRU; een index ouder dan de TTL wordt
+opnieuw geladen, zodat wijzigingen uit andere workers/processen doorkomen.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.metrics import cache_result
+
+FIELDS = ("name", "sector", "email_domain")
+_WORD = re.compile(r"[\w-]+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class Entry:
+    id: int
+    name: str
+    sector: Optional[str]
+    email_domain: Optional[str]
+
+
+def _terms(entry: Entry) -> set[tuple[str, int]]:
+    """(term, veld-index) voor alle prefix-ingangen van een company."""
+    out: set[tuple[str, int]] = set()
+    for i, field in enumerate(FIELDS):
+        value = getattr(entry, field)
+        if not value:
+            continue
+        value = value.lower()
+        out.add((value, i))
+        for word in _WORD.findall(value):
+            out.add((word, i))
+    return out
+
+
+class OrgIndex:
+    def __init__(self, entries: list[Entry]):
+        self.loaded_at = time.monotonic()
+        self.entries: dict[int, Entry] = {e.id: e for e in entries}
+        # per veld (FIELDS-volgorde) een gesorteerde lijst (term, company_id)
+        self.keys: list[list[tuple[str, int]]] = [[] for _ in FIELDS]
+        for e in entries:
+            for term, field in _terms(e):
+                self.keys[field].append((term, e.id))
+        for keys in self.keys:
+            keys.sort()
+
+    def upsert(self, entry: Entry) -> None:
+        self.remove(entry.id)
+        self.entries[entry.id] = entry
+        for term, field in _terms(entry):
+            insort(self.keys[field], (term, entry.id))
+
+    def remove(self, company_id: int) -> None:
+        old = self.entries.pop(company_id, None)
+        if old is None:
+            return
+        for term, field in _terms(old):
+            keys = self.keys[field]
+            i = bisect_left(keys, (term, company_id))
+            if i < len(keys) and keys[i] == (term, company_id):
+                del keys[i]
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[Entry, str]]:
+        """Max. `limit` companies waarvan een term met `prefix` begint; naam-matches eerst."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        best: dict[int, int] = {}
+        for field, keys in enumerate(self.keys):
+            if len(best) >= limit:
+                break  # genoeg matches op een belangrijker veld
+            i = bisect_left(keys, (prefix,))
+            # ruim verzamelen: dezelfde company kan via meerdere woorden matchen
+            budget = limit * 8
+            while i < len(keys) and budget:
+                term, cid = keys[i]
+                if not term.startswith(prefix):
+                    break
+                best.setdefault(cid, field)
+                i += 1
+                budget -= 1
+        ranked = sorted(best.items(), key=lambda kv: (kv[1], self.entries[kv[0]].name.lower()))
+        return [(self.entries[cid], FIELDS[field]) for cid, field in ranked[:limit]]
+
+
+class CompanyIndex:
+    def __init__(self, max_orgs: int, ttl_seconds: float):
+        self.max_orgs = max_orgs
+        self.ttl_seconds = ttl_seconds
+        self._orgs: OrderedDict[int, OrgIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, org_id: int) -> OrgIndex:
+        with self._lock:
+            idx = self._orgs.get(org_id)
+            if idx is not None and time.monotonic() - idx.loaded_at < self.ttl_seconds:
+                self._orgs.move_to_end(org_id)
+                cache_result("company_index", True)
+                return idx
+        cache_result("company_index", False)
+        idx = OrgIndex(self._load(db, org_id))
+        with self._lock:
+            self._orgs[org_id] = idx
+            self._orgs.move_to_end(org_id)
+            while len(self._orgs) > self.max_orgs:
+                self._orgs.popitem(last=False)
+        return idx
+
+    def suggest(self, db: Session, org_id: int, prefix: str, limit: int) -> list[tuple[Entry, str]]:
+        idx = self.get(db, org_id)
+        with self._lock:
+            return idx.suggest(prefix, limit)
+
+    @staticmethod
+    def _load(db: Session, org_id: int) -> list[Entry]:
+        C = models.Company
+        rows = db.execute(
+            select(C.id, C.name, C.sector, C.email_domain).where(C.org_id == org_id)
+        ).all()
+        return [Entry(*row) for row in rows]
+
+    # Alleen al geladen orgs bijwerken; een niet-geladen org laadt later vers.
+    def upsert(self, company: models.Company) -> None:
+        entry = Entry(company.id, company.name, company.sector, company.email_domain)
+        with self._lock:
+            idx = self._orgs.get(company.org_id)
+            if idx is not None:
+                idx.upsert(entry)
+
+    def remove(self, org_id: int, company_id: int) -> None:
+        with self._lock:
+            idx = self._orgs.get(org_id)
+            if idx is not None:
+                idx.remove(company_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._orgs.clear()
+
+
+company_index = CompanyIndex(
+    max_orgs=settings.COMPANY_INDEX_MAX_ORGS,
+    ttl_seconds=settings.COMPANY_INDEX_TTL_SECONDS,
+)
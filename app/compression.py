@@ -0,0 +1,193 @@
+"""
+Response-compressie (gzip, brotli als het pakket er is) als ASGI-middleware.
+
+- Onderhandeling via Accept-Encoding (q-waarden, `*`); brotli gaat voor gzip.
+- Kleine bodies (< COMPRESSION_MIN_SIZE) gaan ongecomprimeerd: de winst is
+  dan kleiner dan de CPU en de headers.
+- Streaming responses (exports) worden per chunk gecomprimeerd met een sync
+  flush, zodat de client elke chunk direct kan uitpakken.
+- Al gecodeerde responses (Content-Encoding gezet, bv. uit de response-cache)
+  en niet-comprimeerbare types (Parquet, SSE) gaan ongewijzigd door.
+"""
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optionele dependency
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+
+_COMPRESSIBLE = {
+    "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+}
+
+
+def supported_encodings() -> list[str]:
+    return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Beste encoding die de client accepteert en wij kunnen maken, of None (identity)."""
+    q: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        q[name.strip()] = weight
+    best, best_q = None, 0.0
+    for enc in supported_encodings():
+        weight = q.get(enc, q.get("*", 0.0))
+        if weight > best_q:
+            best, best_q = enc, weight
+    return best
+
+
+def compressible(media_type: str) -> bool:
+    media_type = media_type.split(";", 1)[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False  # SSE: elk event moet direct en ongebufferd door
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE or media_type.endswith("+json")
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """Eenmalig comprimeren; `best` voor de cache (hoogste niveau, één keer betaald)."""
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=11 if best else settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=9 if best else settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _Stream:
+    """Incrementele compressor: chunk in, direct uitpakbare bytes uit."""
+
+    def __init__(self, encoding: str):
+        if encoding == BROTLI:
+            self._c = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._c = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.encoding = encoding
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            return self._c.process(data) + self._c.flush()
+        return self._c.compress(data) + self._c.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._c.finish()
+        return self._c.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _Responder(send, encoding, self.minimum_size).send)
+
+
+class _Responder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.stream: Optional[_Stream] = None
+        self.passthrough = False
+
+    def _wants_compression(self, headers: MutableHeaders) -> bool:
+        status = self.start["status"]
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        return compressible(headers.get("content-type", ""))
+
+    def _encoded_headers(self, headers: MutableHeaders, length: Optional[int]) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(length)
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            self.start = message
+            return
+        if self.stream is not None:
+            # al aan het streamen
+            body = self.stream.chunk(message.get("body", b""))
+            more = message.get("more_body", False)
+            if not more:
+                body += self.stream.finish()
+            await self._send({"type": "http.response.body", "body": body, "more_body": more})
+            return
+        if self.passthrough or self.start is None:
+            await self._send(message)
+            return
+        if kind != "http.response.body":
+            # bv. pathsend: niet aan te passen, ongewijzigd doorgeven
+            await self._flush_start(passthrough=True)
+            await self._send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+        if not self._wants_compression(headers):
+            await self._flush_start(passthrough=True)
+            await self._send(message)
+            return
+
+        if not more:
+            # hele body in één keer: drempel op de echte grootte
+            if len(body) < self.minimum_size:
+                await self._flush_start(passthrough=True)
+                await self._send(message)
+                return
+            data = compress(body, self.encoding)
+            self._encoded_headers(headers, len(data))
+            await self._flush_start()
+            await self._send({"type": "http.response.body", "body": data})
+            return
+
+        length = headers.get("content-length")
+        if length is not None and int(length) < self.minimum_size:
+            await self._flush_start(passthrough=True)
+            await self._send(message)
+            return
+        self.stream = _Stream(self.encoding)
+        self._encoded_headers(headers, None)
+        await self._flush_start()
+        await self._send({"type": "http.response.body", "body": self.stream.chunk(body), "more_body": True})
+
+    async def _flush_start(self, passthrough: bool = False) -> None:
+        self.passthrough = passthrough
+        start, self.start = self.start, None
+        await self._send(start)
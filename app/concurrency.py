@@ -0,0 +1,198 @@
+"""
+Adaptieve concurrency-limiet met load shedding (ASGI-middleware).
+
+Zonder limiet lopen requests bij een trage DB op in de threadpool tot alles
+tegelijk timet. Deze middleware laat hooguit `limit` requests tegelijk door
+en geeft de rest direct een 503 met Retry-After, in plaats van ze te laten
+wachten.
+
+De limiet past zich aan (AIMD) op de latency tot de eerste response-byte:
+
+- boven CONCURRENCY_TARGET_LATENCY_MS (of een 5xx): limit *= BACKOFF,
+  hooguit één keer per cooldown, zodat één trage golf niet tot het minimum zakt
+- anders, als de limiet echt benut werd: limit += 1 / limit, dus ongeveer
+  +1 per `limit` geslaagde requests
+- anders (weinig verkeer) groeit een verlaagde limiet op dezelfde manier
+  terug naar CONCURRENCY_INITIAL_LIMIT; zonder dat bleef hij na één trage
+  golf voorgoed laag, want licht verkeer benut de limiet nooit
+
+Prioriteitsklassen bepalen welk deel van de limiet een request mag gebruiken:
+
+  critical  login en voortgang schrijven (POST /progress/)   100%
+  normal    de rest                                           CONCURRENCY_NORMAL_SHARE
+  low       stats en exports                                  CONCURRENCY_LOW_SHARE
+
+Low-requests tellen wel mee in in-flight, maar hun latency stuurt de limiet
+niet: een export is van zichzelf traag. Hetzelfde geldt voor routes die
+traag zijn door ontwerp (login = bcrypt, user-import, enroll, xAPI-batches);
+anders zou elke loginpiek de capaciteit voor iedereen verlagen.
+
+Niet begrensd: /health, /ready, /metrics en de live feed (SSE-verbindingen
+blijven lang open en zouden anders slots bezetten).
+
+Alles draait op de event loop-thread, dus zonder locks.
+"""
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.metrics import Counter, Gauge
+
+CRITICAL, NORMAL, LOW = "critical", "normal", "low"
+
+_EXEMPT_PATHS = {"/health", "/ready", "/metrics"}
+_LIVE = re.compile(r"^/organizations/[^/]+/live(/|$)")
+_LOW = re.compile(r"^/organizations/[^/]+/(stats|exports)(/|$)")
+# POST-routes die traag zijn door ontwerp: tellen mee in in-flight, sturen de limiet niet
+_SLOW_BY_DESIGN = re.compile(
+    r"^(/auth/(login|register)"
+    r"|/users/import"
+    r"|/organizations/[^/]+/trainings/[^/]+/enroll(/audience)?"
+    r"|/organizations/[^/]+/xapi/statements)/?$"
+)
+
+CONCURRENCY_LIMIT = Gauge("concurrency_limit", "Huidige adaptieve concurrency-limiet.")
+CONCURRENCY_IN_FLIGHT = Gauge("concurrency_in_flight", "Begrensde requests die nu in behandeling zijn.")
+REQUESTS_SHED = Counter("requests_shed_total", "Met 503 geweigerde requests per prioriteitsklasse.", ("priority",))
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Prioriteitsklasse, of None als de request buiten de limiet valt."""
+    if path in _EXEMPT_PATHS or _LIVE.match(path):
+        return None
+    if method == "POST" and (path == "/auth/login" or path in ("/progress", "/progress/")):
+        return CRITICAL
+    if _LOW.match(path):
+        return LOW
+    return NORMAL
+
+
+def steers_limit(method: str, path: str, priority: str) -> bool:
+    """Mag de latency van deze request de limiet bijsturen?"""
+    if priority == LOW:
+        return False
+    return not (method == "POST" and _SLOW_BY_DESIGN.match(path))
+
+
+class AIMDLimiter:
+    def __init__(
+        self,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        target_latency: float,
+        backoff: float,
+        cooldown: float,
+    ):
+        self.initial = float(initial)
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self.shares = {CRITICAL: 1.0, NORMAL: settings.CONCURRENCY_NORMAL_SHARE, LOW: settings.CONCURRENCY_LOW_SHARE}
+
+    def try_acquire(self, priority: str) -> bool:
+        # altijd minstens één request per klasse, ook bij een heel lage limiet
+        if self.in_flight >= max(1.0, self.limit * self.shares[priority]):
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+    def on_sample(self, latency: float, overloaded: bool, in_flight: int) -> None:
+        now = time.monotonic()
+        if overloaded or latency > self.target_latency:
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._last_decrease = now
+        elif in_flight >= self.limit / 2:
+            # boven de beginwaarde alleen groeien als de limiet benut werd
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        elif self.limit < self.initial:
+            # onderbenut en snel: terugdrijven naar de beginwaarde
+            self.limit = min(self.initial, self.limit + 1.0 / self.limit)
+
+
+limiter = AIMDLimiter(
+    initial=settings.CONCURRENCY_INITIAL_LIMIT,
+    minimum=settings.CONCURRENCY_MIN_LIMIT,
+    maximum=settings.CONCURRENCY_MAX_LIMIT,
+    target_latency=settings.CONCURRENCY_TARGET_LATENCY_MS / 1000,
+    backoff=settings.CONCURRENCY_BACKOFF,
+    cooldown=settings.CONCURRENCY_COOLDOWN_MS / 1000,
+)
+
+CONCURRENCY_LIMIT.set_function(lambda: limiter.limit)
+CONCURRENCY_IN_FLIGHT.set_function(lambda: limiter.in_flight)
+
+_SHED_BODY = json.dumps({"detail": "Server is overbelast, probeer het later opnieuw"}).encode()
+
+
+class ConcurrencyLimitMiddleware:
+    def __init__(self, app: ASGIApp, limiter: AIMDLimiter = limiter):
+        self.app = app
+        self.limiter = limiter
+        self._shed = {p: REQUESTS_SHED.labels(p) for p in (CRITICAL, NORMAL, LOW)}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = classify(scope["method"], scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire(priority):
+            self._shed[priority].inc()
+            await _reject(send)
+            return
+
+        in_flight = self.limiter.in_flight
+        steer = steers_limit(scope["method"], scope["path"], priority)
+        start = time.perf_counter()
+        sampled = False
+
+        def sample(status: int) -> None:
+            nonlocal sampled
+            if not sampled:
+                sampled = True
+                if steer:
+                    self.limiter.on_sample(time.perf_counter() - start, status >= 500, in_flight)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                sample(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            sample(500)
+            raise
+        finally:
+            self.limiter.release()
+
+
+async def _reject(send: Send) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(_SHED_BODY)).encode()),
+            (b"retry-after", str(settings.CONCURRENCY_RETRY_AFTER_SECONDS).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": _SHED_BODY})
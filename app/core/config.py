@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +11,98 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./sql_app.db"
     APP_VERSION: str = "0.1.0"
 
+    # Live voortgangsfeed (SSE)
+    LIVE_BACKEND: str = "local"               # local | broker
+    LIVE_BROKER_ADDR: str = "127.0.0.1:7655"  # scripts/live_broker.py
+    LIVE_QUEUE_SIZE: int = 256                # per abonnee; vol = loskoppelen
+    LIVE_HEARTBEAT_SECONDS: float = 15.0
+
+    # xAPI-ingest
+    XAPI_WORKER_ENABLED: bool = True
+    XAPI_MAX_BATCH: int = 5000        # statements per POST
+    XAPI_BATCH_SIZE: int = 5000       # staging-rijen per worker-transactie
+    XAPI_MAX_BACKLOG: int = 200_000   # daarboven 503 + Retry-After
+
+    # Achtergrondjobs
+    JOB_WORKERS: int = 2
+    JOB_HEARTBEAT_SECONDS: float = 10.0
+    JOB_STALE_SECONDS: float = 60.0     # RUNNING zonder heartbeat sindsdien = eigenaar dood
+    ENROLL_ASYNC_THRESHOLD: int = 5000  # meer e-mails -> 202 + job
+
+    # Paginatie
+    PAGINATION_COUNT_CAP: int = 10_000  # include_total telt niet verder dan dit (niet-Postgres)
+
+    # Company-autocomplete (in-memory index per org)
+    COMPANY_INDEX_MAX_ORGS: int = 256
+    COMPANY_INDEX_TTL_SECONDS: float = 300.0  # daarna herladen (wijzigingen uit andere workers)
+
+    # User-import (POST /users/import)
+    IMPORT_BATCH_SIZE: int = 1000     # rijen per transactie
+    IMPORT_MAX_ROWS: int = 100_000
+    IMPORT_HASH_WORKERS: int = 0      # 0 = aantal CPU's
+    IMPORT_ERROR_LIMIT: int = 1000    # max. foutregels in het rapport
+
+    # Compliance-export
+    EXPORT_DIR: str = "./exports"             # bestanden van export-jobs
+    EXPORT_FETCH_SIZE: int = 2000             # rijen per cursor-partitie
+    EXPORT_ASYNC_THRESHOLD: int = 500_000     # (geschatte) rijen; daarboven als job
+
+    # Compressie + response-cache
+    COMPRESSION_MIN_SIZE: int = 1024          # bytes; kleiner gaat ongecomprimeerd
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4       # alleen als het brotli-pakket er is
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    STATS_CACHE_TTL_SECONDS: float = 30.0
+    CATALOG_CACHE_TTL_SECONDS: float = 3600.0  # trainingslijst; writes bumpen catalog_version, TTL ruimt alleen op
+
+    # Metrics (GET /metrics)
+    METRICS_TOKEN: Optional[str] = None  # gezet: scraper moet Bearer-token meesturen
+
+    # Profileren van één request (header X-Profile: 1, alleen ADMIN/OWNER)
+    PROFILING_ENABLED: bool = False
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_DIR: str = "./profiles"
+    PROFILE_MAX_FILES: int = 200  # oudste .folded-bestanden in PROFILE_DIR gaan weg
+    PROFILE_SAMPLE_INTERVAL_MS: float = 1.0
+
+    # tracing (app/tracing.py): OTLP-JSON per gesamplede request
+    TRACING_ENABLED: bool = False
+    TRACE_SAMPLE_RATE: float = 0.01  # fractie van de requests; een binnenkomende traceparent telt altijd
+    TRACE_EXPORT: str = "stdout"  # "stdout" of een pad (JSON lines)
+    TRACE_EXPORT_QUEUE: int = 10_000  # traces die op de schrijfthread wachten; vol = weggooien
+
+    # Readiness (GET /ready): daarboven 503, zodat de load balancer verkeer wegstuurt
+    READY_LAG_INTERVAL_MS: float = 500.0      # meetinterval loop-/threadpool-lag
+    READY_DB_TIMEOUT_MS: float = 1000.0
+    READY_MAX_DB_LATENCY_MS: float = 250.0
+    READY_MAX_POOL_UTILISATION: float = 0.9   # uitgeleend / (pool_size + max_overflow)
+    READY_MAX_LOOP_LAG_MS: float = 200.0
+    READY_MAX_THREADPOOL_LAG_MS: float = 500.0
+
+    # Adaptieve concurrency-limiet (app/concurrency.py): teveel = direct 503 + Retry-After
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 4
+    CONCURRENCY_MAX_LIMIT: int = 64
+    CONCURRENCY_TARGET_LATENCY_MS: float = 250.0  # tot de eerste response-byte
+    CONCURRENCY_BACKOFF: float = 0.8              # limit *= backoff bij overschrijding
+    CONCURRENCY_COOLDOWN_MS: float = 500.0        # minimaal tussen twee verlagingen
+    CONCURRENCY_NORMAL_SHARE: float = 0.9         # deel van de limiet voor gewone requests
+    CONCURRENCY_LOW_SHARE: float = 0.5            # stats en exports
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 1
+
+    # Login-throttling (app/throttle.py): token buckets vóór de bcrypt-verificatie
+    THROTTLE_BACKEND: str = "memory"              # memory | sqlite (gedeeld door workers op één machine)
+    THROTTLE_SQLITE_PATH: str = "./throttle.db"
+    THROTTLE_MAX_BUCKETS: int = 100_000           # memory: LRU-grens
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10.0
+    LOGIN_ACCOUNT_BURST: int = 5
+    LOGIN_ACCOUNT_PER_MINUTE: float = 1.0
+    # alleen van deze peers (komma-gescheiden IP's/CIDR's, bv. de load balancer)
+    # wordt X-Forwarded-For geloofd; leeg = altijd het directe peer-adres
+    TRUSTED_PROXIES: str = ""
+
     class Config:
         env_file = ".env"
 
@@ -1,5 +1,5 @@
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
 from pathlib import Path
@@ -15,6 +15,13 @@ def _prepare_sqlite(url: str) -> tuple[str, dict]:
 if settings.DATABASE_URL.startswith("sqlite"):
     db_url, connect_args = _prepare_sqlite(settings.DATABASE_URL)
     engine = create_engine(db_url, connect_args=connect_args, echo=False, future=True)
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_wal(dbapi_conn, _record):
+        # WAL: een lange leescursor (bv. een export) blokkeert schrijvers niet en omgekeerd
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.close()
 else:
     
     engine = create_engine(settings.DATABASE_URL, echo=False, pool_pre_ping=True, future=True)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.security import decode_token
 from app.database import get_db          
 from app import models
+from app.tracing import span
 from typing import Union 
 
 
@@ -22,7 +23,8 @@ def get_current_user(
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.get(models.User, int(payload["sub"]))
+    with span("auth.load_user"):
+        user = db.get(models.User, int(payload["sub"]))
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive or unknown user")
 
@@ -31,7 +33,8 @@ def get_current_user(
 
 
 def get_org_id(slug: str, db: Session = Depends(get_db)) -> int:
-    org = db.query(models.Organization).filter(models.Organization.slug == slug).first()
+    with span("org.lookup", **{"org.slug": slug}):
+        org = db.query(models.Organization).filter(models.Organization.slug == slug).first()
     if not org:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Organisatie niet gevonden")
     return org.id
@@ -50,7 +53,8 @@ def require_role(*allowed_roles: Union[models.Role, str], allow_owner: bool = Tr
         org_id: int = Depends(get_org_id),
         db: Session = Depends(get_db),
     ):
-        membership = db.query(models.Membership).filter_by(user_id=user.id, org_id=org_id).first()
+        with span("auth.membership"):
+            membership = db.query(models.Membership).filter_by(user_id=user.id, org_id=org_id).first()
         if not membership:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="User is not a member of this organization")
 
@@ -86,7 +90,8 @@ def require_min_role(min_role: Union[models.Role, str], allow_owner: bool = True
         org_id: int = Depends(get_org_id),
         db: Session = Depends(get_db),
     ):
-        membership = db.query(models.Membership).filter_by(user_id=user.id, org_id=org_id).first()
+        with span("auth.membership"):
+            membership = db.query(models.Membership).filter_by(user_id=user.id, org_id=org_id).first()
         if not membership:
             raise HTTPException(status_code=403, detail="User is not a member of this organization")
         role: models.Role = membership.role
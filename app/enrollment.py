@@ -0,0 +1,236 @@
+"""
+Set-based inschrijven van users op een training.
+
+Vaste hoeveelheid statements per aanroep (per IN_CHUNK e-mails), ongeacht
+hoeveel users of modules: één IN-lookup voor users, één voor bestaande
+enrollments, bulk-inserts met conflict-ignore en één query voor het resultaat.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import DateTime, Float, Integer, exists, func, literal, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.bulk import IN_CHUNK, chunked, ignore_conflicts, insert_ignore, insert_stmt
+from app.database import SessionLocal
+from app.jobs import JobContext, job_handler
+from app.realtime import queue_event
+
+JOB_CHUNK = 1000
+UNKNOWN_REPORT_LIMIT = 1000
+
+
+@dataclass
+class EnrollResult:
+    user_ids: list[int] = field(default_factory=list)
+    enrollments: list[models.Enrollment] = field(default_factory=list)
+    created: int = 0
+    already_enrolled: int = 0
+    unknown_emails: list[str] = field(default_factory=list)
+    duplicates: list[str] = field(default_factory=list)
+
+
+def dedupe_emails(emails: Iterable[str]) -> tuple[list[str], list[str]]:
+    """Unieke e-mails (volgorde behouden) + e-mails die vaker dan één keer voorkwamen."""
+    seen: dict[str, None] = {}
+    dupes: dict[str, None] = {}
+    for raw in emails:
+        email = raw.strip()
+        if not email:
+            continue
+        if email in seen:
+            dupes[email] = None
+        else:
+            seen[email] = None
+    return list(seen), list(dupes)
+
+
+def enroll_emails(
+    db: Session,
+    training: models.Training,
+    emails: Iterable[str],
+    due_at: Optional[datetime] = None,
+    assigned_by: Optional[int] = None,
+) -> EnrollResult:
+    """
+    Schrijft in zonder te committen; de aanroeper bepaalt de transactie.
+    Laad de enrollments ná de commit met `load_enrollments`, anders ververst
+    expire_on_commit ze één voor één.
+    """
+    result = EnrollResult()
+    unique, result.duplicates = dedupe_emails(emails)
+
+    user_ids: dict[str, int] = {}
+    for batch in chunked(unique, IN_CHUNK):
+        user_ids.update(db.execute(
+            select(models.User.email, models.User.id).where(models.User.email.in_(batch))
+        ).all())
+    result.unknown_emails = [e for e in unique if e not in user_ids]
+    result.user_ids = list(user_ids.values())
+
+    existing: set[int] = set()
+    for batch in chunked(user_ids.values(), IN_CHUNK):
+        existing.update(db.execute(
+            select(models.Enrollment.user_id)
+            .where(models.Enrollment.training_id == training.id, models.Enrollment.user_id.in_(batch))
+        ).scalars())
+    new_ids = [uid for uid in user_ids.values() if uid not in existing]
+    result.already_enrolled = len(existing)
+    result.created = len(new_ids)
+
+    if new_ids:
+        now = datetime.utcnow()
+        insert_ignore(db, models.Enrollment.__table__, [
+            {"user_id": uid, "training_id": training.id, "status": models.EnrollmentStatus.ASSIGNED,
+             "assigned_by": assigned_by, "assigned_at": now, "due_at": due_at}
+            for uid in new_ids
+        ], ["user_id", "training_id"])
+
+        module_ids = db.execute(
+            select(models.Module.id).where(models.Module.training_id == training.id)
+        ).scalars().all()
+        for batch in chunked(((uid, mid) for uid in new_ids for mid in module_ids), IN_CHUNK * 4):
+            insert_ignore(db, models.Progress.__table__, [
+                {"user_id": uid, "module_id": mid, "status": models.ProgressStatus.NOT_STARTED,
+                 "percent": 0.0, "last_event_at": now}
+                for uid, mid in batch
+            ], ["user_id", "module_id"])
+
+        queue_event(db, {"type": "enrollment_bulk", "org_id": training.org_id,
+                         "training_id": training.id, "count": len(new_ids)})
+
+    return result
+
+
+def load_enrollments(db: Session, result: EnrollResult, training_id: int) -> EnrollResult:
+    for batch in chunked(result.user_ids, IN_CHUNK):
+        result.enrollments.extend(db.execute(
+            select(models.Enrollment)
+            .where(models.Enrollment.training_id == training_id, models.Enrollment.user_id.in_(batch))
+            .order_by(models.Enrollment.id)
+        ).scalars())
+    return result
+
+
+@job_handler("enroll_users")
+def enroll_users_job(ctx: JobContext) -> dict:
+    """Grote enroll_users-payloads: per chunk een eigen transactie."""
+    p = ctx.params
+    due_at = datetime.fromisoformat(p["due_at"]) if p.get("due_at") else None
+    unique, duplicates = dedupe_emails(p["emails"])
+    ctx.set_total(len(unique))
+
+    created = already = 0
+    unknown: list[str] = []
+    for batch in ctx.chunks(unique, JOB_CHUNK):
+        with SessionLocal() as db:
+            training = db.get(models.Training, p["training_id"])
+            if training is None:
+                raise RuntimeError("Training bestaat niet meer")
+            r = enroll_emails(db, training, batch, due_at=due_at, assigned_by=p.get("assigned_by"))
+            db.commit()
+        created += r.created
+        already += r.already_enrolled
+        unknown.extend(r.unknown_emails)
+    return {
+        "created": created,
+        "already_enrolled": already,
+        "unknown_count": len(unknown),
+        "unknown_emails": unknown[:UNKNOWN_REPORT_LIMIT],
+        "duplicates": duplicates[:UNKNOWN_REPORT_LIMIT],
+    }
+
+
+# ─────────────────────────────────────────────
+#   Doelgroep (org / company / rol) volledig in de database
+# ─────────────────────────────────────────────
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def audience_query(org_id: int, role: Optional[models.Role] = None, email_domain: Optional[str] = None):
+    """SELECT user_id van actieve leden van de org, optioneel op rol en/of e-maildomein."""
+    M, U = models.Membership, models.User
+    q = (
+        select(M.user_id)
+        .join(U, U.id == M.user_id)
+        .where(M.org_id == org_id, U.is_active.is_(True))
+    )
+    if role is not None:
+        q = q.where(M.role == role)
+    if email_domain:
+        pattern = "%@" + _like_escape(email_domain.strip().lstrip("@").lower())
+        q = q.where(func.lower(U.email).like(pattern, escape="\\"))
+    return q
+
+
+def backfill_progress(
+    db: Session,
+    training_id: int,
+    now: Optional[datetime] = None,
+    module_id: Optional[int] = None,
+) -> int:
+    """
+    INSERT ... SELECT van ontbrekende Progress-rijen voor alle enrollees van
+    een training (of alleen voor `module_id`, bv. net toegevoegd).
+    """
+    E, P, Mod = models.Enrollment, models.Progress, models.Module
+    sel = (
+        select(
+            E.user_id,
+            Mod.id,
+            literal(models.ProgressStatus.NOT_STARTED, P.__table__.c.status.type),
+            literal(0.0, Float),
+            literal(now or datetime.utcnow(), DateTime),
+        )
+        .join(Mod, Mod.training_id == E.training_id)
+        .where(
+            E.training_id == training_id,
+            ~exists().where(P.user_id == E.user_id, P.module_id == Mod.id),
+        )
+    )
+    if module_id is not None:
+        sel = sel.where(Mod.id == module_id)
+    stmt = insert_stmt(db, P.__table__).from_select(
+        ["user_id", "module_id", "status", "percent", "last_event_at"], sel
+    )
+    return db.execute(ignore_conflicts(db, stmt, ["user_id", "module_id"])).rowcount
+
+
+def enroll_audience(
+    db: Session,
+    training: models.Training,
+    audience,
+    due_at: Optional[datetime] = None,
+    assigned_by: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    Schrijft een doelgroep in met INSERT ... SELECT; er worden geen users in
+    Python geladen. Geeft (nieuwe enrollments, nieuwe progress-rijen) terug.
+    """
+    E = models.Enrollment
+    now = datetime.utcnow()
+    uid = audience.selected_columns[0]
+    sel = audience.with_only_columns(
+        uid,
+        literal(training.id, Integer),
+        literal(models.EnrollmentStatus.ASSIGNED, E.__table__.c.status.type),
+        literal(assigned_by, Integer),
+        literal(now, DateTime),
+        literal(due_at, DateTime),
+        maintain_column_froms=True,
+    ).where(~exists().where(E.user_id == uid, E.training_id == training.id))
+    stmt = insert_stmt(db, E.__table__).from_select(
+        ["user_id", "training_id", "status", "assigned_by", "assigned_at", "due_at"], sel
+    )
+    enrolled = db.execute(ignore_conflicts(db, stmt, ["user_id", "training_id"])).rowcount
+    progress_rows = backfill_progress(db, training.id, now) if enrolled else 0
+
+    if enrolled:
+        queue_event(db, {"type": "enrollment_bulk", "org_id": training.org_id,
+                         "training_id": training.id, "count": enrolled})
+    return enrolled, progress_rows
@@ -0,0 +1,238 @@
+"""
+Compliance-export (NEN 7510): wie heeft welke module van welke training
+wanneer gedaan, als één platte tabel per organisatie.
+
+Rijen komen via een server-side cursor (stream_results + partities) rechtstreeks
+uit één Core-select; er worden geen ORM-objecten gemaakt en het geheugen
+blijft constant per partitie. Formaten: CSV (altijd) en Parquet (als
+pyarrow geïnstalleerd is). Grote orgs lopen als achtergrondjob die naar
+EXPORT_DIR schrijft; het bestand is op te halen via GET /jobs/{id}/download.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+from app.jobs import JobContext, job_handler
+
+CSV = "csv"
+PARQUET = "parquet"
+MEDIA_TYPES = {CSV: "text/csv; charset=utf-8", PARQUET: "application/vnd.apache.parquet"}
+
+COLUMNS = [
+    "user_id", "user_email", "user_name", "company",
+    "training_id", "training_title",
+    "enrollment_status", "assigned_at", "due_at", "enrollment_completed_at",
+    "module_id", "module_title", "module_order",
+    "status", "percent", "score", "started_at", "last_event_at", "completed_at",
+]
+
+
+class ExportUnavailable(Exception):
+    pass
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compliance_query(org_id: int, training_id: Optional[int] = None):
+    U, T, Mod, P, E = models.User, models.Training, models.Module, models.Progress, models.Enrollment
+    # "company" wordt in Python ingevuld (op e-maildomein), zie iter_row_batches
+    stmt = (
+        select(
+            U.id, U.email, U.name,
+            T.id, T.title,
+            E.status, E.assigned_at, E.due_at, E.completed_at,
+            Mod.id, Mod.title, Mod.order_index,
+            P.status, P.percent, P.score, P.started_at, P.last_event_at, P.completed_at,
+        )
+        .select_from(P)
+        .join(Mod, Mod.id == P.module_id)
+        .join(T, T.id == Mod.training_id)
+        .join(U, U.id == P.user_id)
+        .outerjoin(E, and_(E.user_id == P.user_id, E.training_id == T.id))
+        .where(T.org_id == org_id)
+    )
+    if training_id is not None:
+        stmt = stmt.where(T.id == training_id)
+    return stmt
+
+
+def company_by_domain(db: Session, org_id: int) -> dict[str, str]:
+    C = models.Company
+    rows = db.execute(
+        select(C.email_domain, C.name).where(C.org_id == org_id, C.email_domain.is_not(None))
+    ).all()
+    return {domain.lower().lstrip("@"): name for domain, name in rows}
+
+
+def _value(v):
+    return getattr(v, "value", v)
+
+
+def iter_row_batches(db: Session, org_id: int, training_id: Optional[int] = None) -> Iterator[list[tuple]]:
+    """Batches van export-rijen (volgorde van COLUMNS), direct van de DB-cursor."""
+    companies = company_by_domain(db, org_id)
+    result = db.execute(
+        compliance_query(org_id, training_id),
+        execution_options={"stream_results": True, "yield_per": settings.EXPORT_FETCH_SIZE},
+    )
+    for part in result.partitions():
+        batch = []
+        for r in part:
+            email = r[1]
+            company = companies.get(email.rsplit("@", 1)[-1].lower()) if email else None
+            batch.append((r[0], r[1], r[2], company, *(_value(v) for v in r[3:])))
+        yield batch
+
+
+# ─────────────────────────────────────────────
+#   Encoders: batches -> bytes
+# ─────────────────────────────────────────────
+def _csv_cell(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return "" if v is None else v
+
+
+def csv_chunks(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows([_csv_cell(v) for v in row] for row in batch)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _Sink:
+    """Minimaal schrijfbaar bestand voor pyarrow; bytes worden per row group afgehaald."""
+
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.closed = False
+        self._pos = 0
+
+    def write(self, data) -> int:
+        b = bytes(data)
+        self.parts.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out, self.parts = b"".join(self.parts), []
+        return out
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    ts = pa.timestamp("us")
+    types = {
+        "user_id": pa.int64(), "training_id": pa.int64(), "module_id": pa.int64(), "module_order": pa.int32(),
+        "percent": pa.float64(), "score": pa.float64(),
+        "assigned_at": ts, "due_at": ts, "enrollment_completed_at": ts,
+        "started_at": ts, "last_event_at": ts, "completed_at": ts,
+    }
+    return pa.schema([(c, types.get(c, pa.string())) for c in COLUMNS])
+
+
+def parquet_chunks(batches: Iterable[list[tuple]]) -> Iterator[bytes]:
+    """Eén row group per batch; elke row group gaat direct de deur uit."""
+    if not parquet_available():
+        raise ExportUnavailable("Parquet-export vereist pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(col, type=schema.field(i).type) for i, col in enumerate(columns)], schema=schema,
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+ENCODERS = {CSV: csv_chunks, PARQUET: parquet_chunks}
+
+
+def stream_export(org_id: int, fmt: str, training_id: Optional[int] = None) -> Iterator[bytes]:
+    """Voor StreamingResponse: eigen sessie, want die van de request is dan al dicht."""
+    with SessionLocal() as db:
+        yield from ENCODERS[fmt](iter_row_batches(db, org_id, training_id))
+
+
+def filename(org_slug: str, fmt: str) -> str:
+    return f"compliance-{org_slug}-{datetime.utcnow():%Y%m%d-%H%M%S}.{fmt}"
+
+
+# ─────────────────────────────────────────────
+#   Job-modus
+# ─────────────────────────────────────────────
+@job_handler("compliance_export")
+def compliance_export_job(ctx: JobContext) -> dict:
+    p = ctx.params
+    out_dir = Path(settings.EXPORT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = out_dir / f"job-{ctx.job_id}-{p['filename']}"
+    rows = 0
+
+    def counted(batches: Iterable[list[tuple]]) -> Iterator[list[tuple]]:
+        nonlocal rows
+        for batch in batches:
+            ctx.check_cancelled()
+            yield batch
+            rows += len(batch)
+            ctx.advance(len(batch))
+
+    try:
+        with SessionLocal() as db, path.open("wb") as fh:
+            query = compliance_query(p["org_id"], p.get("training_id"))
+            ctx.set_total(db.execute(select(func.count()).select_from(query.subquery())).scalar() or 0)
+            for chunk in ENCODERS[p["format"]](counted(iter_row_batches(db, p["org_id"], p.get("training_id")))):
+                fh.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return {"file": path.name, "filename": p["filename"], "format": p["format"], "rows": rows}
+
+
+def export_path(job: models.Job) -> Optional[Path]:
+    result = job.result or {}
+    if job.kind != "compliance_export" or "file" not in result:
+        return None
+    path = Path(settings.EXPORT_DIR) / result["file"]
+    return path if path.is_file() else None
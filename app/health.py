@@ -0,0 +1,176 @@
+"""
+Liveness en readiness.
+
+/health (liveness) zegt alleen dat het proces draait en de event loop
+antwoordt; geen DB, anders herstart de orchestrator workers bij een trage
+database en wordt het erger.
+
+/ready (readiness) meet wat een load balancer moet weten om verkeer weg te
+sturen vóórdat requests gaan timen:
+
+- een echte DB-roundtrip (SELECT 1) op app.database, met timeout
+- pool-bezetting: uitgeleende connecties / (pool_size + max_overflow)
+- event loop-lag: hoe laat een asyncio.sleep wakker wordt (LagMonitor)
+- threadpool-lag: hoe lang een no-op op een vrije thread moet wachten,
+  plus de bezetting van de anyio-threadlimiter
+
+Boven een van de READY_MAX_*-drempels: 503 met de reden(en) erbij.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import anyio
+from anyio import to_thread
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database import engine
+from app.metrics import Gauge
+
+log = logging.getLogger(__name__)
+
+LOOP_LAG = Gauge("event_loop_lag_seconds", "Laatst gemeten vertraging van de event loop.")
+THREADPOOL_LAG = Gauge("threadpool_lag_seconds", "Laatst gemeten wachttijd op een vrije threadpool-thread.")
+THREADPOOL_BUSY = Gauge("threadpool_busy_ratio", "Bezette threads van de anyio-threadlimiter.")
+
+
+def _noop() -> float:
+    return time.perf_counter()
+
+
+class LagMonitor:
+    """
+    Meet elke READY_LAG_INTERVAL_MS de loop-lag en de threadpool-lag. Er wordt
+    het maximum van de laatste metingen bewaard (geen gemiddelde): één
+    geblokkeerde loop van 300 ms moet zichtbaar blijven tot de volgende ronde.
+    """
+
+    def __init__(self, interval: float, window: int = 4):
+        self.interval = interval
+        self.window = window
+        self._loop: list[float] = []
+        self._pool: list[float] = []
+        self._task: Optional[asyncio.Task] = None
+        self.limiter: Optional[anyio.CapacityLimiter] = None
+
+    @property
+    def loop_lag(self) -> float:
+        return max(self._loop, default=0.0)
+
+    @property
+    def threadpool_lag(self) -> float:
+        return max(self._pool, default=0.0)
+
+    def _record(self, samples: list[float], value: float) -> None:
+        samples.append(value)
+        del samples[:-self.window]
+
+    async def _run(self) -> None:
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self._record(self._loop, max(0.0, time.perf_counter() - t - self.interval))
+            t = time.perf_counter()
+            started = await to_thread.run_sync(_noop)
+            self._record(self._pool, started - t)
+
+    def start(self) -> None:
+        # de limiter hoort bij de loop; /metrics leest hem vanuit een thread
+        self.limiter = to_thread.current_default_thread_limiter()
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="lag-monitor")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+lag_monitor = LagMonitor(settings.READY_LAG_INTERVAL_MS / 1000)
+
+LOOP_LAG.set_function(lambda: lag_monitor.loop_lag)
+THREADPOOL_LAG.set_function(lambda: lag_monitor.threadpool_lag)
+
+
+def threadpool_utilisation() -> float:
+    limiter = lag_monitor.limiter
+    return limiter.borrowed_tokens / limiter.total_tokens if limiter else 0.0
+
+
+THREADPOOL_BUSY.set_function(threadpool_utilisation)
+
+
+def pool_stats() -> dict:
+    pool = engine.pool
+    if not callable(getattr(pool, "checkedout", None)):
+        # NullPool/StaticPool: geen begrensde pool, dus ook geen verzadiging
+        return {"checked_out": None, "capacity": None, "utilisation": 0.0}
+    capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "utilisation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+def _ping(started: list[float]) -> float:
+    started.append(time.perf_counter())
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return time.perf_counter() - started[0]
+
+
+async def readiness() -> tuple[bool, dict]:
+    reasons: list[str] = []
+    db: dict = {"ok": False}
+    started: list[float] = []
+    t = time.perf_counter()
+    try:
+        with anyio.fail_after(settings.READY_DB_TIMEOUT_MS / 1000):
+            latency = await to_thread.run_sync(_ping, started, abandon_on_cancel=True)
+        db = {"ok": True, "latency_ms": round(latency * 1000, 2)}
+    except TimeoutError:
+        reasons.append("db_timeout")
+    except Exception as e:
+        log.warning("readiness: DB-ping mislukt: %s", e)
+        db["error"] = type(e).__name__
+        reasons.append("db_unavailable")
+    # wachttijd op een thread voor déze request telt ook als threadpool-lag
+    queued = (started[0] if started else time.perf_counter()) - t
+
+    if db.get("latency_ms", 0.0) > settings.READY_MAX_DB_LATENCY_MS:
+        reasons.append("db_slow")
+
+    pool = pool_stats()
+    if pool["utilisation"] >= settings.READY_MAX_POOL_UTILISATION:
+        reasons.append("db_pool_saturated")
+
+    loop_lag_ms = lag_monitor.loop_lag * 1000
+    if loop_lag_ms > settings.READY_MAX_LOOP_LAG_MS:
+        reasons.append("event_loop_lag")
+
+    threadpool_lag_ms = max(lag_monitor.threadpool_lag, queued) * 1000
+    if threadpool_lag_ms > settings.READY_MAX_THREADPOOL_LAG_MS:
+        reasons.append("threadpool_lag")
+
+    report = {
+        "status": "ready" if not reasons else "unavailable",
+        "reasons": reasons,
+        "db": db,
+        "db_pool": pool,
+        "event_loop_lag_ms": round(loop_lag_ms, 2),
+        "threadpool": {
+            "lag_ms": round(threadpool_lag_ms, 2),
+            "utilisation": round(threadpool_utilisation(), 3),
+        },
+    }
+    return not reasons, report
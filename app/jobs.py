@@ -0,0 +1,266 @@
+"""
+Achtergrondjobs zonder externe broker.
+
+Jobs staan in de `jobs`-tabel en worden uitgevoerd door een lokale
+threadpool. Een handler krijgt een JobContext en werkt in chunks via
+`ctx.chunks(...)`: na elke chunk wordt de voortgang opgeslagen en gekeken of
+er om annulering is gevraagd. Status is op te vragen via GET /jobs/{id}.
+
+Elke runner (één per proces) zet bij het claimen zijn worker_id op de job en
+ververst heartbeat_at zolang hij leeft. Alleen RUNNING-jobs met een verlopen
+heartbeat worden als onderbroken afgeschreven; de eindstatus schrijft alleen
+de eigenaar, en alleen zolang de job nog RUNNING is.
+
+    @job_handler("mijn_job")
+    def _run(ctx: JobContext) -> dict:
+        for batch in ctx.chunks(items, 500):
+            ...
+        return {"verwerkt": ctx.done}
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TypeVar
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+Handler = Callable[["JobContext"], Optional[dict]]
+
+_handlers: dict[str, Handler] = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_handler(kind: str) -> Callable[[Handler], Handler]:
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+class JobContext:
+    def __init__(self, job_id: int, params: dict, total: int):
+        self.job_id = job_id
+        self.params = params
+        self.total = total
+        self.done = 0
+        self._db: Session = SessionLocal()
+
+    def set_total(self, total: int) -> None:
+        self.total = total
+        self._save(total=total)
+
+    def advance(self, n: int = 1) -> None:
+        self.done += n
+        self._save(done=self.done)
+
+    def check_cancelled(self) -> None:
+        requested = self._db.query(models.Job.cancel_requested).filter_by(id=self.job_id).scalar()
+        self._db.commit()
+        if requested:
+            raise JobCancelled()
+
+    def chunks(self, items: Sequence[T] | Iterable[T], size: int) -> Iterator[list[T]]:
+        """Levert items per chunk; voortgang en annulering tussen de chunks."""
+        batch: list[T] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= size:
+                self.check_cancelled()
+                yield batch
+                self.advance(len(batch))
+                batch = []
+        if batch:
+            self.check_cancelled()
+            yield batch
+            self.advance(len(batch))
+
+    def _save(self, **values: Any) -> None:
+        self._db.execute(update(models.Job).where(models.Job.id == self.job_id).values(**values))
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+# ─────────────────────────────────────────────
+#   Runner
+# ─────────────────────────────────────────────
+class JobRunner:
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start pool en heartbeat en pakt jobs op die bij een vorige stop bleven hangen."""
+        self._ensure_pool()
+        self._stop.clear()
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+            self._heartbeat.start()
+        self.reap_stale()
+        with SessionLocal() as db:
+            queued = [j for (j,) in db.query(models.Job.id).filter_by(status=models.JobStatus.QUEUED)]
+        for job_id in queued:
+            self.submit(job_id)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=5)
+            self._heartbeat = None
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def reap_stale(self) -> int:
+        """
+        RUNNING-jobs zonder recente heartbeat -> FAILED. Jobs van andere, levende
+        workers (uvicorn --workers N) blijven staan: die verversen hun heartbeat.
+        """
+        now = datetime.utcnow()
+        J = models.Job
+        with SessionLocal() as db:
+            reaped = db.execute(
+                update(J)
+                .where(
+                    J.status == models.JobStatus.RUNNING,
+                    or_(J.heartbeat_at.is_(None), J.heartbeat_at < now - timedelta(seconds=settings.JOB_STALE_SECONDS)),
+                )
+                .values(status=models.JobStatus.FAILED, error="Onderbroken: worker gaf geen heartbeat meer",
+                        finished_at=now)
+            ).rowcount
+            db.commit()
+        if reaped:
+            log.warning("%d job(s) zonder heartbeat als onderbroken afgeschreven", reaped)
+        return reaped
+
+    def _beat(self) -> None:
+        while not self._stop.wait(settings.JOB_HEARTBEAT_SECONDS):
+            try:
+                with SessionLocal() as db:
+                    db.execute(
+                        update(models.Job)
+                        .where(models.Job.worker_id == self.worker_id, models.Job.status == models.JobStatus.RUNNING)
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.commit()
+                self.reap_stale()
+            except Exception:
+                log.exception("job-heartbeat mislukt")
+
+    def submit(self, job_id: int) -> None:
+        self._ensure_pool().submit(self._run, job_id)
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            return self._pool
+
+    def _run(self, job_id: int) -> None:
+        with SessionLocal() as db:
+            # claimen: alleen QUEUED -> RUNNING, zodat een job nooit twee keer draait
+            claimed = db.execute(
+                update(models.Job)
+                .where(models.Job.id == job_id, models.Job.status == models.JobStatus.QUEUED)
+                .values(status=models.JobStatus.RUNNING, started_at=datetime.utcnow(),
+                        worker_id=self.worker_id, heartbeat_at=datetime.utcnow())
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return
+            job = db.get(models.Job, job_id)
+            kind, params, total = job.kind, dict(job.params or {}), job.total
+
+        ctx = JobContext(job_id, params, total)
+        values: dict[str, Any]
+        try:
+            handler = _handlers.get(kind)
+            if handler is None:
+                raise RuntimeError(f"Onbekend jobtype: {kind!r}")
+            result = handler(ctx)
+            values = {"status": models.JobStatus.SUCCEEDED, "result": result, "done": max(ctx.done, ctx.total)}
+        except JobCancelled:
+            values = {"status": models.JobStatus.CANCELLED, "done": ctx.done}
+        except Exception as e:
+            log.exception("job %s (%s) mislukt", job_id, kind)
+            values = {"status": models.JobStatus.FAILED, "error": str(e)[:2000], "done": ctx.done}
+        finally:
+            ctx.close()
+
+        # alleen als eigenaar en nog RUNNING: een afgeschreven job komt niet terug tot leven
+        with SessionLocal() as db:
+            J = models.Job
+            written = db.execute(
+                update(J)
+                .where(J.id == job_id, J.status == models.JobStatus.RUNNING, J.worker_id == self.worker_id)
+                .values(finished_at=datetime.utcnow(), **values)
+            ).rowcount
+            db.commit()
+        if not written:
+            log.warning("job %s (%s): niet meer van deze worker; eindstatus %s niet opgeslagen",
+                        job_id, kind, values["status"].value)
+
+
+runner = JobRunner(max_workers=settings.JOB_WORKERS)
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    params: dict,
+    total: int = 0,
+    org_id: Optional[int] = None,
+    created_by: Optional[int] = None,
+) -> models.Job:
+    """Job aanmaken, committen en aan de pool geven."""
+    if kind not in _handlers:
+        raise ValueError(f"Onbekend jobtype: {kind!r}")
+    job = models.Job(kind=kind, params=params, total=total, org_id=org_id, created_by=created_by)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    runner.submit(job.id)
+    return job
+
+
+def request_cancel(db: Session, job: models.Job) -> None:
+    """
+    Nog niet geclaimd (QUEUED): direct CANCELLED. Loopt hij al: alleen de vlag,
+    de handler stopt bij de volgende chunk. De status staat in de WHERE, zodat
+    dit niet kan racen met de runner die QUEUED -> RUNNING claimt.
+    """
+    J = models.Job
+    db.execute(
+        update(J)
+        .where(J.id == job.id, J.status == models.JobStatus.QUEUED)
+        .values(status=models.JobStatus.CANCELLED, cancel_requested=True, finished_at=datetime.utcnow())
+    )
+    db.execute(
+        update(J)
+        .where(J.id == job.id, J.status == models.JobStatus.RUNNING)
+        .values(cancel_requested=True)
+    )
+    db.commit()
@@ -1,32 +1,100 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.compression import CompressionMiddleware
+from app.concurrency import ConcurrencyLimitMiddleware
+from app.core.config import settings
+from app import database, db
+from app.health import lag_monitor
+from app.jobs import runner as job_runner
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.pagination import PAGE_HEADERS
+from app.profiling import ProfilingMiddleware
+from app import tracing
+from app.realtime import hub, make_backend
+from app.security import dummy_hash
+from app import user_import
+from app.xapi import worker as xapi_worker
+
 # Routers importeren
 from app.routers import (
+    auth,
     users,
     companies,
+    projects,
     trainings,
     progress,
     stats,
+    live,
+    xapi,
+    jobs,
+    exports,
+    metrics,
+    meta,
 )
 
-app = FastAPI(title="CybAware API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    hub.use_backend(make_backend())
+    lag_monitor.start()
+    await run_in_threadpool(dummy_hash)  # eerste login met onbekend e-mailadres niet trager
+    job_runner.start()
+    if settings.XAPI_WORKER_ENABLED:
+        xapi_worker.start()
+    yield
+    await lag_monitor.stop()
+    xapi_worker.stop()
+    job_runner.shutdown()
+    user_import.shutdown()
+    hub.backend.close()
+    tracing.exporter.close()
 
 
+app = FastAPI(title="CybAware API", version="1.0.0", lifespan=lifespan)
+
+
+if settings.CONCURRENCY_LIMIT_ENABLED:
+    # binnen CORS en Metrics: ook een 503 krijgt CORS-headers en wordt geteld
+    app.add_middleware(ConcurrencyLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[*PAGE_HEADERS, "ETag"],
 )
+app.add_middleware(CompressionMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)  # meet ook compressie
+if settings.TRACING_ENABLED:
+    app.add_middleware(tracing.TracingMiddleware)  # buitenste laag: root span om alles heen
+
+instrument_engine(database.engine, "database")
+instrument_engine(db.engine, "db")
+if settings.TRACING_ENABLED:
+    tracing.instrument_engine(database.engine, "database")
+    tracing.instrument_engine(db.engine, "db")
 
 #  Alle routers registreren
+app.include_router(auth.login_router, prefix="/auth")  # alleen login, zie app/routers/auth.py
 app.include_router(users.router)
 app.include_router(companies.router)
+app.include_router(projects.router)
 app.include_router(trainings.router)
 app.include_router(progress.router)   
 app.include_router(stats.router)      
+app.include_router(live.router)
+app.include_router(xapi.router)
+app.include_router(jobs.router)
+app.include_router(exports.router)
+app.include_router(metrics.router)
+app.include_router(meta.router)
 
 
 @app.get("/", tags=["root"])
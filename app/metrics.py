@@ -0,0 +1,324 @@
+"""
+Metrics in Prometheus-tekstformaat (GET /metrics), zonder externe dependency.
+
+Hot path zonder locks: elke thread telt in zijn eigen shard (een lijst
+floats via threading.local); pas bij het scrapen worden de shards opgeteld.
+Een lock is er alleen bij het aanmaken van een nieuwe shard of labelcombinatie.
+
+Wat er gemeten wordt:
+- http_requests_total / http_request_duration_seconds per method + route-
+  template (scope["route"].path, dus /organizations/{slug}/... en niet de slug)
+- http_requests_in_flight
+- db_statements_total per engine en soort, pool-gauges (size, checked out,
+  overflow), db_pool_acquire_seconds (wachten op / openen van een connectie)
+  en db_connection_hold_seconds
+- auth_seconds voor verify_password, hash_password en decode_token
+- cache_requests_total per cache en hit/miss
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Shards:
+    """Per thread een eigen lijst tellers; total() telt ze op."""
+
+    __slots__ = ("size", "_local", "_all", "_lock")
+
+    def __init__(self, size: int):
+        self.size = size
+        self._local = threading.local()
+        self._all: list[list[float]] = []
+        self._lock = threading.Lock()
+
+    def mine(self) -> list[float]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0.0] * self.size
+            with self._lock:
+                self._all.append(values)
+            self._local.values = values
+            return values
+
+    def total(self) -> list[float]:
+        with self._lock:
+            shards = list(self._all)
+        out = [0.0] * self.size
+        for values in shards:
+            for i, v in enumerate(values):
+                out[i] += v
+        return out
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _label_str(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class _CounterChild:
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards = _Shards(1)
+
+    def inc(self, n: float = 1.0) -> None:
+        self._shards.mine()[0] += n
+
+    def value(self) -> float:
+        return self._shards.total()[0]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, n: float = 1.0) -> None:
+        self.labels().inc(n)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}{self._label_str(key)} {_num(child.value())}"
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "_shards")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # per bucket een teller, plus +Inf, sum en count
+        self._shards = _Shards(len(buckets) + 3)
+
+    def observe(self, value: float) -> None:
+        values = self._shards.mine()
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def totals(self) -> list[float]:
+        return self._shards.total()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            totals = child.totals()
+            cumulative = 0.0
+            for bound, n in zip((*self.buckets, float("inf")), totals):
+                cumulative += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                yield f"{self.name}_bucket{self._label_str(key, le)} {_num(cumulative)}"
+            yield f"{self.name}_sum{self._label_str(key)} {_num(totals[-2])}"
+            yield f"{self.name}_count{self._label_str(key)} {_num(totals[-1])}"
+
+
+class Gauge(_Metric):
+    """Gauge met een callback per labelcombinatie; wordt pas bij het scrapen gelezen."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self._funcs: dict[tuple, Callable[[], float]] = {}
+        super().__init__(name, help, labelnames)
+
+    def set_function(self, fn: Callable[[], float], *labels) -> None:
+        with self._lock:
+            self._funcs[tuple(str(v) for v in labels)] = fn
+
+    def _samples(self):
+        for key, fn in list(self._funcs.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            yield f"{self.name}{self._label_str(key)} {_num(value)}"
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+REGISTRY: list[_Metric] = []
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────
+#   Metrics van de app
+# ─────────────────────────────────────────────
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP-requests per route-template en status.", ("method", "route", "status"))
+HTTP_DURATION = Histogram("http_request_duration_seconds", "Latency per route-template.", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests die nu in behandeling zijn.")
+
+DB_STATEMENTS = Counter("db_statements_total", "SQL-statements per engine en soort.", ("engine", "kind"))
+DB_POOL = Gauge("db_pool_connections", "Pool-connecties per toestand.", ("engine", "state"))
+DB_POOL_ACQUIRE = Histogram(
+    "db_pool_acquire_seconds", "Tijd om een connectie uit de pool te krijgen (wachten + evt. openen).", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_CONNECTION_HOLD = Histogram("db_connection_hold_seconds", "Hoe lang een connectie uitgeleend is.", ("engine",))
+
+AUTH_SECONDS = Histogram(
+    "auth_seconds", "Tijd in wachtwoord-hashing en token-decodering.", ("op",),
+    buckets=(0.0001, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache-lookups per cache en resultaat.", ("cache", "result"))
+
+
+class _InFlight:
+    """Teller voor de event loop-thread; gelezen door de gauge."""
+
+    value = 0
+
+
+HTTP_IN_FLIGHT.set_function(lambda: _InFlight.value)
+
+
+def in_flight() -> int:
+    return _InFlight.value
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+# ─────────────────────────────────────────────
+#   HTTP
+# ─────────────────────────────────────────────
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _InFlight.value += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _InFlight.value -= 1
+            route = route_template(scope)
+            HTTP_DURATION.labels(scope["method"], route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(scope["method"], route, status).inc()
+
+
+# ─────────────────────────────────────────────
+#   SQLAlchemy
+# ─────────────────────────────────────────────
+def instrument_engine(engine, name: str) -> None:
+    from sqlalchemy import event
+
+    statements = {kind: DB_STATEMENTS.labels(name, kind) for kind in ("select", "insert", "update", "delete", "other")}
+    hold = DB_CONNECTION_HOLD.labels(name)
+    acquire = DB_POOL_ACQUIRE.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        kind = statement.lstrip()[:6].lower()
+        (statements.get(kind) or statements["other"]).inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        record.info["metrics_checkout_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, record):
+        t = record.info.pop("metrics_checkout_at", None)
+        if t is not None:
+            hold.observe(time.perf_counter() - t)
+
+    pool = engine.pool
+    # _do_get is waar een checkout wacht (QueuePool vol) of een nieuwe connectie opent;
+    # SQLAlchemy heeft daar geen event voor
+    do_get = pool._do_get
+
+    def _timed_do_get():
+        t = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            acquire.observe(time.perf_counter() - t)
+
+    pool._do_get = _timed_do_get
+
+    # NullPool (app.db op SQLite) heeft geen size/checkedout
+    if callable(getattr(pool, "checkedout", None)):
+        DB_POOL.set_function(pool.size, name, "size")
+        DB_POOL.set_function(pool.checkedout, name, "checked_out")
+        # QueuePool.overflow() is negatief zolang de pool nog niet vol is
+        DB_POOL.set_function(lambda: max(0, pool.overflow()), name, "overflow")
@@ -6,7 +6,7 @@ from typing import Optional
 
 from sqlalchemy import (
     String, Integer, Boolean, DateTime, ForeignKey, UniqueConstraint, Text,
-    Index, Float, func
+    Index, Float, JSON, func, text
 )
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -36,6 +36,14 @@ class ProgressStatus(str, enum.Enum):
     COMPLETED = "COMPLETED"
 
 
+class JobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
 # -------------------------
 # Core domain
 # -------------------------
@@ -46,6 +54,8 @@ class Organization(Base):
     name: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
     slug: Mapped[str] = mapped_column(String(200), unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    # +1 bij elke wijziging aan trainingen/modules; sleutel voor catalogus-cache en ETag
+    catalog_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     memberships: Mapped[list[Membership]] = relationship(
         "Membership",
@@ -71,6 +81,10 @@ class User(Base):
     )
 
 
+# user-import zoekt hoofdletterongevoelig (lower(email) IN ...)
+Index("ix_users_email_lower", func.lower(User.email))
+
+
 class Membership(Base):
     __tablename__ = "memberships"
 
@@ -87,8 +101,8 @@ class Membership(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "org_id", name="uq_user_org"),
-        Index("ix_membership_org", "org_id"),
-        Index("ix_membership_user", "user_id"),
+        # rolcheck per request gaat via uq_user_org; deze dekt doelgroep (org, rol) en ledentelling
+        Index("ix_membership_org_role", "org_id", "role", "user_id"),
     )
 
 
@@ -108,7 +122,7 @@ class Project(Base):
 class Company(Base):
     __tablename__ = "companies"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     org_id: Mapped[int] = mapped_column(
         ForeignKey("organizations.id", ondelete="CASCADE"), index=True, nullable=False
     )
@@ -143,7 +157,8 @@ class Training(Base):
     modules: Mapped[list[Module]] = relationship("Module", back_populates="training", cascade="all, delete-orphan")
     enrollments: Mapped[list[Enrollment]] = relationship("Enrollment", back_populates="training", cascade="all, delete-orphan")
 
-    __table_args__ = (Index("ix_training_org", "org_id"),)
+    # catalogus: actieve trainingen van een org, nieuwste eerst
+    __table_args__ = (Index("ix_training_org_active_created", "org_id", "is_active", "created_at"),)
 
 
 class Module(Base):
@@ -161,7 +176,6 @@ class Module(Base):
 
     __table_args__ = (
         UniqueConstraint("training_id", "order_index", name="uq_module_training_order"),
-        Index("ix_module_training", "training_id"),
     )
 
 
@@ -186,8 +200,7 @@ class Enrollment(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "training_id", name="uq_enrollment_user_training"),
-        Index("ix_enrollment_user", "user_id"),
-        Index("ix_enrollment_training", "training_id"),
+        Index("ix_enrollment_training_status", "training_id", "status"),
     )
 
 
@@ -214,6 +227,76 @@ class Progress(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "module_id", name="uq_progress_user_module"),
-        Index("ix_progress_user", "user_id"),
-        Index("ix_progress_module", "module_id"),
+        # stats-aggregaties (count/avg/completed per module) lezen alleen deze index
+        Index("ix_progress_module_status", "module_id", "status", "percent"),
+    )
+
+
+# -------------------------
+# xAPI (externe content)
+# -------------------------
+class XapiStatement(Base):
+    """Append-only staging van binnenkomende xAPI-statements."""
+    __tablename__ = "xapi_statements"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    statement_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    org_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    actor_email: Mapped[str] = mapped_column(String(320), nullable=False)
+    verb: Mapped[str] = mapped_column(String(255), nullable=False)
+    activity_id: Mapped[str] = mapped_column(String(1000), nullable=False)
+    completion: Mapped[Optional[bool]] = mapped_column(Boolean)
+    success: Mapped[Optional[bool]] = mapped_column(Boolean)
+    score: Mapped[Optional[float]] = mapped_column(Float)       # genormaliseerd naar 0..100
+    percent: Mapped[Optional[float]] = mapped_column(Float)     # cmi5 progress-extensie
+    timestamp: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    stored_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # NULL = nog niet naar Progress
+
+    __table_args__ = (
+        UniqueConstraint("statement_id", name="uq_xapi_statement_id"),
+        # alleen de nog te verwerken rijen; de worker pakt ze op Postgres hiermee op
+        Index("ix_xapi_pending", "id",
+              postgresql_where=text("processed_at IS NULL"), sqlite_where=text("processed_at IS NULL")),
     )
+
+
+class XapiCursor(Base):
+    """
+    Hoogste staging-id dat al naar Progress is verwerkt (één rij). Alleen SQLite
+    leest op last_id; op Postgres is de rij het slot dat de workers serialiseert.
+    """
+    __tablename__ = "xapi_cursor"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    last_id: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# -------------------------
+# Achtergrondjobs
+# -------------------------
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(100), nullable=False)
+    org_id: Mapped[Optional[int]] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"))
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+    status: Mapped[JobStatus] = mapped_column(
+        SAEnum(JobStatus, name="job_status_enum", native_enum=True, validate_strings=True),
+        default=JobStatus.QUEUED,
+        nullable=False,
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    result: Mapped[Optional[dict]] = mapped_column(JSON)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    worker_id: Mapped[Optional[str]] = mapped_column(String(100))  # runner die hem claimde
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (Index("ix_job_status", "status"),)
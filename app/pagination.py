@@ -0,0 +1,182 @@
+"""
+Keyset (cursor) paginatie voor lijst-endpoints.
+
+Een cursor is opaque en ondertekend (HMAC met SECRET_KEY) en bevat de
+sorteersleutel + id van de laatste rij van de vorige pagina, plus de "scope"
+(endpoint + sortering), zodat een cursor niet bij een andere sortering past.
+
+De volgende pagina zoekt verder vanaf die rij: (key, id) > (key_laatste, id_laatste)
+of < bij aflopend sorteren. Key en id van de referentierij worden in de DB
+opgezocht; zo vergelijken we altijd met exact de opgeslagen waarde (geen
+datetime/float round-trips). Is die rij inmiddels weg, dan valt de vergelijking
+terug op de waarde uit de cursor.
+
+Sorteersleutels moeten NOT NULL zijn (gebruik coalesce voor nullable kolommen).
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import and_, func, literal, or_, select
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.util import ClauseAdapter
+
+from app.core.config import settings
+
+_SIG_BYTES = 16
+
+
+# ─────────────────────────────────────────────
+#   Cursor encode/decode
+# ─────────────────────────────────────────────
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:_SIG_BYTES]
+
+
+def _dump_value(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return {"dt": v.isoformat()}
+    return getattr(v, "value", v)
+
+
+def _load_value(v: Any) -> Any:
+    if isinstance(v, dict) and "dt" in v:
+        return datetime.fromisoformat(v["dt"])
+    return v
+
+
+def encode_cursor(scope: str, key: Any, row_id: int) -> str:
+    payload = json.dumps({"s": scope, "k": _dump_value(key), "i": row_id}, separators=(",", ":")).encode()
+    return f"{_b64(payload)}.{_b64(_sign(payload))}"
+
+
+def decode_cursor(scope: str, cursor: str) -> tuple[Any, int]:
+    try:
+        body, sig = cursor.split(".", 1)
+        payload = _unb64(body)
+        if not hmac.compare_digest(_unb64(sig), _sign(payload)):
+            raise ValueError("signature")
+        data = json.loads(payload)
+        if data["s"] != scope:
+            raise ValueError("scope")
+        return _load_value(data["k"]), int(data["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Ongeldige cursor")
+
+
+# ─────────────────────────────────────────────
+#   Paginate
+# ─────────────────────────────────────────────
+@dataclass
+class Page:
+    items: list
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+def _seek_condition(key, id_col, descending: bool, ref_key: Any, ref_id: int):
+    table = id_col.table
+    adapter = ClauseAdapter(table.alias())
+    # sleutel van de referentierij, niet gecorreleerd aan de buitenste query
+    ref = (
+        select(adapter.traverse(key))
+        .where(adapter.traverse(id_col) == ref_id)
+        .scalar_subquery()
+    )
+    ref = func.coalesce(ref, literal(ref_key))
+    if descending:
+        return or_(key < ref, and_(key == ref, id_col < ref_id))
+    return or_(key > ref, and_(key == ref, id_col > ref_id))
+
+
+def paginate(
+    db: Session,
+    query,
+    *,
+    key,
+    id_col,
+    scope: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    with_total: bool = False,
+) -> Page:
+    """
+    `query` is een ORM Query of een Core select(). Items zijn entities bij
+    db.query(Model), anders Row-objecten (zonder hulpkolommen).
+    """
+    key = getattr(key, "expression", key)
+    id_col = getattr(id_col, "expression", id_col)
+    is_orm = isinstance(query, Query)
+    base = query.statement if is_orm else query
+
+    total, estimate = (None, False)
+    if with_total:
+        total, estimate = approximate_count(db, base)
+
+    stmt = base
+    if cursor:
+        ref_key, ref_id = decode_cursor(scope, cursor)
+        stmt = stmt.where(_seek_condition(key, id_col, descending, ref_key, ref_id))
+    order = (key.desc(), id_col.desc()) if descending else (key.asc(), id_col.asc())
+    stmt = stmt.add_columns(key.label("_page_key"), id_col.label("_page_id")).order_by(None).order_by(*order).limit(limit + 1)
+
+    rows = db.execute(stmt).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(scope, rows[-1][-2], rows[-1][-1]) if has_more and rows else None
+    descriptions = query.column_descriptions if is_orm else []
+    if len(descriptions) == 1 and descriptions[0]["expr"] is descriptions[0]["entity"]:
+        # db.query(Model): de entity zelf; bij losse kolommen gewoon de tuples
+        items = [r[0] for r in rows]
+    else:
+        items = [r[:-2] for r in rows]
+    return Page(items=items, next_cursor=next_cursor, total=total, total_is_estimate=estimate)
+
+
+def approximate_count(db: Session, stmt, cap: Optional[int] = None) -> tuple[int, bool]:
+    """
+    Goedkope totaaltelling. Postgres: rij-schatting van de planner.
+    Elders: COUNT over maximaal `cap` rijen (standaard PAGINATION_COUNT_CAP;
+    daarboven "cap+").
+    """
+    stmt = stmt.order_by(None)
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        compiled = stmt.compile(dialect=bind.dialect)
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    cap = settings.PAGINATION_COUNT_CAP if cap is None else cap
+    n = db.execute(select(func.count()).select_from(stmt.limit(cap + 1).subquery())).scalar() or 0
+    return min(n, cap), n > cap
+
+
+def set_page_headers(response: Response, request: Request, page: Page) -> None:
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+        nxt = request.url.remove_query_params(["offset", "skip"]).include_query_params(cursor=page.next_cursor)
+        response.headers["Link"] = f'<{nxt}>; rel="next"'
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Count-Approximate"] = "true" if page.total_is_estimate else "false"
+
+
+PAGE_HEADERS = ["X-Next-Cursor", "Link", "X-Total-Count", "X-Total-Count-Approximate"]
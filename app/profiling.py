@@ -0,0 +1,236 @@
+"""
+Profiel van één request, op verzoek (header X-Profile: 1).
+
+Alleen actief met PROFILING_ENABLED; zonder die setting wordt de middleware
+niet eens geïnstalleerd. Alleen ADMIN/OWNER (van een willekeurige org) mag
+profileren; voor anderen wordt de header genegeerd.
+
+Een sampler-thread kijkt elke PROFILE_SAMPLE_INTERVAL_MS naar de stacks van
+de event loop-thread en de threadpool-threads (sync dependencies en
+handlers) en telt elke sample bij een fase op:
+
+  deps           code in app/deps.py (get_current_user, require_*_role, ...)
+  sql            SQLAlchemy / DB-driver, ongeacht wie de query deed
+  serialization  response_model-validatie en JSON-rendering
+  handler        de endpoint-code in app/routers
+  framework      overige FastAPI/Starlette/middleware-tijd
+
+Resultaat: een Server-Timing-header met de fasen en een bestand in
+PROFILE_DIR in collapsed-stack-formaat (flamegraph.pl, speedscope), met de
+fase als bovenste frame; alleen de nieuwste PROFILE_MAX_FILES blijven staan. Geprofileerd wordt tot de eerste byte van de body
+(bij streaming responses dus niet het streamen zelf).
+
+Let op: lopen er tegelijk andere requests in deze worker, dan tellen hun
+threads mee (X-Profile-Concurrent in de response).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app import models
+from app.core.config import settings
+from app.database import SessionLocal
+from app.metrics import in_flight, route_template
+from app.security import decode_token
+
+log = logging.getLogger(__name__)
+
+PHASES = ("deps", "sql", "serialization", "handler", "framework")
+
+_APP_DIR = str(Path(__file__).resolve().parent) + os.sep
+_DEPS_FILE = _APP_DIR + "deps.py"
+_ROUTERS_DIR = _APP_DIR + "routers" + os.sep
+_SQL_MARKERS = (f"{os.sep}sqlalchemy{os.sep}", f"{os.sep}sqlite3{os.sep}", f"{os.sep}psycopg")
+_SERIALIZATION = {
+    ("routing.py", "serialize_response"),
+    ("routing.py", "_prepare_response_content"),
+    ("responses.py", "render"),
+    ("responses.py", "dumps"),
+    ("encoders.py", "jsonable_encoder"),
+}
+_INTERESTING = (_APP_DIR, f"{os.sep}fastapi{os.sep}", f"{os.sep}starlette{os.sep}")
+_MAX_DEPTH = 128
+
+
+def _classify(stack: list) -> str:
+    """`stack` is leaf -> root; de binnenste herkenbare laag bepaalt de fase."""
+    for code in stack:
+        filename = code.co_filename
+        if any(m in filename for m in _SQL_MARKERS):
+            return "sql"
+        if (os.path.basename(filename), code.co_name) in _SERIALIZATION:
+            return "serialization"
+        if filename == _DEPS_FILE:
+            return "deps"
+        if filename.startswith(_ROUTERS_DIR):
+            return "handler"
+    return "framework"
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_APP_DIR):
+        filename = "app/" + filename[len(_APP_DIR):]
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+class Sampler:
+    def __init__(self, loop_thread: int, interval: float):
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.phases: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _threads(self) -> set[int]:
+        idents = {self.loop_thread}
+        for t in threading.enumerate():
+            if t.name.startswith("AnyIO worker thread") and t.ident is not None:
+                idents.add(t.ident)
+        return idents
+
+    def _sample(self, threads: set[int]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident not in threads:
+                continue
+            stack = []
+            while frame is not None and len(stack) < _MAX_DEPTH:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            # idle (event loop in select, worker wacht op werk): geen frames van ons of het framework
+            if not any(m in code.co_filename for code in stack for m in _INTERESTING):
+                continue
+            phase = _classify(stack)
+            self.phases[phase] += 1
+            self.stacks[";".join([f"[{phase}]", *(_label(c) for c in reversed(stack))])] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        threads = self._threads()
+        while not self._stop.wait(self.interval):
+            if self.samples % 50 == 0:
+                threads = self._threads()  # threadpool kan groeien
+            self._sample(threads)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+
+
+def _is_admin(authorization: str) -> bool:
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        user_id = int(decode_token(token)["sub"])
+    except (ValueError, KeyError):
+        return False
+    with SessionLocal() as db:
+        return db.query(models.Membership.id).join(models.User, models.User.id == models.Membership.user_id).filter(
+            models.Membership.user_id == user_id,
+            models.Membership.role.in_([models.Role.ADMIN, models.Role.OWNER]),
+            models.User.is_active.is_(True),
+        ).first() is not None
+
+
+def server_timing(phases: Counter, ticks: int, total: float) -> str:
+    # één tick = wandkloktijd / aantal sample-rondes; busy threads tellen elk mee
+    tick_ms = total * 1000 / ticks if ticks else 0.0
+    parts = [f"{p};dur={phases[p] * tick_ms:.1f}" for p in PHASES]
+    return ", ".join([*parts, f"total;dur={total * 1000:.1f}"])
+
+
+def write_profile(sampler: Sampler, method: str, route: str) -> str:
+    out_dir = Path(settings.PROFILE_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+    name = f"{datetime.utcnow():%Y%m%d-%H%M%S-%f}-{method}-{slug}.folded"
+    with (out_dir / name).open("w") as fh:
+        for stack, n in sampler.stacks.most_common():
+            fh.write(f"{stack} {n}\n")
+    _rotate(out_dir, settings.PROFILE_MAX_FILES)
+    return name
+
+
+def _rotate(out_dir: Path, keep: int) -> None:
+    # namen beginnen met de tijd, dus alfabetisch = chronologisch
+    files = sorted(out_dir.glob("*.folded"))
+    for old in files[:max(0, len(files) - keep)]:
+        old.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._busy = threading.Lock()  # één geprofileerde request tegelijk per worker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if headers.get(settings.PROFILE_HEADER, "") not in ("1", "true"):
+            await self.app(scope, receive, send)
+            return
+        if not await run_in_threadpool(_is_admin, headers.get("authorization", "")):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._busy.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        sampler = Sampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        start_msg: Optional[Message] = None
+        concurrent = in_flight()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_msg
+            if message["type"] == "http.response.start":
+                # headers pas versturen bij de eerste body-chunk: dan is het profiel klaar
+                start_msg = message
+                return
+            if start_msg is not None:
+                sampler.stop()
+                total = time.perf_counter() - started
+                h = MutableHeaders(raw=start_msg["headers"])
+                h["Server-Timing"] = server_timing(sampler.phases, sampler.samples, total)
+                h["X-Profile-Concurrent"] = str(max(0, max(concurrent, in_flight()) - 1))
+                try:
+                    h["X-Profile-File"] = write_profile(sampler, scope["method"], route_template(scope))
+                except OSError:
+                    log.exception("profiel kon niet worden weggeschreven")
+                await send(start_msg)
+                start_msg = None
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
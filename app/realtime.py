@@ -0,0 +1,311 @@
+"""
+Live voortgangsfeed voor managers.
+
+Progress- en enrollment-wijzigingen worden na een geslaagde commit gepubliceerd
+op een in-process hub. Elke SSE-verbinding is een abonnee met een eigen,
+begrensde queue; wie niet bijhoudt wordt losgekoppeld (de browser verbindt
+zelf opnieuw). Een idle verbinding kost alleen een coroutine en een lege queue.
+
+Voor meerdere workers kan de hub via een backend aan een broker hangen
+(zie scripts/live_broker.py als lokale stand-in).
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from itertools import chain, count
+from typing import Any, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_SESSION_KEY = "live_events"
+_CACHE_SIZE = 10_000
+
+
+def _value(v: Any) -> Any:
+    return getattr(v, "value", v)
+
+
+def render(ev: dict) -> str:
+    """Eén keer renderen per event, niet per abonnee."""
+    return f"event: {ev['type']}\ndata: {json.dumps(ev, separators=(',', ':'), default=str)}\n\n"
+
+
+# ─────────────────────────────────────────────
+#   Hub + abonnees
+# ─────────────────────────────────────────────
+class Subscriber:
+    __slots__ = ("org_id", "training_id", "queue", "dropped")
+
+    def __init__(self, org_id: int, training_id: Optional[int], maxsize: int):
+        self.org_id = org_id
+        self.training_id = training_id
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = False
+
+
+class LiveHub:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subs: dict[int, set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self.backend: LiveBackend = LocalBackend()
+        self.backend.start(self)
+
+    def use_backend(self, backend: "LiveBackend") -> None:
+        self.backend.close()
+        self.backend = backend
+        backend.start(self)
+
+    # -- abonnees (altijd vanuit de event loop) --
+    def subscribe(self, org_id: int, training_id: Optional[int] = None) -> Subscriber:
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(org_id, training_id, self.queue_size)
+        with self._lock:
+            self._subs.setdefault(org_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.org_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.org_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subs.values())
+
+    def wants_events(self) -> bool:
+        """Goedkope check voor de session-hooks: niets verzamelen als niemand luistert."""
+        return self.backend.always_publish or bool(self._subs)
+
+    # -- publiceren --
+    def publish(self, ev: dict) -> None:
+        self.backend.publish(ev)
+
+    def deliver(self, org_id: int, training_id: Optional[int], message: str) -> None:
+        """Thread-safe; wordt door de backend aangeroepen."""
+        loop = self._loop
+        if loop is None or org_id not in self._subs:
+            return
+        loop.call_soon_threadsafe(self._fanout, org_id, training_id, message)
+
+    def _fanout(self, org_id: int, training_id: Optional[int], message: str) -> None:
+        for sub in tuple(self._subs.get(org_id, ())):
+            if sub.training_id is not None and sub.training_id != training_id:
+                continue
+            try:
+                sub.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # trage consument: loskoppelen i.p.v. geheugen laten groeien
+                sub.dropped = True
+                self.unsubscribe(sub)
+
+
+# ─────────────────────────────────────────────
+#   Backends
+# ─────────────────────────────────────────────
+class LiveBackend:
+    """Transport tussen publishers en hubs. `publish` mag vanuit elke thread komen."""
+
+    # True als er buiten dit proces abonnees kunnen zijn
+    always_publish = False
+
+    def start(self, hub: LiveHub) -> None:
+        self.hub = hub
+
+    def publish(self, ev: dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class LocalBackend(LiveBackend):
+    """Alles binnen één proces (standaard)."""
+
+    def publish(self, ev: dict) -> None:
+        self.hub.deliver(ev["org_id"], ev.get("training_id"), render(ev))
+
+
+class BrokerBackend(LiveBackend):
+    """
+    Newline-delimited JSON over TCP naar een broker die elke regel naar alle
+    verbonden workers terugstuurt (ook naar de afzender).
+    """
+
+    always_publish = True
+
+    def __init__(self, address: str):
+        host, port = address.rsplit(":", 1)
+        self._addr = (host, int(port))
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+
+    def start(self, hub: LiveHub) -> None:
+        super().start(hub)
+        threading.Thread(target=self._read_loop, name="live-broker", daemon=True).start()
+
+    def publish(self, ev: dict) -> None:
+        data = json.dumps(ev, separators=(",", ":"), default=str).encode() + b"\n"
+        with self._send_lock:
+            if self._sock is None:
+                log.warning("live broker niet verbonden; event verworpen")
+                return
+            try:
+                self._sock.sendall(data)
+            except OSError:
+                self._sock = None
+
+    def close(self) -> None:
+        self._closed.set()
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            sock.close()
+
+    def _read_loop(self) -> None:
+        backoff = 0.5
+        while not self._closed.is_set():
+            try:
+                sock = socket.create_connection(self._addr, timeout=5)
+                sock.settimeout(None)
+            except OSError:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+                continue
+            backoff = 0.5
+            with self._send_lock:
+                self._sock = sock
+            try:
+                for line in sock.makefile("rb"):
+                    ev = json.loads(line)
+                    self.hub.deliver(ev["org_id"], ev.get("training_id"), render(ev))
+            except (OSError, ValueError):
+                pass
+            finally:
+                with self._send_lock:
+                    if self._sock is sock:
+                        self._sock = None
+                sock.close()
+
+
+def make_backend() -> LiveBackend:
+    if settings.LIVE_BACKEND == "broker":
+        return BrokerBackend(settings.LIVE_BROKER_ADDR)
+    return LocalBackend()
+
+
+hub = LiveHub(queue_size=settings.LIVE_QUEUE_SIZE)
+
+
+# ─────────────────────────────────────────────
+#   Session-hooks: verzamelen bij flush, publiceren na commit
+# ─────────────────────────────────────────────
+_module_orgs: OrderedDict[int, tuple[int, int]] = OrderedDict()   # module_id -> (training_id, org_id)
+_training_orgs: OrderedDict[int, int] = OrderedDict()             # training_id -> org_id
+_seq = count(1)
+
+
+def _remember(cache: OrderedDict, key: int, value: Any) -> None:
+    cache[key] = value
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _resolve_modules(session: Session, module_ids: set[int]) -> None:
+    missing = [m for m in module_ids if m not in _module_orgs]
+    if not missing:
+        return
+    rows = session.connection().execute(
+        select(models.Module.id, models.Module.training_id, models.Training.org_id)
+        .join(models.Training, models.Training.id == models.Module.training_id)
+        .where(models.Module.id.in_(missing))
+    )
+    for mid, tid, oid in rows:
+        _remember(_module_orgs, mid, (tid, oid))
+
+
+def _resolve_trainings(session: Session, training_ids: set[int]) -> None:
+    missing = [t for t in training_ids if t not in _training_orgs]
+    if not missing:
+        return
+    rows = session.connection().execute(
+        select(models.Training.id, models.Training.org_id).where(models.Training.id.in_(missing))
+    )
+    for tid, oid in rows:
+        _remember(_training_orgs, tid, oid)
+
+
+def queue_event(session: Session, ev: dict) -> None:
+    """Event laten publiceren zodra `session` commit (ook voor Core bulk-writes)."""
+    ev.setdefault("seq", next(_seq))
+    session.info.setdefault(_SESSION_KEY, []).append(ev)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session: Session, flush_context) -> None:
+    if not hub.wants_events():
+        return
+    progresses: list[models.Progress] = []
+    enrollments: list[models.Enrollment] = []
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, models.Progress):
+            progresses.append(obj)
+        elif isinstance(obj, models.Enrollment):
+            enrollments.append(obj)
+    if not progresses and not enrollments:
+        return
+
+    _resolve_modules(session, {p.module_id for p in progresses})
+    _resolve_trainings(session, {e.training_id for e in enrollments})
+    now = datetime.utcnow().isoformat()
+
+    for p in progresses:
+        tid, oid = _module_orgs.get(p.module_id, (None, None))
+        if oid is None:
+            continue
+        queue_event(session, {
+            "type": "progress", "org_id": oid, "training_id": tid,
+            "module_id": p.module_id, "user_id": p.user_id, "status": _value(p.status),
+            "percent": p.percent, "score": p.score, "at": now,
+        })
+    for e in enrollments:
+        oid = _training_orgs.get(e.training_id)
+        if oid is None:
+            continue
+        queue_event(session, {
+            "type": "enrollment", "org_id": oid, "training_id": e.training_id,
+            "user_id": e.user_id, "status": _value(e.status), "at": now,
+        })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    pending = session.info.pop(_SESSION_KEY, None)
+    if not pending:
+        return
+    for ev in pending:
+        try:
+            hub.publish(ev)
+        except Exception:  # een feed mag een commit nooit laten falen
+            log.exception("live event publiceren mislukt")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
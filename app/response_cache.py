@@ -0,0 +1,114 @@
+"""
+Kleine in-process cache voor complete JSON-responses (stats, trainingscatalogus).
+
+Een entry bewaart de body plus voorgecomprimeerde varianten (gzip, brotli),
+op het hoogste niveau omdat dat maar één keer betaald wordt. Een hit kost
+geen serialisatie en geen compressie: de CompressionMiddleware laat responses
+met Content-Encoding ongemoeid.
+
+Per worker; andere workers zien een wijziging pas na de TTL of na hun eigen
+invalidate(). De trainingscatalogus heeft daarom de catalog_version van de
+org in de key (en in de ETag): een write bumpt die voor alle workers tegelijk.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable, Optional
+
+from fastapi import Request, Response
+
+from app.compression import choose_encoding, compress, supported_encodings
+from app.core.config import settings
+from app.metrics import cache_result
+from app.responses import dumps
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    headers: dict[str, str]
+    expires: float
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def response(self, request: Request) -> Response:
+        headers = {**self.headers, "Vary": "Accept-Encoding"}
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        body = self.encoded.get(encoding) if encoding else None
+        if body is None:
+            body = self.body
+        else:
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=self.media_type, headers=headers)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match tegen een (zwakke) ETag; vergelijking zonder W/-prefix."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == bare for tag in header.split(","))
+
+
+def not_modified(etag: str, headers: Optional[dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        cache_result(f"response:{key[0]}" if isinstance(key, tuple) else "response", entry is not None)
+        return entry
+
+    def put(
+        self,
+        key: Hashable,
+        body: bytes,
+        ttl: float,
+        media_type: str = "application/json",
+        headers: Optional[dict[str, str]] = None,
+    ) -> CachedResponse:
+        entry = CachedResponse(body, media_type, dict(headers or {}), time.monotonic() + ttl)
+        if len(body) >= settings.COMPRESSION_MIN_SIZE:
+            # buiten de lock: compressie op hoog niveau kan even duren
+            entry.encoded = {enc: compress(body, enc, best=True) for enc in supported_encodings()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def put_json(self, key: Hashable, content: Any, ttl: float) -> CachedResponse:
+        return self.put(key, dumps(content), ttl)
+
+    def invalidate(self, *prefix: Hashable) -> None:
+        """Alle keys (tuples) die met `prefix` beginnen, bv. invalidate("catalog", org_id)."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k[:n] == prefix]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,105 @@
+"""
+Snelle JSON-responses voor grote lijsten.
+
+Standaard valideert FastAPI elk ORM-object tegen het response_model
+(from_attributes: getattr per veld, lazy loads) en serialiseert daarna.
+Voor de grote lijst-endpoints bouwen we de output in één keer uit
+row-tuples (Core select, alleen de benodigde kolommen) en geven die direct
+als FastJSONResponse terug; het response_model blijft staan voor de docs.
+
+orjson als het geïnstalleerd is (datetime/enum native), anders json.
+"""
+from __future__ import annotations
+
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Optional, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optionele dependency
+    orjson = None
+
+
+def _default(v: Any) -> Any:
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    if isinstance(v, enum.Enum):
+        return v.value
+    raise TypeError(f"Niet te serialiseren: {type(v).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def column_keys(columns: Sequence) -> list[str]:
+    return [c.key for c in columns]
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[set[str]]:
+    """`fields=id,name` -> set met veldnamen; None = alle velden."""
+    if not fields:
+        return None
+    names = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = sorted(names - set(allowed))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Onbekende velden: {', '.join(unknown)}")
+    return names or None
+
+
+def prune_columns(columns: Sequence, names: Optional[set[str]]) -> list:
+    """Alleen de gevraagde kolommen (in schemavolgorde), zodat de SELECT meekrimpt."""
+    if names is None:
+        return list(columns)
+    return [c for c in columns if c.key in names]
+
+
+def rows_as_dicts(keys: Sequence[str], rows: Iterable[Sequence]) -> list[dict]:
+    """Row-tuples (in de volgorde van `keys`) -> dicts; geen validatie, geen ORM."""
+    return [dict(zip(keys, row)) for row in rows]
+
+
+# ─────────────────────────────────────────────
+#   Kolommen per response-schema (zelfde velden en volgorde)
+# ─────────────────────────────────────────────
+_P, _U, _C, _T, _M = models.Progress, models.User, models.Company, models.Training, models.Module
+
+PROGRESS_COLUMNS = [_P.id, _P.user_id, _P.module_id, _P.status, _P.percent, _P.score,
+                    _P.started_at, _P.last_event_at, _P.completed_at]
+USER_COLUMNS = [_U.id, _U.name, _U.email, _U.is_active]
+COMPANY_COLUMNS = [_C.name, _C.kvk, _C.sector, _C.email_domain, _C.is_active, _C.id]
+TRAINING_COLUMNS = [_T.id, _T.org_id, _T.title, _T.description, _T.is_active, _T.created_at]
+MODULE_COLUMNS = [_M.id, _M.title, _M.content_url, _M.order_index, _M.duration_min]
+
+
+def with_modules(db: Session, trainings: list[dict]) -> list[dict]:
+    """Vult "modules" voor een pagina trainingen met één query (i.p.v. een lazy load per training)."""
+    by_training: dict[int, list[dict]] = {t["id"]: [] for t in trainings}
+    for t in trainings:
+        t["modules"] = by_training[t["id"]]
+    if by_training:
+        keys = column_keys(MODULE_COLUMNS)
+        rows = db.execute(
+            select(_M.training_id, *MODULE_COLUMNS)
+            .where(_M.training_id.in_(list(by_training)))
+            .order_by(_M.training_id, _M.order_index, _M.id)
+        ).all()
+        for training_id, *values in rows:
+            by_training[training_id].append(dict(zip(keys, values)))
+    return trainings
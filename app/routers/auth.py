@@ -1,6 +1,6 @@
 
 from typing import Any, Dict
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import JWTError
 from sqlalchemy.orm import Session
@@ -15,8 +15,13 @@ from app.security import (
     decode_token,
     oauth2_scheme,
 )
+from app.throttle import client_ip, login_throttle
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TracedRoute)
+# app/main.py mount alleen deze (onder /auth): /register is open signup met bcrypt
+# zonder throttle en staat bewust niet aan
+login_router = APIRouter(tags=["auth"], route_class=TracedRoute)
 
 # --- Helpers ---
 def get_current_user(
@@ -32,8 +37,8 @@ def get_current_user(
             user_id = int(sub)
         except (TypeError, ValueError):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
-    except JWTError:
-        # decode_token kan JWTError gooien; vang af en geef 401
+    except (JWTError, ValueError):
+        # decode_token verpakt JWTError in ValueError; vang beide af en geef 401
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     user = db.get(models.User, user_id)
@@ -45,25 +50,42 @@ def get_current_user(
     return user
 
 
-@router.post("/login", response_model=TokenOut)
+@login_router.post("/login", response_model=TokenOut)
 def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),  # username/password uit Authorize
     db: Session = Depends(get_db),
 ):
     email = form_data.username  # "username" veld bevat je e-mail
     password = form_data.password
 
+    # vóór bcrypt: een geweigerde poging kost geen CPU
+    ip = client_ip(request)
+    retry_after = login_throttle.check(ip, email)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Te veel inlogpogingen, probeer het later opnieuw",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     user = db.query(models.User).filter(models.User.email == email).first()
-   
-    if not user or not verify_password(password, user.password_hash):
+
+    # onbekend e-mailadres: verify_password doet een dummy-verificatie (gelijke kosten)
+    if not verify_password(password, user.password_hash if user else None):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive account")
 
+    login_throttle.succeeded(ip, email)
+
     token = create_access_token(subject=str(user.id))
     return TokenOut(access_token=token)
 
 
+router.include_router(login_router)
+
+
 @router.get("/me", response_model=UserOut)
 def me(current: models.User = Depends(get_current_user)):
 
@@ -1,17 +1,22 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
+from sqlalchemy import func
 
-from app.deps import get_db, get_current_user, require_role   # let op: uit deps importeren
+from app.deps import get_db, get_current_user, get_org_id, require_role   # let op: uit deps importeren
 from app import models
-from app.schemas.companies import CompanyCreate, CompanyOut, CompanyUpdate
+from app.company_index import company_index
+from app.pagination import paginate, set_page_headers
+from app.responses import COMPANY_COLUMNS, FastJSONResponse, column_keys, parse_fields, prune_columns, rows_as_dicts
+from app.schemas.companies import CompanyCreate, CompanyOut, CompanySuggestion, CompanyUpdate
+from app.tracing import TracedRoute
 
 router = APIRouter(
     prefix="/organizations/{slug}/companies",
     tags=["companies"],
     # MANAGER of hoger mag company-endpoints gebruiken
     dependencies=[Depends(require_role("MANAGER"))],  # eenvoud: strings; kan ook met Enum als je deps dat ondersteunt
+    route_class=TracedRoute,
 )
 
 def _get_org_or_404(db: Session, slug: str) -> models.Organization:
@@ -50,21 +55,28 @@ def create_company(
     db.add(company)
     db.commit()
     db.refresh(company)
+    company_index.upsert(company)
     return company
 
 # LIST (zoek/paginatie/sort), gescope’d op org
 @router.get("/", response_model=List[CompanyOut])
 def list_companies(
     slug: str,
+    request: Request,
     db: Session = Depends(get_db),
     q: Optional[str] = Query(None, description="Zoek in name/sector/domain"),
-    skip: int = Query(0, ge=0),
+    skip: int = Query(0, ge=0, description="Verouderd; gebruik cursor"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor van de vorige pagina"),
+    include_total: bool = Query(False, description="(Geschat) totaal in X-Total-Count"),
     sort: str = Query("created_at", description="name|sector|created_at|updated_at"),
     order: str = Query("desc", description="asc|desc"),
+    fields: Optional[str] = Query(None, description="Alleen deze velden, kommagescheiden (bv. id,name)"),
 ):
+    columns = prune_columns(COMPANY_COLUMNS, parse_fields(fields, column_keys(COMPANY_COLUMNS)))
+    keys = column_keys(columns)
     org = _get_org_or_404(db, slug)
-    query = db.query(models.Company).filter(models.Company.org_id == org.id)
+    query = db.query(*columns).filter(models.Company.org_id == org.id)
 
     if q:
         like = f"%{q}%"
@@ -75,16 +87,44 @@ def list_companies(
             (models.Company.email_domain.ilike(like))
         )
 
+    # sorteersleutels zijn NOT NULL, anders klopt de keyset-vergelijking niet
     sort_map = {
         "name": models.Company.name,
-        "sector": models.Company.sector,
+        "sector": func.coalesce(models.Company.sector, ""),
         "created_at": models.Company.created_at,
-        "updated_at": models.Company.updated_at,
+        "updated_at": func.coalesce(models.Company.updated_at, models.Company.created_at),
     }
-    sort_col = sort_map.get(sort, models.Company.created_at)
-    query = query.order_by(asc(sort_col) if order.lower() == "asc" else desc(sort_col))
-
-    return query.offset(skip).limit(limit).all()
+    if sort not in sort_map:
+        sort = "created_at"
+    sort_col = sort_map[sort]
+    descending = order.lower() != "asc"
+
+    if skip and not cursor:
+        ordering = (sort_col.desc(), models.Company.id.desc()) if descending else (sort_col.asc(), models.Company.id.asc())
+        rows = query.order_by(*ordering).offset(skip).limit(limit).all()
+        return FastJSONResponse(rows_as_dicts(keys, rows))
+
+    page = paginate(
+        db, query, key=sort_col, id_col=models.Company.id,
+        scope=f"companies:{sort}:{'desc' if descending else 'asc'}",
+        limit=limit, cursor=cursor, descending=descending, with_total=include_total,
+    )
+    response = FastJSONResponse(rows_as_dicts(keys, page.items))
+    set_page_headers(response, request, page)
+    return response
+
+# AUTOCOMPLETE: prefix op naam/sector/domein uit de in-memory index (geen query per toetsaanslag)
+@router.get("/suggest", response_model=List[CompanySuggestion])
+def suggest_companies(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    org_id: int = Depends(get_org_id),  # zelfde dependency als require_role: per request gecachet
+    db: Session = Depends(get_db),
+):
+    return [
+        CompanySuggestion(id=e.id, name=e.name, sector=e.sector, email_domain=e.email_domain, matched=field)
+        for e, field in company_index.suggest(db, org_id, q, limit)
+    ]
 
 # READ (detail)
 @router.get("/{company_id}", response_model=CompanyOut)
@@ -125,6 +165,7 @@ def update_company(
     db.add(company)
     db.commit()
     db.refresh(company)
+    company_index.upsert(company)
     return company
 
 # DELETE (alleen ADMIN of hoger? → optioneel extra check)
@@ -144,4 +185,5 @@ def delete_company(
 
     db.delete(company)
     db.commit()
+    company_index.remove(org.id, company_id)
     return None
\ No newline at end of file
@@ -0,0 +1,75 @@
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import get_db
+from app.deps import get_current_user, get_org_id, require_min_role
+from app import exports, models
+from app.jobs import enqueue
+from app.pagination import approximate_count
+from app.schemas.jobs import JobAcceptedOut
+from app.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/organizations/{slug}/exports",
+    tags=["exports"],
+    dependencies=[Depends(require_min_role(models.Role.ADMIN))],
+    route_class=TracedRoute,
+)
+
+
+# ─────────────────────────────────────────────
+#   Compliance-export (users x trainingen x modules)
+# ─────────────────────────────────────────────
+@router.get("/compliance", responses={
+    200: {"content": {"text/csv": {}, "application/vnd.apache.parquet": {}}},
+    202: {"model": JobAcceptedOut, "description": "Grote org: als job ingepland"},
+})
+def compliance_export(
+    slug: str,
+    format: Literal["csv", "parquet"] = Query("csv"),
+    training_id: Optional[int] = Query(None, description="Alleen deze training"),
+    mode: Literal["auto", "stream", "job"] = Query("auto", description="auto: job boven EXPORT_ASYNC_THRESHOLD rijen"),
+    org_id: int = Depends(get_org_id),
+    current: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Platte tabel met per user/module: company, training, enrollment, status,
+    percent, score en tijdstempels. Streamt direct vanaf de database.
+    """
+    if format == exports.PARQUET and not exports.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet-export is niet beschikbaar (pyarrow ontbreekt)")
+    if training_id is not None:
+        if not db.query(models.Training.id).filter_by(id=training_id, org_id=org_id).first():
+            raise HTTPException(status_code=404, detail="Training niet gevonden binnen deze organisatie")
+
+    name = exports.filename(slug, format)
+    if mode == "auto":
+        # tot net boven de drempel tellen: de standaard-cap (PAGINATION_COUNT_CAP)
+        # ligt ver onder EXPORT_ASYNC_THRESHOLD en zou nooit "job" opleveren
+        estimate, _ = approximate_count(
+            db, exports.compliance_query(org_id, training_id), cap=settings.EXPORT_ASYNC_THRESHOLD + 1
+        )
+        mode = "job" if estimate > settings.EXPORT_ASYNC_THRESHOLD else "stream"
+
+    if mode == "job":
+        # totaal telt de job zelf, zodat deze request snel terugkomt
+        job = enqueue(
+            db, "compliance_export",
+            params={"org_id": org_id, "training_id": training_id, "format": format, "filename": name},
+            org_id=org_id, created_by=current.id,
+        )
+        accepted = JobAcceptedOut(job_id=job.id, status=job.status, status_url=f"/jobs/{job.id}")
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=accepted.model_dump(mode="json"))
+
+    # de stream gebruikt een eigen sessie; deze niet openhouden
+    db.close()
+    return StreamingResponse(
+        exports.stream_export(org_id, format, training_id),
+        media_type=exports.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}"'},
+    )
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.deps import get_current_user
+from app import exports, models
+from app.jobs import request_cancel
+from app.schemas.jobs import JobOut
+from app.tracing import TracedRoute
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], route_class=TracedRoute)
+
+
+def _job_for_user(db: Session, job_id: int, user: models.User) -> models.Job:
+    job = db.get(models.Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job niet gevonden")
+    if job.created_by == user.id:
+        return job
+    # anders: ADMIN/OWNER van de org waar de job bij hoort
+    if job.org_id is not None:
+        role = (
+            db.query(models.Membership.role)
+            .filter_by(user_id=user.id, org_id=job.org_id)
+            .scalar()
+        )
+        if role in (models.Role.ADMIN, models.Role.OWNER):
+            return job
+    raise HTTPException(status_code=404, detail="Job niet gevonden")
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: int, db: Session = Depends(get_db), current: models.User = Depends(get_current_user)):
+    """Status en voortgang (percent) van een achtergrondjob."""
+    return _job_for_user(db, job_id, current)
+
+
+@router.post("/{job_id}/cancel", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+def cancel_job(job_id: int, db: Session = Depends(get_db), current: models.User = Depends(get_current_user)):
+    """Vraagt annulering aan; een lopende job stopt na de huidige chunk."""
+    job = _job_for_user(db, job_id, current)
+    if job.status not in (models.JobStatus.QUEUED, models.JobStatus.RUNNING):
+        raise HTTPException(status_code=409, detail=f"Job is al {job.status.value}")
+    request_cancel(db, job)
+    db.refresh(job)
+    return job
+
+
+@router.get("/{job_id}/download", response_class=FileResponse)
+def download_job_result(job_id: int, db: Session = Depends(get_db), current: models.User = Depends(get_current_user)):
+    """Resultaatbestand van een afgeronde export-job."""
+    job = _job_for_user(db, job_id, current)
+    if job.status is not models.JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    path = exports.export_path(job)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Geen bestand bij deze job")
+    return FileResponse(
+        path,
+        media_type=exports.MEDIA_TYPES[job.result["format"]],
+        filename=job.result["filename"],
+    )
@@ -0,0 +1,65 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import get_db
+from app.deps import get_org_id, require_min_role
+from app import models
+from app.realtime import hub
+from app.tracing import TracedRoute
+
+router = APIRouter(
+    prefix="/organizations/{slug}/live",
+    tags=["live"],
+    dependencies=[Depends(require_min_role(models.Role.MANAGER))],
+    route_class=TracedRoute,
+)
+
+
+async def _event_stream(org_id: int, training_id: Optional[int]):
+    sub = hub.subscribe(org_id, training_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), timeout=settings.LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # houdt proxies/load balancers wakker
+                yield ": ping\n\n"
+                continue
+            yield message
+            if sub.dropped and sub.queue.empty():
+                yield "event: dropped\ndata: {}\n\n"
+                return
+    finally:
+        hub.unsubscribe(sub)
+
+
+# ─────────────────────────────────────────────
+#   Live progress/enrollment feed (Server-Sent Events)
+# ─────────────────────────────────────────────
+@router.get("/")
+def live_feed(
+    slug: str,
+    training_id: Optional[int] = Query(None, description="Alleen events van deze training"),
+    org_id: int = Depends(get_org_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Pusht `progress`- en `enrollment`-events zodra ze gecommit zijn.
+    Vervangt het pollen van /stats tijdens een trainingssessie.
+    """
+    if training_id is not None:
+        if not db.query(models.Training.id).filter_by(id=training_id, org_id=org_id).first():
+            raise HTTPException(status_code=404, detail="Training niet gevonden binnen deze organisatie")
+    # geen DB-verbinding vasthouden zolang de stream openstaat
+    db.close()
+    return StreamingResponse(
+        _event_stream(org_id, training_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
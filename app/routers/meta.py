@@ -1,12 +1,23 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.health import readiness
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="", tags=["meta"])
+router = APIRouter(prefix="", tags=["meta"], route_class=TracedRoute)
 
+# async: liveness en readiness moeten antwoorden ook als de threadpool vol zit
 @router.get("/health")
-def health():
+async def health():
+    """Liveness: het proces draait en de event loop antwoordt. Bewust zonder DB."""
     return {"status": "ok"}
 
+@router.get("/ready")
+async def ready():
+    """Readiness: DB-roundtrip, pool-bezetting en loop-/threadpool-lag; 503 bij verzadiging."""
+    ok, report = await readiness()
+    return JSONResponse(report, status_code=200 if ok else 503, headers={"Cache-Control": "no-store"})
+
 @router.get("/version")
 def version():
     return {
@@ -0,0 +1,20 @@
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app import metrics
+from app.core.config import settings
+from app.tracing import TracedRoute
+
+router = APIRouter(tags=["meta"], route_class=TracedRoute)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def scrape(authorization: str | None = Header(None)):
+    """Prometheus-tekstformaat. Met METRICS_TOKEN gezet alleen met `Authorization: Bearer <token>`."""
+    if settings.METRICS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=401, detail="Niet geautoriseerd")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -5,8 +5,9 @@ from app import models
 from app.schemas import OrgCreate, OrgOut
 from app.deps import get_current_user, require_role
 from app.db import get_db
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="/orgs", tags=["organizations"])
+router = APIRouter(prefix="/orgs", tags=["organizations"], route_class=TracedRoute)
 
 @router.post("", response_model=OrgOut)
 def create_org(payload: OrgCreate, db: Session = Depends(get_db), user: models.User = Depends(get_current_user)):
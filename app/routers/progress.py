@@ -1,17 +1,21 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.deps import get_current_user, require_membership
 from app import models
+from app.pagination import paginate, set_page_headers
+from app.responses import PROGRESS_COLUMNS, TRAINING_COLUMNS, FastJSONResponse, column_keys, rows_as_dicts, with_modules
 from app.schemas.progress import ProgressUpdateIn, ProgressOut
 from app.schemas.trainings import TrainingCreate, TrainingOut, ModuleCreate, ModuleOut, EnrollUsersIn, EnrollmentOut, UserTrainingOut
+from app.tracing import TracedRoute
 
 
-router = APIRouter(prefix="/progress", tags=["progress"])
+router = APIRouter(prefix="/progress", tags=["progress"], route_class=TracedRoute)
 
 
 # ─────────────────────────────────────────────
@@ -84,19 +88,19 @@ def my_trainings(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    enrolls = (
-        db.query(models.Enrollment)
-        .filter(models.Enrollment.user_id == current_user.id)
-        .all()
-    )
-
-    out: list[UserTrainingOut] = []
-    for e in enrolls:
-        if not e.training:
-            continue
-        tr_out = TrainingOut.model_validate(e.training)  # ⬅️ expliciet casten naar schema
-        out.append(UserTrainingOut(training=tr_out, status=e.status))
-    return out
+    # één query voor trainingen + status, één voor alle modules; geen tweede validatie
+    E, T = models.Enrollment, models.Training
+    rows = db.execute(
+        select(E.status, *TRAINING_COLUMNS)
+        .join(T, T.id == E.training_id)
+        .where(E.user_id == current_user.id)
+        .order_by(E.id)
+    ).all()
+    keys = column_keys(TRAINING_COLUMNS)
+    trainings = with_modules(db, [dict(zip(keys, r[1:])) for r in rows])
+    return FastJSONResponse([
+        {"training": tr, "status": r[0]} for r, tr in zip(rows, trainings)
+    ])
 
 
 
@@ -105,9 +109,17 @@ def my_trainings(
 # ─────────────────────────────────────────────
 @router.get("/org/{slug}", response_model=List[ProgressOut],
             dependencies=[Depends(require_membership())])
-def org_progress(slug: str, db: Session = Depends(get_db)):
+def org_progress(
+    slug: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor van de vorige pagina"),
+    include_total: bool = Query(False, description="(Geschat) totaal in X-Total-Count"),
+):
     """
-    (Optioneel) Haalt alle voortgangsrecords binnen een organisatie op.
+    (Optioneel) Haalt de voortgangsrecords binnen een organisatie op, per pagina
+    (volgende pagina via X-Next-Cursor).
     Alleen leden mogen dit endpoint gebruiken.
     """
     org_id = (
@@ -118,11 +130,16 @@ def org_progress(slug: str, db: Session = Depends(get_db)):
     if not org_id:
         raise HTTPException(status_code=404, detail="Organisatie niet gevonden")
 
-    progresses = (
-        db.query(models.Progress)
+    query = (
+        db.query(*PROGRESS_COLUMNS)
         .join(models.Module, models.Module.id == models.Progress.module_id)
         .join(models.Training, models.Training.id == models.Module.training_id)
         .filter(models.Training.org_id == org_id)
-        .all()
     )
-    return progresses
+    page = paginate(
+        db, query, key=models.Progress.id, id_col=models.Progress.id,
+        scope="org_progress:id:asc", limit=limit, cursor=cursor, with_total=include_total,
+    )
+    response = FastJSONResponse(rows_as_dicts(column_keys(PROGRESS_COLUMNS), page.items))
+    set_page_headers(response, request, page)
+    return response
@@ -1,12 +1,16 @@
 # app/routers/projects.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from app import models
 from app.schemas import ProjectCreate, ProjectOut
 from app.deps import require_role
 from app.db import get_db
+from app.pagination import paginate, set_page_headers
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="/projects", tags=["projects"])
+router = APIRouter(prefix="/projects", tags=["projects"], route_class=TracedRoute)
 
 @router.post("", response_model=ProjectOut)
 def create_project(payload: ProjectCreate,
@@ -17,7 +21,14 @@ def create_project(payload: ProjectCreate,
     return ProjectOut(id=project.id, name=project.name, description=project.description)
 
 @router.get("", response_model=list[ProjectOut])
-def list_projects(ctx = Depends(require_role(models.Role.OWNER, models.Role.ADMIN, models.Role.MANAGER, models.Role.EMPLOYEE)),
+def list_projects(request: Request, response: Response,
+                  ctx = Depends(require_role(models.Role.OWNER, models.Role.ADMIN, models.Role.MANAGER, models.Role.EMPLOYEE)),
+                  limit: int = Query(100, ge=1, le=500),
+                  cursor: Optional[str] = Query(None),
                   db: Session = Depends(get_db)):
-    rows = db.query(models.Project).filter_by(org_id=ctx["org_id"]).all()
+    page = paginate(db, db.query(models.Project).filter_by(org_id=ctx["org_id"]),
+                    key=models.Project.id, id_col=models.Project.id, scope="projects:id:asc",
+                    limit=limit, cursor=cursor)
+    set_page_headers(response, request, page)
+    rows = page.items
     return [ProjectOut(id=p.id, name=p.name, description=p.description) for p in rows]
@@ -1,14 +1,17 @@
 from types import SimpleNamespace
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func, case
 
+from app.core.config import settings
 from app.database import get_db
 from app.deps import get_org_id, require_min_role
 from app import models
+from app.response_cache import response_cache
 from app.schemas.stats import OrgStatsOut, TrainingStatsOut
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="/organizations/{slug}/stats", tags=["stats"])
+router = APIRouter(prefix="/organizations/{slug}/stats", tags=["stats"], route_class=TracedRoute)
 
 def _ensure_training_in_org(db: Session, org_id: int, training_id: int) -> models.Training:
     tr = db.query(models.Training).filter_by(id=training_id, org_id=org_id).first()
@@ -28,8 +31,13 @@ def _safe_first(query, defaults: dict) -> object:
 
 @router.get("/", response_model=OrgStatsOut,
             dependencies=[Depends(require_min_role(models.Role.MANAGER))])
-def org_stats(slug: str, db: Session = Depends(get_db)):
+def org_stats(slug: str, request: Request, db: Session = Depends(get_db)):
     org_id = get_org_id(slug, db)
+    # dashboards vragen dit vaak op: korte TTL, body staat al gecomprimeerd klaar
+    key = ("stats", org_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
 
     # 1) actieve members binnen org
     active_members = (
@@ -96,7 +104,7 @@ def org_stats(slug: str, db: Session = Depends(get_db)):
     enroll_done_cnt = int(getattr(q_enr, "done_cnt", 0) or 0)
     enrollments_completed_rate = (enroll_done_cnt / total_enroll) if total_enroll else 0.0
 
-    return OrgStatsOut(
+    out = OrgStatsOut(
         org_id=org_id,
         active_members=active_members,
         companies_count=companies_count,
@@ -106,11 +114,16 @@ def org_stats(slug: str, db: Session = Depends(get_db)):
         progress_completed_rate=progress_completed_rate,
         enrollments_completed_rate=enrollments_completed_rate,
     )
+    return response_cache.put_json(key, out.model_dump(mode="json"), settings.STATS_CACHE_TTL_SECONDS).response(request)
 
 @router.get("/trainings/{training_id}", response_model=TrainingStatsOut,
             dependencies=[Depends(require_min_role(models.Role.MANAGER))])
-def training_stats(slug: str, training_id: int, db: Session = Depends(get_db)):
+def training_stats(slug: str, training_id: int, request: Request, db: Session = Depends(get_db)):
     org_id = get_org_id(slug, db)
+    key = ("stats", org_id, "training", training_id)
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
     _ensure_training_in_org(db, org_id, training_id)
 
     # enrolled users
@@ -160,7 +173,7 @@ def training_stats(slug: str, training_id: int, db: Session = Depends(get_db)):
     enroll_done_cnt = int(getattr(q_enr, "done_cnt", 0) or 0)
     enrollments_completed_rate = (enroll_done_cnt / total_enroll) if total_enroll else 0.0
 
-    return TrainingStatsOut(
+    out = TrainingStatsOut(
         org_id=org_id,
         training_id=training_id,
         enrolled_users=enrolled_users,
@@ -169,3 +182,4 @@ def training_stats(slug: str, training_id: int, db: Session = Depends(get_db)):
         progress_completed_rate=progress_completed_rate,
         enrollments_completed_rate=enrollments_completed_rate,
     )
+    return response_cache.put_json(key, out.model_dump(mode="json"), settings.STATS_CACHE_TTL_SECONDS).response(request)
@@ -1,19 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, delete, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import zlib
+
+from app.core.config import settings
 
 from app.database import get_db
 from app.deps import get_current_user, require_role, require_min_role
 from app import models
+from app.enrollment import audience_query, backfill_progress, enroll_audience, enroll_emails, load_enrollments
+from app.jobs import enqueue
+from app.pagination import PAGE_HEADERS, paginate, set_page_headers
+from app.response_cache import etag_matches, not_modified, response_cache
+from app.responses import (
+    TRAINING_COLUMNS, FastJSONResponse, column_keys, parse_fields, prune_columns, rows_as_dicts, with_modules,
+)
+from app.schemas.jobs import JobAcceptedOut
 from app.schemas.trainings import (
-    TrainingCreate, TrainingOut, ModuleCreate, ModuleOut,
-    EnrollUsersIn, EnrollmentOut
+    TrainingCreate, TrainingOut, ModuleCreate, ModuleOut, ModuleReorderIn,
+    EnrollUsersIn, EnrollUsersOut, EnrollAudienceIn, EnrollAudienceOut
 )
+from app.tracing import TracedRoute
 
 router = APIRouter(  
     prefix="/organizations/{slug}/trainings",
     tags=["trainings"],
     dependencies=[Depends(require_min_role(models.Role.MANAGER))],  # of require_role(...)
+    route_class=TracedRoute,
 )
 
 def _org(db: Session, slug: str) -> models.Organization:
@@ -22,6 +37,17 @@ def _org(db: Session, slug: str) -> models.Organization:
         raise HTTPException(404, "Organisatie niet gevonden")
     return org
 
+def _bump_catalog(db: Session, org: models.Organization) -> None:
+    """Nieuwe catalogusversie in dezelfde transactie als de wijziging (geldt voor alle workers)."""
+    O = models.Organization
+    db.execute(update(O).where(O.id == org.id).values(catalog_version=O.catalog_version + 1))
+
+CATALOG_CACHE_CONTROL = "private, no-cache"  # altijd revalideren; met ETag is dat een 304
+
+def _catalog_etag(org: models.Organization, request: Request) -> str:
+    # zwak: gzip en identity delen hem; de query (limit/cursor/fields) hoort bij de representatie
+    return f'W/"{org.id}-{org.catalog_version}-{zlib.crc32(request.url.query.encode()):08x}"'
+
 @router.post("/", response_model=TrainingOut, status_code=status.HTTP_201_CREATED)
 def create_training(slug: str, data: TrainingCreate, db: Session = Depends(get_db)):
     org = _org(db, slug)
@@ -32,28 +58,119 @@ def create_training(slug: str, data: TrainingCreate, db: Session = Depends(get_d
             training_id=tr.id, title=m.title, content_url=m.content_url,
             order_index=m.order_index or i, duration_min=m.duration_min or 10
         ))
+    _bump_catalog(db, org)
     db.commit(); db.refresh(tr)
     return tr
 
 @router.get("/", response_model=List[TrainingOut])
-def list_trainings(slug: str, db: Session = Depends(get_db)):
+def list_trainings(
+    slug: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor van de vorige pagina"),
+    include_total: bool = Query(False, description="(Geschat) totaal in X-Total-Count"),
+    fields: Optional[str] = Query(None, description="Alleen deze velden, kommagescheiden (bv. id,title of id,modules)"),
+):
+    names = parse_fields(fields, column_keys(TRAINING_COLUMNS) + ["modules"])
+    # modules alleen laden als ze gevraagd zijn; daarvoor is het training-id nodig
+    want_modules = names is None or "modules" in names
+    columns = prune_columns(TRAINING_COLUMNS, names if names is None or not want_modules else names | {"id"})
     org = _org(db, slug)
-    return (db.query(models.Training)
-              .filter_by(org_id=org.id, is_active=True)
-              .order_by(models.Training.created_at.desc())
-              .all())
+    # catalogus verandert zelden en wordt veel opgevraagd: ETag op de versie, complete response gecachet
+    etag = _catalog_etag(org, request)
+    if etag_matches(request, etag):
+        return not_modified(etag, {"Cache-Control": CATALOG_CACHE_CONTROL})
+    key = ("catalog", org.id, org.catalog_version, str(request.url))
+    cached = response_cache.get(key)
+    if cached is not None:
+        return cached.response(request)
+    query = db.query(*columns).filter(
+        models.Training.org_id == org.id, models.Training.is_active.is_(True)
+    )
+    page = paginate(
+        db, query, key=models.Training.created_at, id_col=models.Training.id,
+        scope="trainings:created_at:desc", limit=limit, cursor=cursor,
+        descending=True, with_total=include_total,
+    )
+    trainings = rows_as_dicts(column_keys(columns), page.items)
+    if want_modules:
+        with_modules(db, trainings)
+        if "id" not in (names or {"id"}):
+            for t in trainings:
+                del t["id"]
+    response = FastJSONResponse(trainings)
+    set_page_headers(response, request, page)
+    headers = {h: response.headers[h] for h in PAGE_HEADERS if h in response.headers}
+    headers.update({"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL})
+    return response_cache.put(key, response.body, settings.CATALOG_CACHE_TTL_SECONDS, headers=headers).response(request)
 
-@router.post("/{training_id}/modules", response_model=ModuleOut, status_code=status.HTTP_201_CREATED)
-def add_module(slug: str, training_id: int, body: ModuleCreate, db: Session = Depends(get_db)):
-    org = _org(db, slug)
+def _training(db: Session, org: models.Organization, training_id: int) -> models.Training:
     tr = db.query(models.Training).filter_by(id=training_id, org_id=org.id).first()
     if not tr:
         raise HTTPException(404, "Training niet gevonden")
+    return tr
+
+@router.post("/{training_id}/modules", response_model=ModuleOut, status_code=status.HTTP_201_CREATED)
+def add_module(slug: str, training_id: int, body: ModuleCreate, db: Session = Depends(get_db)):
+    org = _org(db, slug)
+    tr = _training(db, org, training_id)
+    if db.query(models.Module.id).filter_by(training_id=tr.id, order_index=body.order_index).first():
+        raise HTTPException(409, "Er bestaat al een module met deze order_index")
     mod = models.Module(training_id=tr.id, **body.model_dump())
-    db.add(mod); db.commit(); db.refresh(mod)
+    db.add(mod); db.flush()
+    # bestaande enrollees krijgen direct een progress-rij (één INSERT ... SELECT)
+    backfill_progress(db, tr.id, module_id=mod.id)
+    _bump_catalog(db, org)
+    db.commit(); db.refresh(mod)
     return mod
 
-@router.post("/{training_id}/enroll", response_model=List[EnrollmentOut], status_code=status.HTTP_201_CREATED)
+@router.put("/{training_id}/modules/order", response_model=List[ModuleOut])
+def reorder_modules(slug: str, training_id: int, body: ModuleReorderIn, db: Session = Depends(get_db)):
+    org = _org(db, slug)
+    tr = _training(db, org, training_id)
+    current = {mid for (mid,) in db.query(models.Module.id).filter_by(training_id=tr.id)}
+    if len(body.module_ids) != len(set(body.module_ids)) or set(body.module_ids) != current:
+        raise HTTPException(400, "module_ids moet precies alle modules van de training bevatten")
+
+    if body.module_ids:
+        # eerst naar negatief (kan niet botsen met 1..n), dan in één CASE naar de nieuwe plek
+        M = models.Module
+        db.execute(update(M).where(M.training_id == tr.id).values(order_index=-M.order_index))
+        db.execute(
+            update(M).where(M.training_id == tr.id)
+            .values(order_index=case({mid: i for i, mid in enumerate(body.module_ids, start=1)}, value=M.id))
+        )
+    _bump_catalog(db, org)
+    db.commit()
+    return (db.query(models.Module)
+              .filter_by(training_id=tr.id)
+              .order_by(models.Module.order_index)
+              .all())
+
+@router.delete("/{training_id}/modules/{module_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_module(slug: str, training_id: int, module_id: int, db: Session = Depends(get_db)):
+    org = _org(db, slug)
+    tr = _training(db, org, training_id)
+    idx = db.query(models.Module.order_index).filter_by(id=module_id, training_id=tr.id).scalar()
+    if idx is None:
+        raise HTTPException(404, "Module niet gevonden")
+
+    M = models.Module
+    db.execute(delete(models.Progress).where(models.Progress.module_id == module_id))
+    db.execute(delete(M).where(M.id == module_id))
+    # gat dichten zonder uq_module_training_order te raken: via negatief terug naar positief
+    db.execute(
+        update(M).where(M.training_id == tr.id, M.order_index > idx)
+        .values(order_index=-(M.order_index - 1))
+    )
+    db.execute(update(M).where(M.training_id == tr.id, M.order_index < 0).values(order_index=-M.order_index))
+    _bump_catalog(db, org)
+    db.commit()
+    return None
+
+@router.post("/{training_id}/enroll", response_model=EnrollUsersOut, status_code=status.HTTP_201_CREATED,
+             responses={202: {"model": JobAcceptedOut, "description": "Grote payload: als job ingepland"}})
 def enroll_users(slug: str, training_id: int, body: EnrollUsersIn,
                  db: Session = Depends(get_db), current=Depends(get_current_user)):
     org = _org(db, slug)
@@ -61,22 +178,59 @@ def enroll_users(slug: str, training_id: int, body: EnrollUsersIn,
     if not tr:
         raise HTTPException(404, "Training niet gevonden")
 
-    results: list[models.Enrollment] = []
-    for email in body.emails:
-        user = db.query(models.User).filter_by(email=email).first()
-        if not user:
-            continue
-        existing = db.query(models.Enrollment).filter_by(user_id=user.id, training_id=tr.id).first()
-        if existing:
-            results.append(existing); continue
-        enr = models.Enrollment(
-            user_id=user.id, training_id=tr.id, status=models.EnrollmentStatus.ASSIGNED,
-            assigned_by=getattr(current, "id", None), due_at=body.due_at
+    if len(body.emails) > settings.ENROLL_ASYNC_THRESHOLD:
+        job = enqueue(
+            db, "enroll_users",
+            params={
+                "training_id": tr.id,
+                "emails": body.emails,
+                "due_at": body.due_at.isoformat() if body.due_at else None,
+                "assigned_by": getattr(current, "id", None),
+            },
+            total=len(body.emails), org_id=org.id, created_by=getattr(current, "id", None),
         )
-        db.add(enr)
-        for mod in tr.modules:
-            db.add(models.Progress(user_id=user.id, module_id=mod.id))
-        results.append(enr)
+        accepted = JobAcceptedOut(job_id=job.id, status=job.status, status_url=f"/jobs/{job.id}")
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=accepted.model_dump(mode="json"))
+
+    # set-based: aantal statements hangt niet af van het aantal e-mails/modules
+    result = enroll_emails(db, tr, body.emails, due_at=body.due_at, assigned_by=getattr(current, "id", None))
+    db.commit()
+    load_enrollments(db, result, tr.id)
+    return {
+        "enrollments": result.enrollments,
+        "created": result.created,
+        "already_enrolled": result.already_enrolled,
+        "unknown_emails": result.unknown_emails,
+        "duplicates": result.duplicates,
+    }
+
+@router.post("/{training_id}/enroll/audience", response_model=EnrollAudienceOut, status_code=status.HTTP_201_CREATED)
+def enroll_by_audience(slug: str, training_id: int, body: EnrollAudienceIn,
+                       db: Session = Depends(get_db), current=Depends(get_current_user)):
+    """Hele org, alle users van een company (via email_domain) of alle leden met een rol."""
+    org = _org(db, slug)
+    tr = db.query(models.Training).filter_by(id=training_id, org_id=org.id).first()
+    if not tr:
+        raise HTTPException(404, "Training niet gevonden")
+
+    role, domain = None, None
+    if body.audience == "role":
+        if body.role is None:
+            raise HTTPException(400, "role is verplicht bij audience='role'")
+        role = body.role
+    elif body.audience == "company":
+        if body.company_id is None:
+            raise HTTPException(400, "company_id is verplicht bij audience='company'")
+        company = db.query(models.Company).filter_by(id=body.company_id, org_id=org.id).first()
+        if not company:
+            raise HTTPException(404, "Company niet gevonden binnen deze organisatie")
+        if not company.email_domain:
+            raise HTTPException(400, "Company heeft geen email_domain")
+        domain = company.email_domain
 
+    enrolled, progress_rows = enroll_audience(
+        db, tr, audience_query(org.id, role=role, email_domain=domain),
+        due_at=body.due_at, assigned_by=getattr(current, "id", None),
+    )
     db.commit()
-    return [db.get(models.Enrollment, e.id) for e in results]
+    return EnrollAudienceOut(enrolled=enrolled, progress_rows=progress_rows)
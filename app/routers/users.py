@@ -3,17 +3,23 @@ from __future__ import annotations
 
 from typing import List, Optional, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import asc, desc, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app import user_import
+from app.core.config import settings
 from app.db import get_db
 from app.deps import get_current_user, require_role
 from app.models import User, Role
-from app.schemas.users import UserCreate, UserOut, UserUpdate
+from app.pagination import paginate, set_page_headers
+from app.responses import USER_COLUMNS, FastJSONResponse, column_keys, parse_fields, prune_columns, rows_as_dicts
+from app.search import apply_search
+from app.schemas.users import UserCreate, UserImportOut, UserOut, UserUpdate
 from app.security import hash_password
+from app.tracing import TracedRoute
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], route_class=TracedRoute)
 
 
 # Admin/Owner: create user
@@ -44,6 +50,48 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
     return new_user
 
 
+# Admin/Owner: bulk-import (CSV of NDJSON als request-body, wordt gestreamd)
+@router.post("/import", response_model=UserImportOut)
+async def import_users(
+    request: Request,
+    role: Role = Query(Role.EMPLOYEE, description="Rol voor rijen zonder role-kolom"),
+    update_existing: bool = Query(False, description="Naam/wachtwoord van bestaande leden bijwerken; accounts buiten de org zijn altijd een rijfout"),
+    ctx=Depends(require_role(Role.ADMIN, Role.OWNER)),
+    db: Session = Depends(get_db),
+):
+    """
+    Kolommen/velden: email, name, en optioneel password, password_hash (bcrypt)
+    en role. Zonder password/password_hash wordt de user uitgenodigd (kan nog
+    niet inloggen). Elke user wordt lid van de organisatie (`slug`).
+    Content-Type text/csv of application/x-ndjson.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        fmt = user_import.CSV
+    elif content_type in ("application/x-ndjson", "application/jsonl", "application/ndjson"):
+        fmt = user_import.NDJSON
+    else:
+        raise HTTPException(status_code=415, detail="Gebruik text/csv of application/x-ndjson")
+
+    importer = user_import.UserImporter(
+        db, ctx["org_id"], default_role=role, max_role=ctx["role"], update_existing=update_existing,
+    )
+    batch: list = []
+    async for record in user_import.iter_records(request.stream(), fmt):
+        # deze rij meegeteld: meer dan IMPORT_MAX_ROWS?
+        if importer.report.rows + len(batch) + 1 > settings.IMPORT_MAX_ROWS:
+            # eerdere batches zijn al gecommit: stoppen en melden i.p.v. 413
+            importer.report.add_error(record[0], None, [f"Maximaal {settings.IMPORT_MAX_ROWS} rijen per import; rest niet verwerkt"])
+            break
+        batch.append(record)
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await run_in_threadpool(importer.process, batch)
+            batch = []
+    if batch:
+        await run_in_threadpool(importer.process, batch)
+    return importer.report
+
+
 # Admin/Owner: list users (zoeken/sorteren/pagineren)
 @router.get(
     "",
@@ -51,27 +99,47 @@ def create_user(payload: UserCreate, db: Session = Depends(get_db)):
     dependencies=[Depends(require_role(Role.ADMIN, Role.OWNER))],
 )
 def list_users(
+    request: Request,
     db: Session = Depends(get_db),
     q: Optional[str] = Query(None, description="Zoek op naam of e-mail"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
-    order_by: Literal["id", "name", "email"] = Query("id"),
+    offset: int = Query(0, ge=0, description="Verouderd; gebruik cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor van de vorige pagina"),
+    include_total: bool = Query(False, description="(Geschat) totaal in X-Total-Count"),
+    order_by: Literal["id", "name", "email", "relevance"] = Query("id", description="relevance: alleen met q"),
     order_dir: Literal["asc", "desc"] = Query("asc"),
+    fields: Optional[str] = Query(None, description="Alleen deze velden, kommagescheiden (bv. id,email)"),
 ):
-    query = db.query(User)
-
+    columns = prune_columns(USER_COLUMNS, parse_fields(fields, column_keys(USER_COLUMNS)))
+    query = db.query(*columns)
+    id_key = User.id
+    keys = column_keys(columns)
+
+    if q and order_by == "relevance":
+        # ranking is geen stabiele keyset-sleutel: top-N met offset
+        query, _ = apply_search(db, query, q, by_relevance=True)
+        return FastJSONResponse(rows_as_dicts(keys, query.offset(offset).limit(limit).all()))
     if q:
-        like = f"%{q}%"
-        # Case-insensitive match via LOWER(...).LIKE(...) (werkt overal)
-        query = query.filter(
-            func.lower(User.name).like(func.lower(like)) |
-            func.lower(User.email).like(func.lower(like))
-        )
-
-    col = {"id": User.id, "name": User.name, "email": User.email}[order_by]
-    query = query.order_by(asc(col) if order_dir == "asc" else desc(col))
-
-    return query.offset(offset).limit(limit).all()
+        # geïndexeerd zoeken (FTS5 / pg_trgm), zie app/search.py
+        query, id_key = apply_search(db, query, q)
+    if order_by == "relevance":
+        order_by = "id"
+
+    col = {"id": id_key, "name": User.name, "email": User.email}[order_by]
+    tiebreak = id_key if order_by == "id" else User.id
+
+    if offset and not cursor:
+        # oude offset-paginatie blijft werken, nu met stabiele tiebreak op id
+        order = (col.asc(), tiebreak.asc()) if order_dir == "asc" else (col.desc(), tiebreak.desc())
+        return FastJSONResponse(rows_as_dicts(keys, query.order_by(*order).offset(offset).limit(limit).all()))
+
+    page = paginate(
+        db, query, key=col, id_col=tiebreak, scope=f"users:{order_by}:{order_dir}",
+        limit=limit, cursor=cursor, descending=order_dir == "desc", with_total=include_total,
+    )
+    response = FastJSONResponse(rows_as_dicts(keys, page.items))
+    set_page_headers(response, request, page)
+    return response
 
 
 # Self: eigen profiel ophalen
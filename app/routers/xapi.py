@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import get_db
+from app.deps import get_org_id, require_min_role
+from app import models, xapi
+from app.schemas.xapi import StatementBatch
+from app.tracing import TracedRoute
+
+XAPI_VERSION = "1.0.3"
+
+router = APIRouter(
+    prefix="/organizations/{slug}/xapi",
+    tags=["xapi"],
+    # content-koppelingen posten met een service-account met ADMIN-rol
+    dependencies=[Depends(require_min_role(models.Role.ADMIN))],
+    route_class=TracedRoute,
+)
+
+
+# ─────────────────────────────────────────────
+#   xAPI statements (LRS-subset)
+# ─────────────────────────────────────────────
+@router.post("/statements", status_code=status.HTTP_200_OK, response_model=list[str])
+async def post_statements(
+    request: Request,
+    org_id: int = Depends(get_org_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Neemt één statement of een array aan en zet ze in de staging-tabel.
+    Omzetten naar Progress gebeurt asynchroon door de xAPI-worker.
+    """
+    body = await request.body()
+    try:
+        parsed = StatementBatch.validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.errors(include_url=False, include_context=False))
+    statements = parsed if isinstance(parsed, list) else [parsed]
+    if len(statements) > settings.XAPI_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Maximaal {settings.XAPI_MAX_BATCH} statements per request")
+
+    try:
+        ids = await run_in_threadpool(xapi.stage_statements, db, org_id, statements)
+    except xapi.Backpressure:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="xAPI-verwerking loopt achter, probeer later opnieuw",
+            headers={"Retry-After": "5"},
+        )
+    xapi.worker.wake()
+    return ids
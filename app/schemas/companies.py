@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field
 
 class CompanyBase(BaseModel):
@@ -26,3 +26,11 @@ class CompanyOut(CompanyBase):
         from_attributes = True
 
 
+
+
+class CompanySuggestion(BaseModel):
+    id: int
+    name: str
+    sector: Optional[str] = None
+    email_domain: Optional[str] = None
+    matched: Literal["name", "sector", "email_domain"]
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, computed_field
+
+from app.models import JobStatus
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    total: int
+    done: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
+
+    @computed_field
+    @property
+    def percent(self) -> float:
+        if self.status is JobStatus.SUCCEEDED:
+            return 100.0
+        return round(100.0 * self.done / self.total, 1) if self.total else 0.0
+
+
+class JobAcceptedOut(BaseModel):
+    job_id: int
+    status: JobStatus
+    status_url: str
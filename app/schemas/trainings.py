@@ -1,9 +1,9 @@
 # app/schemas/trainings.py
 from __future__ import annotations
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
-from app.models import EnrollmentStatus
+from app.models import EnrollmentStatus, Role
 
 # ── Module ─────────────────────────────────────────────────────────────
 class ModuleCreate(BaseModel):
@@ -22,6 +22,9 @@ class ModuleOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ModuleReorderIn(BaseModel):
+    module_ids: List[int]   # alle modules van de training, in de nieuwe volgorde
+
 # ── Training ───────────────────────────────────────────────────────────
 class TrainingCreate(BaseModel):
     title: str
@@ -58,6 +61,23 @@ class EnrollmentOut(BaseModel):
     class Config:
         from_attributes = True
 
+class EnrollUsersOut(BaseModel):
+    enrollments: List[EnrollmentOut]
+    created: int
+    already_enrolled: int
+    unknown_emails: List[str] = []
+    duplicates: List[str] = []
+
+class EnrollAudienceIn(BaseModel):
+    audience: Literal["org", "company", "role"]
+    company_id: Optional[int] = None      # verplicht bij audience="company"
+    role: Optional[Role] = None           # verplicht bij audience="role"
+    due_at: Optional[datetime] = None
+
+class EnrollAudienceOut(BaseModel):
+    enrolled: int
+    progress_rows: int
+
 # ── Overzicht voor progress-router ─────────────────────────────────────
 class UserTrainingOut(BaseModel):
     training: TrainingOut
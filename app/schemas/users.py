@@ -1,5 +1,7 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import List, Optional
+
+from app.models import Role
 
 class UserOut(BaseModel):
     id: int
@@ -19,3 +21,40 @@ class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     password: Optional[str] = Field(None, min_length=8)
     model_config = {"extra": "ignore"}
+
+
+class UserImportRow(UserCreate):
+    """Eén rij van POST /users/import; zonder password en password_hash wordt het een uitnodiging."""
+    password: Optional[str] = Field(None, min_length=8)
+    password_hash: Optional[str] = None
+    role: Optional[Role] = None
+    model_config = {"extra": "ignore"}
+
+    @field_validator("role", mode="before")
+    @classmethod
+    def _role_upper(cls, v):
+        return v.strip().upper() if isinstance(v, str) else v
+
+    @model_validator(mode="after")
+    def _one_secret(self):
+        if self.password and self.password_hash:
+            raise ValueError("Geef password of password_hash, niet allebei")
+        return self
+
+class UserImportError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    errors: List[str]
+
+    model_config = {"from_attributes": True}
+
+class UserImportOut(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    skipped_existing: int
+    memberships_created: int
+    error_count: int
+    errors: List[UserImportError]
+
+    model_config = {"from_attributes": True}
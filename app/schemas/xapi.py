@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
+
+# Alleen de velden die we naar Progress vertalen; de rest van een statement negeren we.
+_IGNORE = {"extra": "ignore"}
+
+
+class XapiAgent(BaseModel):
+    mbox: str
+    model_config = _IGNORE
+
+    @field_validator("mbox")
+    @classmethod
+    def _mailto(cls, v: str) -> str:
+        if not v.startswith("mailto:") or "@" not in v:
+            raise ValueError("mbox moet een mailto:-adres zijn")
+        return v[7:]
+
+
+class XapiVerb(BaseModel):
+    id: str = Field(..., max_length=255)
+    model_config = _IGNORE
+
+
+class XapiObject(BaseModel):
+    id: str = Field(..., max_length=1000)
+    model_config = _IGNORE
+
+
+class XapiScore(BaseModel):
+    scaled: Optional[float] = Field(None, ge=-1, le=1)
+    raw: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
+class XapiResult(BaseModel):
+    completion: Optional[bool] = None
+    success: Optional[bool] = None
+    score: Optional[XapiScore] = None
+    extensions: Optional[Dict[str, Any]] = None
+    model_config = _IGNORE
+
+
+class XapiStatementIn(BaseModel):
+    id: Optional[UUID] = None
+    actor: XapiAgent
+    verb: XapiVerb
+    object: XapiObject
+    result: Optional[XapiResult] = None
+    timestamp: Optional[datetime] = None
+    model_config = _IGNORE
+
+
+# Eén statement of een array, direct vanuit de JSON-bytes gevalideerd
+StatementBatch = TypeAdapter(Union[List[XapiStatementIn], XapiStatementIn])
@@ -0,0 +1,137 @@
+"""
+Zoeken op users (naam / e-mail) met een index i.p.v. LOWER(...) LIKE '%q%'.
+
+- SQLite: FTS5-tabel `users_fts` (external content op `users`), bijgehouden
+  door triggers, dus ook bij bulk-inserts/updates buiten de ORM om.
+  Matcht op woord-prefix ("jan zo" vindt "Jan Jansen <jan@zorg.nl>"),
+  ranking via bm25.
+- Postgres: pg_trgm GIN-indexen op lower(name) en lower(email); de LIKE
+  '%q%' blijft, maar gebruikt nu de index. Ranking via similarity().
+- Anders (of als de index ontbreekt): de oude LIKE-scan.
+
+Importeer deze module vóór `create_all`, dan worden index/triggers mee
+aangemaakt (zie ook de migratie users_search).
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import DDL, column, event, func, literal_column, select, table, text
+from sqlalchemy.orm import Session
+
+from app import models
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+    "name, email, content='users', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF name, email ON users BEGIN "
+    "INSERT INTO users_fts(users_fts, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO users_fts(rowid, name, email) VALUES (new.id, new.name, new.email); END",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS users_fts"]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (lower(name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (lower(email) gin_trgm_ops)",
+]
+
+for _sql in SQLITE_DDL:
+    event.listen(models.User.__table__, "after_create", DDL(_sql).execute_if(dialect="sqlite"))
+for _sql in SQLITE_DROP:
+    # vóór het droppen van users; anders blijft een verweesde index staan
+    event.listen(models.User.__table__, "before_drop", DDL(_sql).execute_if(dialect="sqlite"))
+for _sql in POSTGRES_DDL:
+    event.listen(models.User.__table__, "after_create", DDL(_sql).execute_if(dialect="postgresql"))
+
+users_fts = table("users_fts", column("rowid"), column("rank"))
+
+# per engine-url: is users_fts aanwezig (bv. migratie nog niet gedraaid)?
+_fts_available: dict[str, bool] = {}
+
+
+@dataclass
+class UserSearch:
+    condition: Any                 # WHERE-clausule op models.User
+    rank: Optional[Any] = None     # ORDER BY-expressie, beste match eerst
+    join: Optional[Any] = None     # (target, onclause) i.p.v. condition, nodig voor `rank`
+    id_key: Any = None             # sorteer hierop voor "op id"
+
+
+def fts_query(q: str) -> Optional[str]:
+    """'Jan zo' -> '"jan"* AND "zo"*' ; None als er geen zoekwoorden over zijn."""
+    tokens = _TOKEN.findall(q.lower())
+    if not tokens:
+        return None
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+
+def _sqlite_fts_ready(db: Session) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _fts_available:
+        _fts_available[key] = db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'")
+        ).first() is not None
+    return _fts_available[key]
+
+
+def _like(q: str) -> UserSearch:
+    like = f"%{q.lower()}%"
+    U = models.User
+    return UserSearch(condition=func.lower(U.name).like(like) | func.lower(U.email).like(like), id_key=U.id)
+
+
+def search_users(db: Session, q: str) -> UserSearch:
+    """Dialect-neutrale zoekfilter (+ optionele ranking) voor een User-query."""
+    U = models.User
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite" and _sqlite_fts_ready(db):
+        match = fts_query(q)
+        if match is None:
+            return _like(q)
+        cond = literal_column("users_fts").op("MATCH")(match)
+        return UserSearch(
+            condition=U.id.in_(select(users_fts.c.rowid).where(cond)),
+            rank=users_fts.c.rank,
+            join=(users_fts, (users_fts.c.rowid == U.id) & cond),
+            # ORDER BY users_fts.rowid levert FTS5 al gesorteerd aan (LIMIT stopt vroeg);
+            # ORDER BY users.id dwingt alle matches eerst te sorteren
+            id_key=users_fts.c.rowid,
+        )
+
+    if dialect == "postgresql":
+        s = _like(q)
+        needle = q.lower()
+        s.rank = func.greatest(
+            func.similarity(func.lower(U.name), needle),
+            func.similarity(func.lower(U.email), needle),
+        ).desc()
+        return s
+
+    return _like(q)
+
+
+def apply_search(db: Session, query, q: str, by_relevance: bool = False):
+    """
+    Filtert een db.query(User). Geeft (query, id_key) terug; sorteer/pagineer
+    "op id" via id_key. Met by_relevance is de query al op ranking gesorteerd.
+    """
+    s = search_users(db, q)
+    if s.join is not None:
+        query = query.join(*s.join)
+    else:
+        query = query.filter(s.condition)
+    if by_relevance:
+        order = (s.rank,) if s.rank is not None else ()
+        query = query.order_by(*order, models.User.id)
+    return query, s.id_key
@@ -1,4 +1,7 @@
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
 from jose import jwt, JWTError
@@ -6,6 +9,8 @@ from passlib.context import CryptContext
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import settings
+from app.metrics import AUTH_SECONDS
+from app.tracing import traced
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")  # past beter bij FastAPI docs
@@ -14,11 +19,45 @@ ISS = "cybaware-api"
 AUD = "cybaware-clients"
 LEEWAY_SECONDS = 10
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+# "!" + random: geen geldige hash, dus inloggen kan niet (bv. uitgenodigde users)
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+_VERIFY_SECONDS = AUTH_SECONDS.labels("verify_password")
+_HASH_SECONDS = AUTH_SECONDS.labels("hash_password")
+_DECODE_SECONDS = AUTH_SECONDS.labels("decode_token")
+
+@lru_cache(maxsize=1)
+def dummy_hash() -> str:
+    """Eén keer per proces; main.py warmt hem op bij het starten."""
+    return pwd_context.hash(secrets.token_hex(16))
+
+def verify_password(plain: str, hashed: Optional[str]) -> bool:
+    """
+    hashed=None (onbekende gebruiker) of een unusable hash: er wordt toch een
+    bcrypt-verificatie gedaan tegen een dummy-hash, zodat de responstijd niet
+    verraadt of het account bestaat.
+    """
+    start = time.perf_counter()
+    try:
+        if hashed is None or hashed.startswith(UNUSABLE_PASSWORD_PREFIX):
+            pwd_context.verify(plain, dummy_hash())
+            return False
+        return pwd_context.verify(plain, hashed)
+    except ValueError:
+        # onbekend hashformaat
+        return False
+    finally:
+        _VERIFY_SECONDS.observe(time.perf_counter() - start)
+
+def unusable_password() -> str:
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(16)
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        _HASH_SECONDS.observe(time.perf_counter() - start)
 
 get_password_hash = hash_password  # backwards compat
 
@@ -35,7 +74,9 @@ def create_access_token(subject: str | int, expires_minutes: Optional[int] = Non
     }
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+@traced("jwt.decode")
 def decode_token(token: str) -> dict:
+    start = time.perf_counter()
     try:
         return jwt.decode(
             token,
@@ -48,3 +89,5 @@ def decode_token(token: str) -> dict:
     except JWTError as e:
       
         raise ValueError("Invalid token") from e
+    finally:
+        _DECODE_SECONDS.observe(time.perf_counter() - start)
@@ -0,0 +1,230 @@
+"""
+Brute-force-bescherming voor /auth/login met token buckets.
+
+Elke mislukte login kost een volledige bcrypt-verificatie (~0,3 s CPU), dus
+credential stuffing brandt direct onze CPU op. Vóór verify_password wordt
+daarom per IP en per account (e-mail) een token uit een bucket gehaald; is
+er geen token, dan volgt direct 429 met Retry-After, zonder bcrypt.
+
+- per IP: LOGIN_IP_BURST pogingen, daarna LOGIN_IP_PER_MINUTE per minuut;
+  een geslaagde login krijgt zijn IP-token terug, dus alleen mislukte
+  pogingen tellen (een kantoor achter één NAT sluit zichzelf niet buiten)
+- per account: LOGIN_ACCOUNT_BURST pogingen, daarna LOGIN_ACCOUNT_PER_MINUTE;
+  een geslaagde login zet de account-bucket weer vol
+
+Het IP komt uit X-Forwarded-For als de directe peer in TRUSTED_PROXIES staat
+(zie client_ip); anders is het het peer-adres zelf.
+
+Keys worden gehasht (geen e-mailadressen in geheugen of op schijf).
+
+Stores (THROTTLE_BACKEND):
+- memory: per worker, LRU van hooguit THROTTLE_MAX_BUCKETS buckets
+- sqlite: één SQLite-bestand (THROTTLE_SQLITE_PATH) dat alle workers op
+  dezelfde machine delen; lokale stand-in voor een gedeelde store (Redis)
+"""
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.metrics import Counter
+
+LOGIN_THROTTLED = Counter("login_throttled_total", "Geweigerde loginpogingen per bucket-soort.", ("scope",))
+
+
+class BucketStore:
+    """take() haalt één token op; geeft 0 terug als dat lukte, anders de wachttijd in seconden."""
+
+    def take(self, key: str, capacity: float, per_second: float) -> float:
+        raise NotImplementedError
+
+    def refund(self, key: str, capacity: float) -> None:
+        """Geeft één eerder genomen token terug (niet boven capacity)."""
+        raise NotImplementedError
+
+    def reset(self, key: str) -> None:
+        raise NotImplementedError
+
+
+def _refill(tokens: float, updated: float, now: float, capacity: float, per_second: float) -> float:
+    return min(capacity, tokens + (now - updated) * per_second)
+
+
+class MemoryBucketStore(BucketStore):
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / per_second
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # een verdrongen bucket begint weer vol: bij een aanval op heel veel keys
+            # verliezen we dus precisie, maar het geheugen blijft begrensd
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def refund(self, key: str, capacity: float) -> None:
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(capacity, tokens + 1), updated)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SQLiteBucketStore(BucketStore):
+    """
+    Buckets in een SQLite-bestand; BEGIN IMMEDIATE serialiseert take() over
+    processen heen. Tijd is wandklok (time.time), want die delen de workers.
+    """
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, max_age: float):
+        self.path = path
+        self.max_age = max_age  # daarna is elke bucket weer vol en mag de rij weg
+        self._local = threading.local()
+        self._takes = 0
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: float, per_second: float) -> float:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = _refill(*(row or (capacity, now)), now, capacity, per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / per_second
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now),
+            )
+            self._takes += 1
+            if self._takes % self._PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM buckets WHERE updated < ?", (now - self.max_age,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def refund(self, key: str, capacity: float) -> None:
+        self._connect().execute("UPDATE buckets SET tokens = MIN(?, tokens + 1) WHERE key = ?", (capacity, key))
+
+    def reset(self, key: str) -> None:
+        self._connect().execute("DELETE FROM buckets WHERE key = ?", (key,))
+
+
+def make_store() -> BucketStore:
+    if settings.THROTTLE_BACKEND == "sqlite":
+        slowest = min(settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_ACCOUNT_PER_MINUTE) / 60
+        burst = max(settings.LOGIN_IP_BURST, settings.LOGIN_ACCOUNT_BURST)
+        return SQLiteBucketStore(settings.THROTTLE_SQLITE_PATH, max_age=burst / slowest)
+    return MemoryBucketStore(settings.THROTTLE_MAX_BUCKETS)
+
+
+def _networks(spec: str) -> list:
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+_TRUSTED = _networks(settings.TRUSTED_PROXIES)
+
+
+def _trusted(addr: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(addr)
+    except ValueError:
+        return False
+    return any(ip in net for net in _TRUSTED)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """
+    Het echte client-IP. Achter de load balancer is de peer de proxy; dan
+    X-Forwarded-For van rechts naar links lezen en het eerste adres nemen dat
+    zelf geen vertrouwde proxy is. Alles links daarvan kan de client verzinnen.
+    """
+    peer = request.client.host if request.client else None
+    if not peer or not _trusted(peer):
+        return peer
+    hops = [h.strip() for h in ",".join(request.headers.getlist("x-forwarded-for")).split(",") if h.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    return hops[0] if hops else peer
+
+
+def _key(kind: str, value: str) -> str:
+    return kind + ":" + hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+class LoginThrottle:
+    def __init__(self, store: BucketStore):
+        self.store = store
+        self._throttled = {scope: LOGIN_THROTTLED.labels(scope) for scope in ("ip", "account")}
+
+    def check(self, ip: Optional[str], email: str) -> Optional[int]:
+        """None als de poging door mag, anders Retry-After in hele seconden."""
+        if ip:
+            wait = self.store.take(_key("ip", ip), settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE / 60)
+            if wait:
+                self._throttled["ip"].inc()
+                return math.ceil(wait)
+        wait = self.store.take(
+            _key("account", email.strip().lower()),
+            settings.LOGIN_ACCOUNT_BURST,
+            settings.LOGIN_ACCOUNT_PER_MINUTE / 60,
+        )
+        if wait:
+            self._throttled["account"].inc()
+            return math.ceil(wait)
+        return None
+
+    def succeeded(self, ip: Optional[str], email: str) -> None:
+        """Alleen mislukte pogingen tellen: IP-token terug, account-bucket weer vol."""
+        if ip:
+            self.store.refund(_key("ip", ip), settings.LOGIN_IP_BURST)
+        self.store.reset(_key("account", email.strip().lower()))
+
+
+login_throttle = LoginThrottle(make_store())
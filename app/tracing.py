@@ -0,0 +1,373 @@
+"""
+Lichte tracing: spans met parent/child per request, export als OTLP-JSON.
+
+TracingMiddleware beslist per request of er getraced wordt
+(TRACE_SAMPLE_RATE, of een binnenkomende W3C `traceparent` met sampled-vlag)
+en maakt de root span. Daaronder:
+
+  jwt.decode         security.decode_token
+  auth.load_user     deps.get_current_user
+  org.lookup         deps.get_org_id
+  auth.membership    deps.require_role / require_min_role
+  route              TracedRoute: dependencies + handler + serialisatie
+    handler          de endpoint-functie
+    serialize        response_model-validatie + JSON (na de handler)
+  db.query           elk SQL-statement (beide engines)
+
+De huidige span zit in een contextvar; die gaat mee naar de threadpool, dus
+sync dependencies en handlers hangen onder de juiste parent. Niet gesampled
+= geen span-objecten: span() kijkt alleen naar de contextvar.
+
+Export per afgeronde trace, één regel OTLP/JSON (resourceSpans) naar stdout
+of naar het bestand in TRACE_EXPORT. Serialiseren en schrijven doet een
+eigen thread; de event loop zet de trace alleen in een begrensde queue (vol =
+trace weg, tracing mag requests niet ophouden).
+
+De org wordt per request in deps.get_org_id opgezocht (org.lookup).
+TenantMiddleware (app/tenancy.py) wordt niet gemount en heeft geen span.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+SERVICE_NAME = "cybaware-api"
+
+_OK, _ERROR = 1, 2  # OTLP StatusCode
+_SERVER, _INTERNAL, _CLIENT = 2, 1, 3  # OTLP SpanKind
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: int = _INTERNAL, **attributes):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.spans.append(self)
+
+    def to_otlp(self) -> dict:
+        out = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items() if v is not None],
+            "status": {"code": _ERROR, "message": self.error} if self.error else {"code": _OK},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: list[Span] = []  # list.append is thread-safe
+
+
+def _otlp_value(v: Any) -> dict:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, kind: int = _INTERNAL, **attributes) -> Iterator[Optional[Span]]:
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    s = Span(parent.trace, name, parent.span_id, kind, **attributes)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        # HTTPException 4xx is een antwoord aan de client, geen fout van deze span
+        if getattr(e, "status_code", 500) >= 500:
+            s.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        s.end()
+
+
+def traced(name: str) -> Callable:
+    """Decorator voor sync functies; kost niets als de request niet gesampled is."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ─────────────────────────────────────────────
+#   Export
+# ─────────────────────────────────────────────
+def _otlp_line(trace: Trace) -> str:
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [s.to_otlp() for s in trace.spans]}],
+    }]}
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+class Exporter:
+    """Schrijft afgeronde traces vanuit een achtergrondthread (start bij de eerste trace)."""
+
+    _STOP = object()
+
+    def __init__(self, max_queue: int):
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, trace: Trace) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Schrijft wat er nog in de queue staat en stopt de thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join(timeout)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        to_stdout = settings.TRACE_EXPORT == "stdout"
+        fh = sys.stdout if to_stdout else open(settings.TRACE_EXPORT, "a", encoding="utf-8")
+        try:
+            while True:
+                item = self._queue.get()
+                # alles wat al klaarstaat in één keer schrijven, dan pas flushen
+                while item is not self._STOP:
+                    try:
+                        fh.write(_otlp_line(item))
+                    except Exception:
+                        pass  # één kapotte trace mag de export niet stoppen
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                fh.flush()
+                if item is self._STOP:
+                    return
+        finally:
+            if not to_stdout:
+                fh.close()
+
+
+exporter = Exporter(settings.TRACE_EXPORT_QUEUE)
+atexit.register(exporter.close)
+
+
+def export(trace: Trace) -> None:
+    exporter.submit(trace)
+
+
+# ─────────────────────────────────────────────
+#   Request: root span + sampling
+# ─────────────────────────────────────────────
+def _parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    # 00-<32 hex trace-id>-<16 hex parent-id>-<2 hex flags>
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp, sample_rate: Optional[float] = None):
+        self.app = app
+        self.sample_rate = settings.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        incoming = _parse_traceparent(Headers(scope=scope).get("traceparent"))
+        sampled = incoming[2] if incoming else random.random() < self.sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        from app.metrics import route_template
+
+        trace = Trace(incoming[0] if incoming else None)
+        root = Span(trace, "HTTP " + scope["method"], incoming[1] if incoming else None, _SERVER,
+                    **{"http.request.method": scope["method"], "url.path": scope["path"]})
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            root.error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            root.name = f"{scope['method']} {route}"
+            root.set(**{"http.route": route, "http.response.status_code": status})
+            if status >= 500 and not root.error:
+                root.error = f"HTTP {status}"
+            root.end()
+            export(trace)
+
+
+# ─────────────────────────────────────────────
+#   Route: dependencies / handler / serialisatie
+# ─────────────────────────────────────────────
+class TracedRoute(APIRoute):
+    """
+    route_class voor de routers: span "route" om de hele afhandeling, "handler"
+    om de endpoint-functie, en "serialize" voor alles na de handler
+    (response_model-validatie en JSON-dump door FastAPI).
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _wrap_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def traced_handler(request):
+            if _current.get() is None:
+                return await handler(request)
+            with span("route") as s:
+                response = await handler(request)
+                handler_span = next(
+                    (c for c in reversed(s.trace.spans) if c.parent_id == s.span_id and c.name == "handler"), None
+                )
+                if handler_span is not None:
+                    t = Span(s.trace, "serialize", s.span_id)
+                    t.start_ns = handler_span.end_ns
+                    t.end()
+                return response
+
+        return traced_handler
+
+
+def _wrap_endpoint(endpoint: Callable) -> Callable:
+    """Houdt de signature intact (FastAPI leest die via __wrapped__)."""
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return await endpoint(*args, **kwargs)
+            with span("handler"):
+                return await endpoint(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return endpoint(*args, **kwargs)
+        with span("handler"):
+            return endpoint(*args, **kwargs)
+    return wrapper
+
+
+# ─────────────────────────────────────────────
+#   SQL
+# ─────────────────────────────────────────────
+def instrument_engine(engine, name: str) -> None:
+    from sqlalchemy import event
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        parent = _current.get()
+        if parent is None or context is None:
+            return
+        context._trace_span = Span(
+            parent.trace, "db.query", parent.span_id, _CLIENT,
+            **{"db.system": system, "db.statement": statement[:500], "db.engine": name,
+               "db.executemany": executemany},
+        )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        s = getattr(context, "_trace_span", None)
+        if s is not None:
+            context._trace_span = None
+            s.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        s = getattr(ctx.execution_context, "_trace_span", None)
+        if s is not None:
+            ctx.execution_context._trace_span = None
+            s.error = type(ctx.original_exception).__name__
+            s.end()
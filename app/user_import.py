@@ -0,0 +1,297 @@
+"""
+Bulk-import van users (CSV of NDJSON) in een organisatie.
+
+De upload wordt gestreamd en per IMPORT_BATCH_SIZE rijen verwerkt: valideren
+met UserImportRow, wachtwoorden hashen in een procespool (bcrypt is
+CPU-gebonden), dan per batch één transactie met bulk-inserts voor users en
+memberships. Fouten worden per rij gerapporteerd; de rest gaat gewoon door.
+
+Per rij: `password` (wordt gehasht), `password_hash` (al bcrypt) of geen van
+beide (uitnodiging: onbruikbaar wachtwoord tot de user er zelf een zet).
+
+E-mailadressen worden in kleine letters vergeleken en opgeslagen. Een adres
+dat al bestaat: eigen lid -> overgeslagen (of bijgewerkt met update_existing);
+account van buiten de org -> rijfout, in beide modi.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.bulk import IN_CHUNK, chunked, insert_ignore
+from app.core.config import settings
+from app.deps import RANK
+from app.schemas.users import UserImportRow
+from app.security import hash_password, pwd_context, unusable_password
+
+log = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+
+@dataclass
+class RowError:
+    row: int
+    email: Optional[str]
+    errors: list[str]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped_existing: int = 0
+    memberships_created: int = 0
+    error_count: int = 0
+    errors: list[RowError] = field(default_factory=list)
+
+    def add_error(self, row: int, email: Optional[str], errors: list[str]) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.IMPORT_ERROR_LIMIT:
+            self.errors.append(RowError(row, email, errors))
+
+
+# ─────────────────────────────────────────────
+#   Hashing in een procespool
+# ─────────────────────────────────────────────
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _workers() -> int:
+    return settings.IMPORT_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _hash_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: geen fork van een proces met draaiende threads
+            _pool = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def hash_many(passwords: list[str]) -> list[str]:
+    if len(passwords) < 4:
+        return [hash_password(p) for p in passwords]
+    chunk = max(1, len(passwords) // (_workers() * 4))
+    return list(_hash_pool().map(hash_password, passwords, chunksize=chunk))
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ─────────────────────────────────────────────
+#   Upload streamen -> records
+# ─────────────────────────────────────────────
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buf = ""
+    async for chunk in chunks:
+        buf += decoder.decode(chunk)
+        *complete, buf = buf.split("\n")
+        for line in complete:
+            yield line
+    buf += decoder.decode(b"", final=True)
+    if buf:
+        yield buf
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, Any]]:
+    """
+    Levert (rijnummer, dict) per record, of (rijnummer, str) bij een parse-fout.
+    Rijnummers zijn 1-based datarijen (CSV-header telt niet mee).
+    """
+    row = 0
+    if fmt == NDJSON:
+        async for line in _lines(chunks):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                data = json.loads(line)
+            except ValueError:
+                yield row, "Ongeldige JSON"
+                continue
+            yield row, data if isinstance(data, dict) else "Verwacht een JSON-object per regel"
+        return
+
+    header: Optional[list[str]] = None
+    pending = ""
+    async for line in _lines(chunks):
+        # een quoted veld kan een newline bevatten: wacht tot de quotes kloppen
+        pending = f"{pending}\n{line}" if pending else line
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Verwacht {len(header)} kolommen, kreeg {len(values)}"
+            continue
+        yield row, {k: v.strip() for k, v in zip(header, values) if v.strip() != ""}
+    if pending:
+        yield row + 1, "Onafgesloten quote"
+
+
+# ─────────────────────────────────────────────
+#   Batch verwerken
+# ─────────────────────────────────────────────
+class UserImporter:
+    def __init__(
+        self,
+        db: Session,
+        org_id: int,
+        default_role: models.Role,
+        max_role: models.Role,
+        update_existing: bool = False,
+    ):
+        self.db = db
+        self.org_id = org_id
+        self.default_role = default_role
+        self.max_role = max_role
+        self.update_existing = update_existing
+        self.report = ImportReport()
+        self._seen: set[str] = set()
+
+    def _validate(self, batch: list[tuple[int, Any]]) -> list[tuple[int, UserImportRow]]:
+        valid: list[tuple[int, UserImportRow]] = []
+        for row, data in batch:
+            self.report.rows += 1
+            if isinstance(data, str):
+                self.report.add_error(row, None, [data])
+                continue
+            try:
+                item = UserImportRow.model_validate(data)
+            except ValidationError as e:
+                errors = [f"{'.'.join(map(str, err['loc'])) or 'rij'}: {err['msg']}" for err in e.errors()]
+                self.report.add_error(row, data.get("email"), errors)
+                continue
+            # één keer normaliseren: dubbelcheck, DB-lookup en insert gebruiken allemaal dit adres
+            email = item.email = item.email.strip().lower()
+            role = item.role or self.default_role
+            if RANK[role] > RANK[self.max_role]:
+                self.report.add_error(row, email, [f"role: {role.value} mag je niet toekennen"])
+                continue
+            if item.password_hash and not pwd_context.identify(item.password_hash):
+                self.report.add_error(row, email, ["password_hash: onbekend hashformaat"])
+                continue
+            if email in self._seen:
+                self.report.add_error(row, email, ["email: komt vaker voor in het bestand"])
+                continue
+            self._seen.add(email)
+            item.role = role
+            valid.append((row, item))
+        return valid
+
+    def _lookup(self, emails: list[str]) -> dict[str, int]:
+        """Genormaliseerd e-mailadres -> user-id; hoofdletters in de DB tellen niet."""
+        U = models.User
+        found: dict[str, int] = {}
+        for batch in chunked(emails, IN_CHUNK):
+            found.update(self.db.execute(
+                select(func.lower(U.email), U.id).where(func.lower(U.email).in_(batch))
+            ).all())
+        return found
+
+    def process(self, batch: list[tuple[int, Any]]) -> None:
+        """Eén batch: valideren, hashen, één transactie."""
+        valid = self._validate(batch)
+        if not valid:
+            return
+        db, U = self.db, models.User
+
+        M = models.Membership
+        existing = self._lookup([item.email for _, item in valid])
+        have: set[int] = set()  # bestaande users die al lid zijn van deze org
+        for ids in chunked(list(existing.values()), IN_CHUNK):
+            have.update(db.execute(
+                select(M.user_id).where(M.org_id == self.org_id, M.user_id.in_(ids))
+            ).scalars())
+
+        # een account van een andere organisatie is niet van deze admin: niet bijwerken
+        # (account-overname) en ook niet stil lid maken (dan ziet en beheert hij het)
+        foreign = [(row, item) for row, item in valid
+                   if item.email in existing and existing[item.email] not in have]
+        for row, item in foreign:
+            self.report.add_error(row, item.email, ["email: bestaat al buiten deze organisatie; overgeslagen"])
+        valid = [(row, item) for row, item in valid
+                 if item.email not in existing or existing[item.email] in have]
+
+        new = [item for _, item in valid if item.email not in existing]
+        upd = [item for _, item in valid if item.email in existing and self.update_existing]
+        self.report.skipped_existing += sum(
+            1 for _, item in valid if item.email in existing and not self.update_existing
+        )
+
+        to_hash = [item for item in new + upd if item.password]
+        for item, hashed in zip(to_hash, hash_many([item.password for item in to_hash])):
+            item.password_hash = hashed
+
+        try:
+            if new:
+                insert_ignore(db, U.__table__, [
+                    {"email": item.email, "name": item.name,
+                     "password_hash": item.password_hash or unusable_password(), "is_active": True}
+                    for item in new
+                ], ["email"])
+                existing.update(self._lookup([item.email for item in new]))
+            if upd:
+                # Core op de tabel: de ORM-bulk-update wil de users in de sessie (de
+                # ingelogde admin) synchroniseren en weigert dat bij een WHERE op bindparam
+                T = U.__table__
+                db.execute(
+                    update(T).where(T.c.id == bindparam("uid")).values(name=bindparam("new_name")),
+                    [{"uid": existing[item.email], "new_name": item.name} for item in upd],
+                )
+                with_pw = [item for item in upd if item.password_hash]
+                if with_pw:
+                    db.execute(
+                        update(T).where(T.c.id == bindparam("uid")).values(password_hash=bindparam("new_hash")),
+                        [{"uid": existing[item.email], "new_hash": item.password_hash} for item in with_pw],
+                    )
+
+            # nieuwe users zijn nog nergens lid; `have` van hierboven klopt dus nog
+            memberships = [
+                {"user_id": existing[item.email], "org_id": self.org_id, "role": item.role}
+                for _, item in valid
+                if item.email in existing and existing[item.email] not in have
+            ]
+            insert_ignore(db, M.__table__, memberships, ["user_id", "org_id"])
+            db.commit()
+        except Exception:
+            # batch overslaan en rapporteren; volgende batches gaan door
+            log.exception("user-import: batch mislukt (org %s)", self.org_id)
+            db.rollback()
+            for row, item in valid:
+                self.report.add_error(row, item.email, ["Batch kon niet worden opgeslagen"])
+            return
+
+        self.report.created += len(new)
+        self.report.updated += len(upd)
+        self.report.memberships_created += len(memberships)
@@ -0,0 +1,377 @@
+"""
+xAPI-ingest voor externe content (Moodle/SCORM/cmi5).
+
+Statements komen via het statements-endpoint binnen, worden alleen gevalideerd
+en in `xapi_statements` gezet (append-only). Een achtergrondworker leest de
+staging in batches en zet ze set-based om naar Progress-rijen per
+(user, module). Markering en Progress gaan in één transactie, dus elke batch
+wordt precies één keer toegepast, ook met meerdere workers.
+
+Welke rijen nog open staan verschilt per database. SQLite serialiseert
+schrijvers, dus ids worden in commit-volgorde zichtbaar en volstaat een
+id-cursor (`xapi_cursor.last_id`, compare-and-set). Op Postgres kan een
+transactie met lagere ids ná een hogere committen; een id-cursor zou die rijen
+overslaan. Daar pakt de worker rijen met `processed_at IS NULL`, onder een
+FOR UPDATE op de cursor-rij zodat er één worker tegelijk merget.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.bulk import IN_CHUNK, chunked, dialect_name, insert_ignore
+from app.core.config import settings
+from app.database import SessionLocal
+from app.realtime import queue_event
+from app.schemas.xapi import XapiStatementIn
+
+log = logging.getLogger(__name__)
+
+PROGRESS_EXT = "https://w3id.org/xapi/cmi5/result/extensions/progress"
+
+_COMPLETED_VERBS = {"completed", "passed", "mastered"}
+_STARTED_VERBS = {
+    "attempted", "experienced", "progressed", "initialized", "launched",
+    "resumed", "answered", "interacted", "failed",
+}
+_MODULE_IRI = re.compile(r"/modules/(\d+)(?:[/?#]|$)")
+
+_RANK = {
+    models.ProgressStatus.NOT_STARTED: 0,
+    models.ProgressStatus.IN_PROGRESS: 1,
+    models.ProgressStatus.COMPLETED: 2,
+}
+
+
+class Backpressure(Exception):
+    """Staging-achterstand te groot; client moet later opnieuw proberen."""
+
+
+# ─────────────────────────────────────────────
+#   Ingest (request-pad: alleen valideren + appenden)
+# ─────────────────────────────────────────────
+def _utc_naive(ts: Optional[datetime], now: datetime) -> datetime:
+    if ts is None:
+        return now
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _score(st: XapiStatementIn) -> Optional[float]:
+    sc = st.result.score if st.result else None
+    if sc is None:
+        return None
+    if sc.scaled is not None:
+        val = sc.scaled * 100
+    elif sc.raw is not None and sc.max:
+        val = (sc.raw - (sc.min or 0)) / (sc.max - (sc.min or 0)) * 100
+    else:
+        return None
+    return min(max(val, 0.0), 100.0)
+
+
+def _percent(st: XapiStatementIn) -> Optional[float]:
+    ext = st.result.extensions if st.result else None
+    if not ext or PROGRESS_EXT not in ext:
+        return None
+    try:
+        return min(max(float(ext[PROGRESS_EXT]), 0.0), 100.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backlog(db: Session) -> int:
+    S = models.XapiStatement
+    head = db.query(func.max(S.id)).scalar() or 0
+    if dialect_name(db) == "postgresql":
+        oldest = db.query(func.min(S.id)).filter(S.processed_at.is_(None)).scalar()
+        return head - oldest + 1 if oldest is not None else 0
+    done = db.query(models.XapiCursor.last_id).filter_by(id=1).scalar() or 0
+    return head - done
+
+
+def stage_statements(db: Session, org_id: int, statements: list[XapiStatementIn]) -> list[str]:
+    """Zet statements in staging en geeft hun ids terug (xAPI POST-semantiek)."""
+    if backlog(db) + len(statements) > settings.XAPI_MAX_BACKLOG:
+        raise Backpressure()
+
+    now = datetime.utcnow()
+    ids: list[str] = []
+    rows: list[dict] = []
+    for st in statements:
+        sid = str(st.id or uuid.uuid4())
+        ids.append(sid)
+        res = st.result
+        rows.append({
+            "statement_id": sid,
+            "org_id": org_id,
+            "actor_email": st.actor.mbox,
+            "verb": st.verb.id,
+            "activity_id": st.object.id,
+            "completion": res.completion if res else None,
+            "success": res.success if res else None,
+            "score": _score(st),
+            "percent": _percent(st),
+            "timestamp": _utc_naive(st.timestamp, now),
+            "stored_at": now,
+        })
+    # een statement-id dat al bestaat is een herhaalde POST: negeren
+    insert_ignore(db, models.XapiStatement.__table__, rows, ["statement_id"])
+    db.commit()
+    return ids
+
+
+# ─────────────────────────────────────────────
+#   Verwerking (worker-pad: staging -> Progress)
+# ─────────────────────────────────────────────
+def _verb_status(verb_iri: str, completion: Optional[bool]) -> Optional[models.ProgressStatus]:
+    verb = verb_iri.rstrip("/").rsplit("/", 1)[-1].lower()
+    if completion or verb in _COMPLETED_VERBS:
+        return models.ProgressStatus.COMPLETED
+    if verb in _STARTED_VERBS:
+        return models.ProgressStatus.IN_PROGRESS
+    return None
+
+
+@dataclass
+class _Fold:
+    status: models.ProgressStatus = models.ProgressStatus.NOT_STARTED
+    percent: float = 0.0
+    score: Optional[float] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    last_event_at: Optional[datetime] = None
+
+    def apply(self, status, percent, score, ts) -> None:
+        if status is not None and _RANK[status] > _RANK[self.status]:
+            self.status = status
+        if status is not None and self.started_at is None:
+            self.started_at = ts
+        if status is models.ProgressStatus.COMPLETED and self.completed_at is None:
+            self.completed_at = ts
+        if percent is not None and percent > self.percent:
+            self.percent = percent
+        if score is not None:
+            self.score = score
+        if self.last_event_at is None or ts > self.last_event_at:
+            self.last_event_at = ts
+
+
+def _resolve_users(db: Session, keys: set[tuple[int, str]]) -> dict[tuple[int, str], int]:
+    """(org_id, email) -> user_id, alleen voor leden van die org."""
+    out: dict[tuple[int, str], int] = {}
+    emails = {e for _, e in keys}
+    orgs = {o for o, _ in keys}
+    for batch in chunked(emails, IN_CHUNK):
+        rows = db.execute(
+            select(models.Membership.org_id, models.User.email, models.User.id)
+            .join(models.User, models.User.id == models.Membership.user_id)
+            .where(models.User.email.in_(batch), models.Membership.org_id.in_(orgs))
+        )
+        for org_id, email, user_id in rows:
+            out[(org_id, email)] = user_id
+    return out
+
+
+def _resolve_modules(db: Session, keys: set[tuple[int, str]]) -> dict[tuple[int, str], tuple[int, int]]:
+    """(org_id, activity IRI) -> (module_id, training_id) via content_url of .../modules/{id}."""
+    out: dict[tuple[int, str], tuple[int, int]] = {}
+    iris = {a for _, a in keys}
+    orgs = {o for o, _ in keys}
+    by_id = {int(m.group(1)): iri for iri in iris if (m := _MODULE_IRI.search(iri))}
+    base = (
+        select(models.Training.org_id, models.Module.content_url, models.Module.id, models.Module.training_id)
+        .join(models.Training, models.Training.id == models.Module.training_id)
+        .where(models.Training.org_id.in_(orgs))
+    )
+    for batch in chunked(iris, IN_CHUNK):
+        for org_id, url, mid, tid in db.execute(base.where(models.Module.content_url.in_(batch))):
+            out[(org_id, url)] = (mid, tid)
+    for batch in chunked(by_id, IN_CHUNK):
+        for org_id, _, mid, tid in db.execute(base.where(models.Module.id.in_(batch))):
+            out.setdefault((org_id, by_id[mid]), (mid, tid))
+    return out
+
+
+def process_batch(db: Session, limit: Optional[int] = None) -> int:
+    """Verwerkt de volgende batch staging-rijen. Geeft het aantal verwerkte statements terug."""
+    limit = limit or settings.XAPI_BATCH_SIZE
+    C, S = models.XapiCursor, models.XapiStatement
+    cursor = db.get(C, 1)
+    if cursor is None:
+        insert_ignore(db, C.__table__, [{"id": 1, "last_id": 0}], ["id"])
+        db.commit()
+        cursor = db.get(C, 1)
+
+    postgres = dialect_name(db) == "postgresql"
+    if postgres:
+        # bezet = een andere worker merget al; niet wachten, de volgende poll komt vanzelf
+        locked = db.execute(select(C.id).where(C.id == 1).with_for_update(skip_locked=True)).first()
+        if locked is None:
+            db.rollback()
+            return 0
+        pending = S.processed_at.is_(None)
+    else:
+        start = cursor.last_id
+        pending = S.id > start
+
+    rows = db.execute(
+        select(S.id, S.org_id, S.actor_email, S.verb, S.activity_id, S.completion, S.score, S.percent, S.timestamp)
+        .where(pending)
+        .order_by(S.id)
+        .limit(limit)
+    ).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    users = _resolve_users(db, {(r.org_id, r.actor_email) for r in rows})
+    modules = _resolve_modules(db, {(r.org_id, r.activity_id) for r in rows})
+
+    folds: dict[tuple[int, int], _Fold] = {}
+    trainings: dict[tuple[int, int], int] = {}     # (org_id, training_id) -> aantal
+    skipped = 0
+    for r in rows:
+        uid = users.get((r.org_id, r.actor_email))
+        mod = modules.get((r.org_id, r.activity_id))
+        if uid is None or mod is None:
+            skipped += 1
+            continue
+        folds.setdefault((uid, mod[0]), _Fold()).apply(
+            _verb_status(r.verb, r.completion), r.percent, r.score, r.timestamp
+        )
+        trainings[(r.org_id, mod[1])] = trainings.get((r.org_id, mod[1]), 0) + 1
+
+    _merge_progress(db, folds)
+
+    now = datetime.utcnow()
+    if postgres:
+        for batch in chunked([r.id for r in rows], IN_CHUNK):
+            db.execute(update(S.__table__).where(S.__table__.c.id.in_(batch)).values(processed_at=now))
+    else:
+        # cursor compare-and-set: een andere worker die dezelfde batch pakte wint niet twee keer
+        moved = db.execute(
+            update(C).where(C.id == 1, C.last_id == start).values(last_id=rows[-1].id)
+        ).rowcount
+        if not moved:
+            db.rollback()
+            return 0
+        db.execute(
+            update(S.__table__)
+            .where(S.__table__.c.id > start, S.__table__.c.id <= rows[-1].id)
+            .values(processed_at=now)
+        )
+
+    for (org_id, training_id), n in trainings.items():
+        queue_event(db, {"type": "progress_bulk", "org_id": org_id, "training_id": training_id, "count": n})
+    db.commit()
+    if skipped:
+        log.info("xapi: %d statements zonder bekende user/module overgeslagen", skipped)
+    return len(rows)
+
+
+def _merge_progress(db: Session, folds: dict[tuple[int, int], _Fold]) -> None:
+    P = models.Progress
+    existing: dict[tuple[int, int], tuple] = {}
+    for batch in chunked(folds, IN_CHUNK):
+        for row in db.execute(
+            select(P.id, P.user_id, P.module_id, P.status, P.percent, P.score, P.started_at, P.completed_at)
+            .where(tuple_(P.user_id, P.module_id).in_(batch))
+        ):
+            existing[(row.user_id, row.module_id)] = row
+
+    inserts: list[dict] = []
+    updates: list[dict] = []
+    for (uid, mid), f in folds.items():
+        cur = existing.get((uid, mid))
+        if cur is None:
+            inserts.append({
+                "user_id": uid, "module_id": mid, "status": f.status,
+                "percent": 100.0 if f.status is models.ProgressStatus.COMPLETED else f.percent,
+                "score": f.score, "started_at": f.started_at,
+                "last_event_at": f.last_event_at, "completed_at": f.completed_at,
+            })
+            continue
+        # nooit terugzetten: COMPLETED blijft COMPLETED, percent alleen omhoog
+        status = f.status if _RANK[f.status] > _RANK[cur.status] else cur.status
+        updates.append({
+            "_id": cur.id,
+            "status": status,
+            "percent": 100.0 if status is models.ProgressStatus.COMPLETED else max(cur.percent or 0.0, f.percent),
+            "score": f.score if f.score is not None else cur.score,
+            "started_at": cur.started_at or f.started_at,
+            "completed_at": cur.completed_at or f.completed_at,
+            "last_event_at": f.last_event_at,
+        })
+
+    insert_ignore(db, P.__table__, inserts, ["user_id", "module_id"])
+    if updates:
+        db.execute(
+            update(P.__table__)
+            .where(P.__table__.c.id == bindparam("_id"))
+            .values(
+                status=bindparam("status"), percent=bindparam("percent"), score=bindparam("score"),
+                started_at=bindparam("started_at"), completed_at=bindparam("completed_at"),
+                last_event_at=bindparam("last_event_at"),
+            ),
+            updates,
+        )
+
+
+# ─────────────────────────────────────────────
+#   Achtergrondworker
+# ─────────────────────────────────────────────
+class XapiWorker:
+    def __init__(self, poll_seconds: float = 1.0):
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="xapi-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stop.clear()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def drain(self) -> int:
+        """Verwerkt alles wat er nu staat (ook handig in scripts/benchmarks)."""
+        total = 0
+        with SessionLocal() as db:
+            while n := process_batch(db):
+                total += n
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                n = self.drain()
+            except Exception:
+                log.exception("xapi-batch mislukt")
+                n = 0
+            if not n:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+worker = XapiWorker()
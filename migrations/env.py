@@ -22,6 +22,19 @@ config.set_main_option("sqlalchemy.url", url)
 # Alembic target metadata
 target_metadata = Base.metadata
 
+# Zoekindex (app.search): FTS5-tabellen en pg_trgm-indexen worden met ruwe
+# DDL beheerd (migratie d4f6a8c0e2b1) en staan niet in de metadata.
+# Autogenerate zou ze anders als "verwijderd" zien en droppen.
+SEARCH_OBJECTS = ("users_fts",)
+SEARCH_INDEXES = {"ix_users_name_trgm", "ix_users_email_trgm"}
+
+def include_name(name, type_, parent_names):
+    if type_ == "table" and name and name.startswith(SEARCH_OBJECTS):
+        return False
+    if type_ == "index" and name in SEARCH_INDEXES:
+        return False
+    return True
+
 def run_migrations_offline():
     context.configure(
         url=config.get_main_option("sqlalchemy.url"),
@@ -30,6 +43,7 @@ def run_migrations_offline():
         dialect_opts={"paramstyle": "named"},
         # voor SQLite: batch mode nodig voor ALTER TABLE
         render_as_batch=url.startswith("sqlite"),
+        include_name=include_name,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -44,6 +58,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             render_as_batch=url.startswith("sqlite"),
+            include_name=include_name,
         )
         with context.begin_transaction():
             context.run_migrations()
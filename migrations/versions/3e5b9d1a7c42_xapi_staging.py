@@ -0,0 +1,51 @@
+"""xapi staging + cursor
+
+Revision ID: 3e5b9d1a7c42
+Revises: c8fda3470f49
+Create Date: 2026-10-19 09:12:40.512233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e5b9d1a7c42'
+down_revision: Union[str, Sequence[str], None] = 'c8fda3470f49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('xapi_statements',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('statement_id', sa.String(length=36), nullable=False),
+    sa.Column('org_id', sa.Integer(), nullable=False),
+    sa.Column('actor_email', sa.String(length=320), nullable=False),
+    sa.Column('verb', sa.String(length=255), nullable=False),
+    sa.Column('activity_id', sa.String(length=1000), nullable=False),
+    sa.Column('completion', sa.Boolean(), nullable=True),
+    sa.Column('success', sa.Boolean(), nullable=True),
+    sa.Column('score', sa.Float(), nullable=True),
+    sa.Column('percent', sa.Float(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(), nullable=False),
+    sa.Column('stored_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['org_id'], ['organizations.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('statement_id', name='uq_xapi_statement_id')
+    )
+    op.create_table('xapi_cursor',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(sa.table('xapi_cursor', sa.column('id'), sa.column('last_id')), [{'id': 1, 'last_id': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('xapi_cursor')
+    op.drop_table('xapi_statements')
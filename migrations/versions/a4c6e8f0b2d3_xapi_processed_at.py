@@ -0,0 +1,42 @@
+"""xapi_statements.processed_at + partiële index op nog te verwerken rijen
+
+Revision ID: a4c6e8f0b2d3
+Revises: f3b8d2a6c914
+Create Date: 2026-10-19 23:05:41.207613
+
+Rijen tot en met de bestaande cursor zijn al verwerkt en krijgen stored_at
+als processed_at, zodat de Postgres-worker ze niet opnieuw toepast.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e8f0b2d3'
+down_revision: Union[str, Sequence[str], None] = 'f3b8d2a6c914'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('xapi_statements', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('processed_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE xapi_statements SET processed_at = stored_at "
+        "WHERE id <= (SELECT last_id FROM xapi_cursor WHERE id = 1)"
+    )
+    with op.batch_alter_table('xapi_statements', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_xapi_pending', ['id'], unique=False,
+            postgresql_where=sa.text('processed_at IS NULL'), sqlite_where=sa.text('processed_at IS NULL'),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('xapi_statements', schema=None) as batch_op:
+        batch_op.drop_index('ix_xapi_pending')
+        batch_op.drop_column('processed_at')
@@ -0,0 +1,28 @@
+"""users: index op lower(email) voor de hoofdletterongevoelige import-lookup
+
+Revision ID: c2e4a6b8d0f1
+Revises: b7d9f1a3c5e6
+Create Date: 2026-10-20 00:12:55.318042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e4a6b8d0f1'
+down_revision: Union[str, Sequence[str], None] = 'b7d9f1a3c5e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_lower', table_name='users')
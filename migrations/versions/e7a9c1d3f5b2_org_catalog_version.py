@@ -0,0 +1,30 @@
+"""organizations.catalog_version
+
+Revision ID: e7a9c1d3f5b2
+Revises: d4f6a8c0e2b1
+Create Date: 2026-10-19 16:12:09.402871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a9c1d3f5b2'
+down_revision: Union[str, Sequence[str], None] = 'd4f6a8c0e2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('catalog_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('organizations', schema=None) as batch_op:
+        batch_op.drop_column('catalog_version')
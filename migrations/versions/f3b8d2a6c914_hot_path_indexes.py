@@ -0,0 +1,91 @@
+"""hot path indexes (samengesteld/covering) + overbodige indexes weg
+
+Revision ID: f3b8d2a6c914
+Revises: e7a9c1d3f5b2
+Create Date: 2026-10-19 21:40:12.118305
+
+Nieuw (zie scripts/explain_hot_queries.py voor de plannen):
+- progress(module_id, status, percent): stats-aggregaties lezen alleen de index
+- enrollments(training_id, status): telling + completion per training
+- trainings(org_id, is_active, created_at): catalogus, gesorteerd, zonder temp b-tree
+- memberships(org_id, role, user_id): doelgroep (org + rol) en actieve leden
+
+De rolcheck per request (user_id, org_id) heeft genoeg aan uq_user_org: een
+extra covering (user_id, org_id, role) kiest de SQLite-planner nooit boven
+de unieke index, dus die zou alleen schrijfkosten toevoegen.
+
+Weg, omdat een andere index dezelfde kolommen vooraan heeft (alleen schrijfkosten):
+- ix_membership_user (uq_user_org), ix_membership_org (ix_membership_org_role)
+- ix_enrollment_user (uq_enrollment_user_training), ix_enrollment_training
+- ix_progress_user (uq_progress_user_module), ix_progress_module
+- ix_module_training (uq_module_training_order)
+- ix_training_org (ix_training_org_active_created)
+- ix_companies_id (primary key)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2a6c914'
+down_revision: Union[str, Sequence[str], None] = 'e7a9c1d3f5b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_module_status', ['module_id', 'status', 'percent'], unique=False)
+        batch_op.drop_index('ix_progress_module')
+        batch_op.drop_index('ix_progress_user')
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_enrollment_training_status', ['training_id', 'status'], unique=False)
+        batch_op.drop_index('ix_enrollment_training')
+        batch_op.drop_index('ix_enrollment_user')
+
+    with op.batch_alter_table('trainings', schema=None) as batch_op:
+        batch_op.create_index('ix_training_org_active_created', ['org_id', 'is_active', 'created_at'], unique=False)
+        batch_op.drop_index('ix_training_org')
+
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.create_index('ix_membership_org_role', ['org_id', 'role', 'user_id'], unique=False)
+        batch_op.drop_index('ix_membership_user')
+        batch_op.drop_index('ix_membership_org')
+
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.drop_index('ix_module_training')
+
+    with op.batch_alter_table('companies', schema=None) as batch_op:
+        batch_op.drop_index('ix_companies_id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('companies', schema=None) as batch_op:
+        batch_op.create_index('ix_companies_id', ['id'], unique=False)
+
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.create_index('ix_module_training', ['training_id'], unique=False)
+
+    with op.batch_alter_table('memberships', schema=None) as batch_op:
+        batch_op.create_index('ix_membership_org', ['org_id'], unique=False)
+        batch_op.create_index('ix_membership_user', ['user_id'], unique=False)
+        batch_op.drop_index('ix_membership_org_role')
+
+    with op.batch_alter_table('trainings', schema=None) as batch_op:
+        batch_op.create_index('ix_training_org', ['org_id'], unique=False)
+        batch_op.drop_index('ix_training_org_active_created')
+
+    with op.batch_alter_table('enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_enrollment_user', ['user_id'], unique=False)
+        batch_op.create_index('ix_enrollment_training', ['training_id'], unique=False)
+        batch_op.drop_index('ix_enrollment_training_status')
+
+    with op.batch_alter_table('progress', schema=None) as batch_op:
+        batch_op.create_index('ix_progress_user', ['user_id'], unique=False)
+        batch_op.create_index('ix_progress_module', ['module_id'], unique=False)
+        batch_op.drop_index('ix_progress_module_status')
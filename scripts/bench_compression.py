@@ -0,0 +1,94 @@
+# scripts/bench_compression.py
+"""
+Bytes over de lijn en latency met/zonder compressie.
+
+Per endpoint: identity vs gzip (en br als het brotli-pakket er is). Voor de
+gecachte endpoints (catalogus, stats) ook "koud": cache vóór elke request
+leeg, dus serialiseren + comprimeren per request. "p99 @link" telt de
+overdrachtstijd op een trage verbinding (--link-mbit) op bij de servertijd.
+
+    python scripts/bench_compression.py --users 2000 --requests 50
+"""
+import argparse
+import time
+
+from benchutil import auth_header, create_schema, percentile, use_database
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--trainings", type=int, default=100)
+    ap.add_argument("--requests", type=int, default=50)
+    ap.add_argument("--link-mbit", type=float, default=4.0, help="bandbreedte van de trage verbinding")
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    from fastapi.testclient import TestClient
+    from app import models
+    from app.compression import supported_encodings
+    from app.database import SessionLocal
+    from app.enrollment import audience_query, enroll_audience
+    from app.main import app
+    from app.response_cache import response_cache
+
+    with SessionLocal() as db:
+        org = models.Organization(name="Bench", slug="bench")
+        admin = models.User(email="admin@bench-gz.nl", name="Admin", password_hash="x")
+        db.add_all([org, admin]); db.flush()
+        db.add(models.Membership(user_id=admin.id, org_id=org.id, role=models.Role.ADMIN))
+        db.execute(models.User.__table__.insert(), [
+            {"email": f"u{i}@bench-gz.nl", "name": f"User {i}", "password_hash": "x", "is_active": True}
+            for i in range(args.users)
+        ])
+        uids = db.execute(models.User.__table__.select().with_only_columns(models.User.id)
+                          .where(models.User.email.like("u%@bench-gz.nl"))).scalars().all()
+        db.execute(models.Membership.__table__.insert(), [
+            {"user_id": uid, "org_id": org.id, "role": models.Role.EMPLOYEE} for uid in uids
+        ])
+        first = None
+        for t in range(args.trainings):
+            tr = models.Training(org_id=org.id, title=f"Training {t}", description="Bewustwording " * 10)
+            db.add(tr); db.flush()
+            first = first or tr
+            for j in range(1, 9):
+                db.add(models.Module(training_id=tr.id, title=f"Module {j}", order_index=j,
+                                     content_url=f"https://cdn.example.nl/{tr.id}/{j}.mp4"))
+        db.commit()
+        enroll_audience(db, first, audience_query(org.id))
+        db.commit()
+        admin_id = admin.id
+
+    endpoints = [
+        ("org progress", "/progress/org/bench?limit=5000", False),
+        ("catalogus", "/organizations/bench/trainings/?limit=100", True),
+        ("stats", "/organizations/bench/stats/", True),
+        ("export csv", "/organizations/bench/exports/compliance?mode=stream", False),
+    ]
+    link_bps = args.link_mbit * 1_000_000 / 8
+    print(f"{'endpoint':<13} {'variant':<12} {'bytes':>9} {'p50 ms':>8} {'p99 ms':>8} {'p99 @link':>10}")
+    with TestClient(app) as client:
+        for name, url, cached in endpoints:
+            variants = [("identity", "identity", False)] + [(enc, enc, False) for enc in supported_encodings()]
+            if cached:
+                variants += [(f"{enc} koud", enc, True) for enc in supported_encodings()]
+            for label, enc, cold in variants:
+                headers = {**auth_header(admin_id), "Accept-Encoding": enc}
+                samples, size = [], 0
+                for _ in range(args.requests):
+                    if cold:
+                        response_cache.clear()
+                    t0 = time.perf_counter()
+                    r = client.get(url, headers=headers)
+                    samples.append(time.perf_counter() - t0)
+                    r.raise_for_status()
+                    size = r.num_bytes_downloaded
+                p99 = percentile(samples, 99)
+                print(f"{name:<13} {label:<12} {size:9d} {percentile(samples, 50) * 1000:8.1f} "
+                      f"{p99 * 1000:8.1f} {(p99 + size / link_bps) * 1000:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
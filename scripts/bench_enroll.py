@@ -0,0 +1,108 @@
+# scripts/bench_enroll.py
+"""
+Benchmark voor POST /organizations/{slug}/trainings/{id}/enroll.
+
+Zaait N users + een training met M modules en schrijft ze in één request in
+(plus een paar onbekende en dubbele e-mails). Rapporteert duur en het aantal
+SQL-statements; dat laatste hoort niet mee te groeien met N. De bench meet
+het synchrone pad: ENROLL_ASYNC_THRESHOLD wordt boven N gezet, anders wordt
+de request een job (202).
+Met --audience gaat het via /enroll/audience (hele org, INSERT ... SELECT),
+gevolgd door een extra module (progress-backfill voor alle enrollees).
+
+    python scripts/bench_enroll.py --emails 10000 --modules 5
+    python scripts/bench_enroll.py --emails 100000 --audience
+"""
+import argparse
+import time
+
+from benchutil import auth_header, create_schema, use_database
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--emails", type=int, default=10_000)
+    ap.add_argument("--modules", type=int, default=5)
+    ap.add_argument("--audience", action="store_true", help="hele org via /enroll/audience")
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    from sqlalchemy import event, literal, select
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app import models
+    from app.core.config import settings
+    from app.security import hash_password
+
+    settings.ENROLL_ASYNC_THRESHOLD = max(settings.ENROLL_ASYNC_THRESHOLD, args.emails + 20)
+
+    pw = hash_password("Bench!1234")
+    with SessionLocal() as db:
+        org = models.Organization(name="Bench", slug="bench")
+        admin = models.User(email="admin@bench.local", name="Admin", password_hash=pw)
+        db.add_all([org, admin]); db.flush()
+        db.add(models.Membership(user_id=admin.id, org_id=org.id, role=models.Role.ADMIN))
+        tr = models.Training(org_id=org.id, title="Bench")
+        db.add(tr); db.flush()
+        db.execute(models.Module.__table__.insert(), [
+            {"training_id": tr.id, "title": f"M{i}", "order_index": i, "duration_min": 10}
+            for i in range(1, args.modules + 1)
+        ])
+        db.execute(models.User.__table__.insert(), [
+            {"email": f"u{i}@bench.local", "name": f"U{i}", "password_hash": pw, "is_active": True}
+            for i in range(args.emails)
+        ])
+        db.execute(models.Membership.__table__.insert().from_select(
+            ["user_id", "org_id", "role"],
+            select(models.User.id, literal(org.id), literal(models.Role.EMPLOYEE.value))
+            .where(models.User.id != admin.id),
+        ))
+        db.commit()
+        admin_id, training_id = admin.id, tr.id
+
+    emails = [f"u{i}@bench.local" for i in range(args.emails)]
+    emails += [f"ghost{i}@bench.local" for i in range(10)] + emails[:10]
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+
+    client = TestClient(app)
+    url = f"/organizations/bench/trainings/{training_id}/enroll"
+    if args.audience:
+        for label in ("audience eerste keer", "audience herhaald"):
+            statements = 0
+            t0 = time.perf_counter()
+            r = client.post(url + "/audience", json={"audience": "org"}, headers=auth_header(admin_id))
+            dt = time.perf_counter() - t0
+            r.raise_for_status()
+            print(f"{label:<28} {dt * 1000:8.0f} ms  statements={statements:<4} {r.json()}")
+        statements = 0
+        t0 = time.perf_counter()
+        r = client.post(f"/organizations/bench/trainings/{training_id}/modules",
+                        json={"title": "Extra", "order_index": args.modules + 1}, headers=auth_header(admin_id))
+        dt = time.perf_counter() - t0
+        r.raise_for_status()
+        print(f"{'add_module (backfill)':<28} {dt * 1000:8.0f} ms  statements={statements:<4}")
+        return
+
+    for label in ("eerste keer", "herhaald (alles bestaat al)"):
+        statements = 0
+        t0 = time.perf_counter()
+        r = client.post(url, json={"emails": emails}, headers=auth_header(admin_id))
+        dt = time.perf_counter() - t0
+        r.raise_for_status()
+        body = r.json()
+        print(f"{label:<28} {dt * 1000:8.0f} ms  statements={statements:<4} "
+              f"created={body['created']} already={body['already_enrolled']} "
+              f"unknown={len(body['unknown_emails'])} dupes={len(body['duplicates'])}")
+
+
+if __name__ == "__main__":
+    main()
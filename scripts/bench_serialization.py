@@ -0,0 +1,103 @@
+# scripts/bench_serialization.py
+"""
+Serialisatietijd per 10k rijen voor de grote lijst-endpoints.
+
+Per response-schema drie varianten (load = query, ser = naar JSON-bytes):
+  orm+model     ORM-objecten, response_model-validatie + pydantic dump_json
+                (wat FastAPI standaard doet)
+  orm+orjson    idem, maar via model_dump + orjson (app-brede ORJSONResponse)
+  rows          Core select van alleen de kolommen -> dicts -> FastJSONResponse
+
+    python scripts/bench_serialization.py --rows 10000
+"""
+import argparse
+import time
+from typing import List
+
+from benchutil import create_schema, use_database
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app import models
+    from app.responses import column_keys, dumps, rows_as_dicts
+    from app.schemas.companies import CompanyOut
+    from app.schemas.progress import ProgressOut
+    from app.schemas.users import UserOut
+
+    n = args.rows
+    with SessionLocal() as db:
+        org = models.Organization(name="Bench", slug="bench"); db.add(org); db.flush()
+        tr = models.Training(org_id=org.id, title="T"); db.add(tr); db.flush()
+        mod = models.Module(training_id=tr.id, title="M", order_index=1); db.add(mod); db.flush()
+        db.execute(models.User.__table__.insert(), [
+            {"email": f"u{i}@bench-ser.nl", "name": f"User {i}", "password_hash": "x", "is_active": True}
+            for i in range(n)
+        ])
+        db.execute(models.Company.__table__.insert(), [
+            {"org_id": org.id, "name": f"Company {i}", "sector": "Zorg", "email_domain": f"c{i}.nl", "is_active": True}
+            for i in range(n)
+        ])
+        uids = db.execute(select(models.User.id)).scalars().all()
+        db.execute(models.Progress.__table__.insert(), [
+            {"user_id": uid, "module_id": mod.id, "status": models.ProgressStatus.IN_PROGRESS,
+             "percent": 42.0, "score": 7.5, "started_at": tr.created_at, "last_event_at": tr.created_at}
+            for uid in uids
+        ])
+        db.commit()
+
+    U, C, P = models.User, models.Company, models.Progress
+    cases = [
+        ("progress", ProgressOut, P, [P.id, P.user_id, P.module_id, P.status, P.percent, P.score,
+                                      P.started_at, P.last_event_at, P.completed_at]),
+        ("users", UserOut, U, [U.id, U.name, U.email, U.is_active]),
+        ("companies", CompanyOut, C, [C.id, C.name, C.kvk, C.sector, C.email_domain, C.is_active]),
+    ]
+    print(f"{'schema':<10} {'variant':<11} {'load ms':>9} {'ser ms':>9} {'totaal':>9}   (per {n} rijen)")
+    for name, schema, model, cols in cases:
+        adapter = TypeAdapter(List[schema])
+        keys = column_keys(cols)
+        with SessionLocal() as db:
+            objs = db.query(model).order_by(model.id).all()
+            rows = db.execute(select(*cols).order_by(model.id)).all()
+            variants = {
+                "orm+model": (
+                    lambda: (db.expunge_all(), db.query(model).order_by(model.id).all()),
+                    lambda: adapter.dump_json(adapter.validate_python(objs)),
+                ),
+                "orm+orjson": (
+                    lambda: (db.expunge_all(), db.query(model).order_by(model.id).all()),
+                    lambda: dumps(adapter.dump_python(adapter.validate_python(objs), mode="json")),
+                ),
+                "rows": (
+                    lambda: db.execute(select(*cols).order_by(model.id)).all(),
+                    lambda: dumps(rows_as_dicts(keys, rows)),
+                ),
+            }
+            for variant, (load, ser) in variants.items():
+                t_load = _best(load, args.repeat)
+                t_ser = _best(ser, args.repeat)
+                print(f"{name:<10} {variant:<11} {t_load * 1000:9.1f} {t_ser * 1000:9.1f} {(t_load + t_ser) * 1000:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# scripts/bench_user_import.py
+"""
+Benchmark voor POST /users/import.
+
+Importeert N users als CSV: het grootste deel als uitnodiging of met een
+vooraf berekende hash, plus --passwords rijen met een plaintext wachtwoord
+(bcrypt in de procespool; dat deel schaalt met het aantal CPU's).
+
+    python scripts/bench_user_import.py --users 50000 --passwords 200
+"""
+import argparse
+import io
+import time
+
+from benchutil import auth_header, create_schema, use_database
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=50_000)
+    ap.add_argument("--passwords", type=int, default=200, help="rijen met plaintext wachtwoord")
+    ap.add_argument("--prehashed", type=float, default=0.5, help="aandeel rijen met password_hash")
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    import os
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal
+    from app.main import app
+    from app import models
+    from app.security import hash_password
+
+    pw = hash_password("Bench!1234")
+    with SessionLocal() as db:
+        org = models.Organization(name="Bench", slug="bench")
+        admin = models.User(email="admin@bench.local", name="Admin", password_hash=pw)
+        db.add_all([org, admin]); db.flush()
+        db.add(models.Membership(user_id=admin.id, org_id=org.id, role=models.Role.ADMIN))
+        db.commit()
+        admin_id = admin.id
+
+    buf = io.StringIO()
+    buf.write("email,name,password,password_hash,role\n")
+    n_hashed = int(args.users * args.prehashed)
+    for i in range(args.users):
+        if i < args.passwords:
+            buf.write(f"u{i}@bench-import.nl,User {i},Wachtwoord{i}!,,\n")
+        elif i < args.passwords + n_hashed:
+            buf.write(f"u{i}@bench-import.nl,User {i},,{pw},\n")
+        else:
+            buf.write(f"u{i}@bench-import.nl,User {i},,,\n")
+    body = buf.getvalue().encode()
+
+    with TestClient(app) as client:
+        t0 = time.perf_counter()
+        r = client.post("/users/import?slug=bench", content=body,
+                        headers={**auth_header(admin_id), "Content-Type": "text/csv"})
+        dt = time.perf_counter() - t0
+        r.raise_for_status()
+        report = r.json()
+    print(f"import {args.users} rijen ({args.passwords} gehasht, {n_hashed} pre-hashed) "
+          f"op {os.cpu_count()} CPU's: {dt:.1f}s")
+    print({k: v for k, v in report.items() if k != "errors"})
+    if report["errors"]:
+        print(report["errors"][:3])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/bench_user_search.py
+"""
+Benchmark voor het zoeken in users (GET /users?q=...).
+
+Zaait N users (triggers vullen de zoekindex mee) en meet per zoekterm de
+latency van de oude LIKE-scan tegenover app.search (FTS5 / pg_trgm), elk
+met LIMIT 50 zoals de admin-UI.
+
+    python scripts/bench_user_search.py --users 1000000
+"""
+import argparse
+import random
+import time
+
+from benchutil import create_schema, summary, use_database
+
+FIRST = ["jan", "piet", "klaas", "anna", "sanne", "fatima", "mohammed", "lisa", "daan", "emma",
+         "noah", "julia", "sem", "tess", "lucas", "mila", "finn", "zoë", "levi", "sara"]
+LAST = ["jansen", "de vries", "van dijk", "bakker", "visser", "smit", "meijer", "de boer",
+        "mulder", "de groot", "bos", "vos", "peters", "hendriks", "van leeuwen", "dekker"]
+DOMAINS = ["zorg.nl", "gemeente.nl", "school.nl", "bank.nl", "logistiek.nl"]
+TERMS = ["jans", "piet de", "zorg", "emma bakker", "u123456", "xyzzy"]
+
+
+def _by_id(query, id_key):
+    return query.order_by(id_key)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    from app.database import SessionLocal
+    from app import models
+    from app.bulk import chunked
+    from app.search import _like, apply_search
+
+    rng = random.Random(42)
+    t0 = time.perf_counter()
+    with SessionLocal() as db:
+        for batch in chunked(range(args.users), 50_000):
+            rows = []
+            for i in batch:
+                first, last = rng.choice(FIRST), rng.choice(LAST)
+                rows.append({"email": f"{first}.{last.replace(' ', '')}.u{i}@{rng.choice(DOMAINS)}",
+                             "name": f"{first.title()} {last}", "password_hash": "x", "is_active": True})
+            db.execute(models.User.__table__.insert(), rows)
+        db.commit()
+    print(f"seed {args.users} users: {time.perf_counter() - t0:.1f}s")
+
+    with SessionLocal() as db:
+        for term in TERMS:
+            for label, build in (
+                ("like", lambda: db.query(models.User).filter(_like(term).condition).order_by(models.User.id)),
+                ("index", lambda: _by_id(*apply_search(db, db.query(models.User), term))),
+                ("index+rank", lambda: apply_search(db, db.query(models.User), term, by_relevance=True)[0]),
+            ):
+                samples, hits = [], 0
+                for _ in range(args.repeat):
+                    t = time.perf_counter()
+                    hits = len(build().limit(50).all())
+                    samples.append(time.perf_counter() - t)
+                    db.expunge_all()
+                s = summary(samples)
+                print(f"{term!r:<16} {label:<11} hits={hits:<3} p50={s['p50_ms']:8.2f} ms  p95={s['p95_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
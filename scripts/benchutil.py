@@ -0,0 +1,111 @@
+# scripts/benchutil.py
+"""
+Gedeelde helpers voor de benchmark-scripts.
+
+Importeer dit vóór `app.*`: de engine wordt bij import uit DATABASE_URL
+gebouwd. Zonder DATABASE_URL draait alles op een tijdelijke SQLite-file.
+"""
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def use_database(url: str | None = None) -> str:
+    url = url or os.environ.get("DATABASE_URL")
+    if not url:
+        url = f"sqlite:///{tempfile.mkdtemp(prefix='cybaware-bench-')}/bench.db"
+    os.environ["DATABASE_URL"] = url
+    return url
+
+
+def create_schema() -> None:
+    from app.database import Base, engine
+    from app import models, search  # noqa: F401  (registreert alle tabellen + zoekindex)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def auth_header(user_id: int) -> dict:
+    from app.security import create_access_token
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summary(samples: list[float]) -> dict:
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+@contextmanager
+def timed(label: str, results: dict | None = None):
+    t0 = time.perf_counter()
+    yield
+    dt = time.perf_counter() - t0
+    if results is not None:
+        results[label] = dt
+    print(f"{label:<40} {dt * 1000:10.1f} ms")
+
+
+class StatementCounter:
+    """
+    Telt SQL-statements op één of meer engines (standaard app.database en app.db)
+    zolang hij actief is:
+
+        with StatementCounter() as sc:
+            client.get(...)
+        sc.count, sc.statements
+    """
+
+    def __init__(self, *engines):
+        if not engines:
+            from app import database, db
+            engines = (database.engine, db.engine)
+        self.engines = engines
+        self.statements: list[str] = []
+        self._listener = self._record  # event.remove wil hetzelfde object terug
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "StatementCounter":
+        from sqlalchemy import event
+        self.statements = []
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._listener)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        from sqlalchemy import event
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._listener)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def report(self, width: int = 160) -> str:
+        """Per statement-vorm (witruimte genormaliseerd) hoe vaak; herhalingen = N+1-verdacht."""
+        shapes = Counter(re.sub(r"\s+", " ", s).strip() for s in self.statements)
+        return "\n".join(f"{n:5d} x {shape[:width]}" for shape, n in shapes.most_common())
@@ -0,0 +1,136 @@
+# scripts/check_query_budgets.py
+"""
+SQL-statementbudget per endpoint: faalt (exit code 1) als een endpoint meer
+statements doet dan zijn budget, met de statements erbij.
+
+Performance-regressies zijn hier bijna altijd extra queries: een lazy
+relationship in my_trainings, een query per e-mail in enroll_users, een
+dubbele org-lookup. Elk endpoint draait daarom tegen twee orgs: een kleine en
+een tien keer zo grote. Het budget is een vast getal, dus een N+1 valt al op
+bij de kleine org; verschilt het aantal tussen klein en groot, dan meldt het
+script dat apart.
+
+Caches (response-cache, company-index) worden vóór elke request geleegd: het
+budget geldt voor de koude request. Eenmalige kosten per proces tellen niet
+mee: eerst gaat elk endpoint één keer langs een derde org.
+
+    python scripts/check_query_budgets.py
+    python scripts/check_query_budgets.py --small 30 --large 300 -v
+"""
+import argparse
+import sys
+
+from benchutil import StatementCounter, auth_header, create_schema, use_database
+
+# endpoint -> maximum aantal statements (auth: user + org + membership = 3)
+BUDGETS = {
+    "my_trainings": 3,
+    "my_progress": 2,
+    "progress_update": 4,
+    "org_progress": 5,
+    "list_users": 4,
+    "search_users": 4,
+    "list_companies": 5,
+    "company_suggest": 4,
+    "catalog": 6,            # trainings + selectinload modules
+    "org_stats": 10,         # vier tellingen + twee aggregaten
+    "training_stats": 9,
+    "enroll_users": 12,      # e-mails in één IN, enrollments en progress elk één insert
+    "enroll_audience": 7,    # twee INSERT ... SELECT
+}
+
+
+def requests_for(org, learner: tuple[int, int], emails: list[str]) -> dict:
+    """endpoint -> (method, url, user_id, json)"""
+    slug, training_id = org.slug, org.training_ids[0]
+    user_id, module_id = learner
+    return {
+        "my_trainings": ("GET", "/progress/me/trainings", user_id, None),
+        "my_progress": ("GET", "/progress/me", user_id, None),
+        "progress_update": ("POST", "/progress/", user_id,
+                            {"module_id": module_id, "status": "IN_PROGRESS", "percent": 40}),
+        "org_progress": ("GET", f"/progress/org/{slug}?limit=5000", org.admin_id, None),
+        "list_users": ("GET", f"/users?slug={slug}&limit=200", org.admin_id, None),
+        "search_users": ("GET", f"/users?slug={slug}&q=anna&limit=50", org.admin_id, None),
+        "list_companies": ("GET", f"/organizations/{slug}/companies/?limit=100", org.manager_id, None),
+        "company_suggest": ("GET", f"/organizations/{slug}/companies/suggest?q=bedrijf", org.manager_id, None),
+        "catalog": ("GET", f"/organizations/{slug}/trainings/?limit=100", org.manager_id, None),
+        "org_stats": ("GET", f"/organizations/{slug}/stats/", org.manager_id, None),
+        "training_stats": ("GET", f"/organizations/{slug}/stats/trainings/{training_id}", org.manager_id, None),
+        "enroll_users": ("POST", f"/organizations/{slug}/trainings/{training_id}/enroll", org.admin_id,
+                         {"emails": emails}),
+        "enroll_audience": ("POST", f"/organizations/{slug}/trainings/{org.training_ids[1]}/enroll/audience",
+                            org.admin_id, {"audience": "org"}),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--small", type=int, default=20, help="users in de kleine org")
+    ap.add_argument("--large", type=int, default=200, help="users in de grote org")
+    ap.add_argument("-v", "--verbose", action="store_true", help="statements ook tonen als alles binnen budget is")
+    args = ap.parse_args()
+
+    use_database()
+    create_schema()
+
+    import seed as seeding
+    from fastapi.testclient import TestClient
+    from sqlalchemy import select
+    from app import models
+    from app.company_index import company_index
+    from app.database import SessionLocal
+    from app.main import app
+    from app.response_cache import response_cache
+
+    orgs = {}
+    for label, users in (("opwarmen", args.small), ("klein", args.small), ("groot", args.large)):
+        scale = seeding.Scale(users_per_org=users, companies_per_org=users // 4, trainings_per_org=max(2, users // 20),
+                              modules_per_training=5, enroll_ratio=0.5)
+        orgs[label] = seeding.generate(scale, log=lambda msg: None)[0]
+
+    with SessionLocal() as db:
+        learners = {}
+        for label, org in orgs.items():
+            learners[label] = db.execute(
+                select(models.Progress.user_id, models.Progress.module_id)
+                .join(models.Module, models.Module.id == models.Progress.module_id)
+                .where(models.Module.training_id == org.training_ids[0]).limit(1)
+            ).one()
+    emails = {label: [f"u{i}@{org.slug}.example" for i in range(n)] + [f"onbekend@{org.slug}.example"]
+              for (label, org), n in zip(orgs.items(), (args.small, args.small, args.large))}
+
+    failures = 0
+    print(f"{'endpoint':<17} {'budget':>6} {'klein':>6} {'groot':>6}  status")
+    with TestClient(app) as client:
+        plans = {label: requests_for(org, learners[label], emails[label]) for label, org in orgs.items()}
+        # eenmalige kosten (metadata, caches die bij de eerste request gevuld worden) niet meetellen
+        for method, url, user_id, body in plans.pop("opwarmen").values():
+            client.request(method, url, headers=auth_header(user_id), json=body)
+        for name, budget in BUDGETS.items():
+            counts, reports, problems = {}, {}, []
+            for label in plans:
+                method, url, user_id, body = plans[label][name]
+                response_cache.clear()
+                company_index.clear()
+                with StatementCounter() as sc:
+                    r = client.request(method, url, headers=auth_header(user_id), json=body)
+                if r.status_code >= 400:
+                    problems.append(f"{label}: HTTP {r.status_code} {r.text[:200]}")
+                counts[label], reports[label] = sc.count, sc.report()
+            if any(n > budget for n in counts.values()):
+                problems.append("boven budget")
+            if counts["klein"] != counts["groot"]:
+                problems.append("groeit met de data (N+1?)")
+            print(f"{name:<17} {budget:6d} {counts['klein']:6d} {counts['groot']:6d}  {'; '.join(problems) or 'ok'}")
+            if problems:
+                failures += 1
+            if problems or args.verbose:
+                print(reports["groot"])
+    if failures:
+        print(f"{failures} endpoint(s) buiten budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# scripts/explain_hot_queries.py
+"""
+Queryplannen en timings van de hot queries, vóór en na de index-migratie
+f3b8d2a6c914 (hot path indexes).
+
+Bouwt het schema via Alembic tot BEFORE, zaait een dataset (seed.generate),
+draait ANALYZE en meet elke query; daarna `alembic upgrade head` op
+dezelfde database, weer ANALYZE, en dezelfde queries nog eens. Per query:
+het plan (EXPLAIN QUERY PLAN / EXPLAIN) van vóór en na, en p50/p95.
+
+De queries zijn die van de endpoints zelf (zelfde filters, joins en
+sortering), met ids uit de laatst gezaaide org.
+
+    python scripts/explain_hot_queries.py
+    python scripts/explain_hot_queries.py --orgs 4 --users-per-org 20000 --repeat 50
+"""
+import argparse
+
+from benchutil import ROOT, summary, use_database
+
+BEFORE = "e7a9c1d3f5b2"
+
+
+def hot_queries(org, user_id: int) -> dict:
+    """naam (endpoint: wat) -> Core select, zoals de routers ze opbouwen."""
+    from sqlalchemy import case, func, select
+    from app import models
+    from app.enrollment import audience_query
+    from app.responses import TRAINING_COLUMNS
+
+    M, T, Mod, E, P = models.Membership, models.Training, models.Module, models.Enrollment, models.Progress
+    training_id = org.training_ids[0]
+    progress_agg = select(
+        func.count(P.id), func.avg(P.percent),
+        func.sum(case((P.status == models.ProgressStatus.COMPLETED, 1), else_=0)),
+    ).join(Mod, Mod.id == P.module_id)
+    enroll_agg = select(
+        func.count(E.id), func.sum(case((E.status == models.EnrollmentStatus.COMPLETED, 1), else_=0)),
+    )
+    return {
+        "deps: membership": select(M).filter_by(user_id=user_id, org_id=org.id).limit(1),
+        "catalog: trainings": select(*TRAINING_COLUMNS)
+        .where(T.org_id == org.id, T.is_active.is_(True))
+        .order_by(T.created_at.desc(), T.id.desc()).limit(51),
+        "my_trainings": select(E.status, *TRAINING_COLUMNS)
+        .join(T, T.id == E.training_id).where(E.user_id == user_id).order_by(E.id),
+        "my_progress": select(P).where(P.user_id == user_id).order_by(P.module_id),
+        "training_stats: enrolled": select(func.count(E.id)).where(E.training_id == training_id),
+        "training_stats: progress": progress_agg.where(Mod.training_id == training_id),
+        "training_stats: enrollments": enroll_agg.where(E.training_id == training_id),
+        "org_stats: members": select(func.count(M.id))
+        .join(models.User, models.User.id == M.user_id)
+        .where(M.org_id == org.id, models.User.is_active.is_(True)),
+        "org_stats: progress": progress_agg.join(T, T.id == Mod.training_id).where(T.org_id == org.id),
+        "org_stats: enrollments": enroll_agg.join(T, T.id == E.training_id).where(T.org_id == org.id),
+        "enroll_audience: managers": audience_query(org.id, role=models.Role.MANAGER),
+    }
+
+
+def measure(engine, queries: dict, repeat: int) -> dict:
+    import time
+    explain = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    out = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in conn.exec_driver_sql(explain + sql)]
+            conn.exec_driver_sql(sql).all()  # pagecache warm
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.exec_driver_sql(sql).all()
+                samples.append(time.perf_counter() - t0)
+            out[name] = {"plan": plan, **summary(samples)}
+    return out
+
+
+def analyze(engine) -> None:
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orgs", type=int, default=4)
+    ap.add_argument("--users-per-org", type=int, default=20_000)
+    ap.add_argument("--trainings-per-org", type=int, default=20)
+    ap.add_argument("--modules", type=int, default=5)
+    ap.add_argument("--enroll-ratio", type=float, default=0.3)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--plans", action=argparse.BooleanOptionalAction, default=True)
+    args = ap.parse_args()
+
+    use_database()
+
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import select
+
+    import seed as seeding
+    from app import models
+    from app.database import engine
+
+    cfg = Config(str(ROOT / "alembic.ini"))
+    command.upgrade(cfg, BEFORE)
+    orgs = seeding.generate(seeding.Scale(
+        orgs=args.orgs, users_per_org=args.users_per_org, trainings_per_org=args.trainings_per_org,
+        modules_per_training=args.modules, enroll_ratio=args.enroll_ratio,
+    ))
+    print(seeding.table_counts())
+    org = orgs[-1]
+    with engine.connect() as conn:
+        E = models.Enrollment
+        user_id = conn.execute(
+            select(E.user_id).where(E.training_id == org.training_ids[0]).order_by(E.id).limit(1)
+        ).scalar_one()
+    queries = hot_queries(org, user_id)
+
+    analyze(engine)
+    before = measure(engine, queries, args.repeat)
+    command.upgrade(cfg, "head")
+    analyze(engine)
+    after = measure(engine, queries, args.repeat)
+
+    print(f"\n{'query':<30} {'p50 vóór':>10} {'p50 na':>10} {'p95 vóór':>10} {'p95 na':>10}  factor")
+    for name in queries:
+        b, a = before[name], after[name]
+        factor = b["p50_ms"] / a["p50_ms"] if a["p50_ms"] else float("inf")
+        print(f"{name:<30} {b['p50_ms']:10.2f} {a['p50_ms']:10.2f} {b['p95_ms']:10.2f} {a['p95_ms']:10.2f}  {factor:5.1f}x")
+    if args.plans:
+        for name in queries:
+            print(f"\n== {name}")
+            for label, result in (("vóór", before[name]), ("na", after[name])):
+                for i, line in enumerate(result["plan"]):
+                    print(f"  {label if i == 0 else '':<5} {line}")
+
+
+if __name__ == "__main__":
+    main()
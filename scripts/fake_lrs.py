@@ -0,0 +1,156 @@
+# scripts/fake_lrs.py
+"""
+Nep-LRS-client + benchmark voor de xAPI-ingest.
+
+FakeLRSClient bouwt realistische statements (launched/progressed/completed)
+en post ze in batches naar /organizations/{slug}/xapi/statements; een 503
+wordt gerespecteerd via Retry-After. Bruikbaar met TestClient of httpx.
+
+Benchmark:
+    python scripts/fake_lrs.py --statements 50000 --users 2000 --modules 10
+    DATABASE_URL=postgresql+psycopg://... python scripts/fake_lrs.py
+"""
+import argparse
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from benchutil import auth_header, create_schema, use_database
+
+VERBS = "http://adlnet.gov/expapi/verbs/"
+
+
+class FakeLRSClient:
+    def __init__(self, http, slug: str, headers: dict):
+        self.http = http
+        self.url = f"/organizations/{slug}/xapi/statements"
+        self.headers = {**headers, "X-Experience-API-Version": "1.0.3"}
+        self.retries = 0
+
+    @staticmethod
+    def statement(email: str, activity_id: str, verb: str, *, percent=None, scaled=None,
+                  completion=None, at: datetime | None = None) -> dict:
+        result: dict = {}
+        if completion is not None:
+            result["completion"] = completion
+        if scaled is not None:
+            result["score"] = {"scaled": scaled}
+        if percent is not None:
+            result["extensions"] = {"https://w3id.org/xapi/cmi5/result/extensions/progress": percent}
+        st = {
+            "id": str(uuid.uuid4()),
+            "actor": {"mbox": f"mailto:{email}", "objectType": "Agent"},
+            "verb": {"id": VERBS + verb, "display": {"en-US": verb}},
+            "object": {"id": activity_id, "objectType": "Activity"},
+            "timestamp": (at or datetime.now(timezone.utc)).isoformat(),
+        }
+        if result:
+            st["result"] = result
+        return st
+
+    def session(self, email: str, activity_id: str, rng: random.Random) -> list[dict]:
+        """Eén leersessie: launched, een paar progressed, soms completed."""
+        t = datetime.now(timezone.utc) - timedelta(minutes=30)
+        out = [self.statement(email, activity_id, "launched", at=t)]
+        pct = 0
+        for _ in range(rng.randint(1, 4)):
+            pct = min(100, pct + rng.randint(10, 40))
+            t += timedelta(minutes=3)
+            out.append(self.statement(email, activity_id, "progressed", percent=pct, at=t))
+        if rng.random() < 0.6:
+            out.append(self.statement(email, activity_id, "completed", completion=True,
+                                      scaled=round(rng.uniform(0.5, 1.0), 2), at=t + timedelta(minutes=1)))
+        return out
+
+    def send(self, statements: list[dict], batch_size: int = 1000) -> list[str]:
+        ids: list[str] = []
+        for i in range(0, len(statements), batch_size):
+            batch = statements[i:i + batch_size]
+            while True:
+                r = self.http.post(self.url, json=batch, headers=self.headers)
+                if r.status_code == 503:
+                    self.retries += 1
+                    time.sleep(float(r.headers.get("Retry-After", "1")))
+                    continue
+                r.raise_for_status()
+                ids.extend(r.json())
+                break
+        return ids
+
+
+def _seed(users: int, modules: int):
+    from sqlalchemy import literal, select
+    from app.database import SessionLocal
+    from app import models
+    from app.security import hash_password
+
+    pw = hash_password("Bench!1234")
+    with SessionLocal() as db:
+        org = models.Organization(name="Bench", slug="bench")
+        db.add(org); db.flush()
+        admin = models.User(email="admin@bench.local", name="Admin", password_hash=pw)
+        db.add(admin); db.flush()
+        db.add(models.Membership(user_id=admin.id, org_id=org.id, role=models.Role.ADMIN))
+        tr = models.Training(org_id=org.id, title="Bench")
+        db.add(tr); db.flush()
+        db.execute(models.Module.__table__.insert(), [
+            {"training_id": tr.id, "title": f"M{i}", "order_index": i, "duration_min": 10,
+             "content_url": f"https://content.local/scorm/{i}"} for i in range(1, modules + 1)
+        ])
+        db.execute(models.User.__table__.insert(), [
+            {"email": f"u{i}@bench.local", "name": f"U{i}", "password_hash": pw, "is_active": True}
+            for i in range(users)
+        ])
+        db.execute(models.Membership.__table__.insert().from_select(
+            ["user_id", "org_id", "role"],
+            select(models.User.id, literal(org.id), literal(models.Role.EMPLOYEE.value))
+            .where(models.User.id != admin.id),
+        ))
+        db.commit()
+        return admin.id
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--statements", type=int, default=20_000)
+    ap.add_argument("--users", type=int, default=1_000)
+    ap.add_argument("--modules", type=int, default=10)
+    ap.add_argument("--batch", type=int, default=1_000)
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    url = use_database()
+    os.environ["XAPI_WORKER_ENABLED"] = "false"   # verwerking apart meten
+    create_schema()
+    admin_id = _seed(args.users, args.modules)
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.xapi import worker
+
+    rng = random.Random(args.seed)
+    lrs = FakeLRSClient(TestClient(app), "bench", auth_header(admin_id))
+    statements: list[dict] = []
+    while len(statements) < args.statements:
+        email = f"u{rng.randrange(args.users)}@bench.local"
+        activity = f"https://content.local/scorm/{rng.randint(1, args.modules)}"
+        statements.extend(lrs.session(email, activity, rng))
+    statements = statements[:args.statements]
+
+    print(f"database: {url.split('@')[-1]}")
+    t0 = time.perf_counter()
+    lrs.send(statements, args.batch)
+    t_ingest = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    processed = worker.drain()
+    t_apply = time.perf_counter() - t0
+
+    n = len(statements)
+    print(f"ingest : {n} statements in {t_ingest:.2f}s  -> {n / t_ingest:,.0f} st/s (503-retries: {lrs.retries})")
+    print(f"apply  : {processed} statements in {t_apply:.2f}s  -> {processed / t_apply:,.0f} st/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# scripts/live_broker.py
+"""
+Lokale stand-in broker voor de live feed bij meerdere workers.
+
+Elke regel die een worker stuurt gaat naar alle verbonden workers (ook de
+afzender). Start met:  python scripts/live_broker.py [host:port]
+en zet LIVE_BACKEND=broker in de .env van de workers.
+
+Een worker die niet bijleest wordt losgekoppeld zodra er meer dan
+MAX_BUFFER_BYTES voor hem klaarstaat, net als een volle abonnee-queue in de
+hub; hij verbindt zelf opnieuw (BrokerBackend) en mist alleen de events van
+tussendoor. Wachten (drain) in de fan-out zou één trage worker iedereen
+laten ophouden.
+"""
+import asyncio
+import sys
+
+MAX_BUFFER_BYTES = 1 << 20  # per worker, nog niet door de kernel aangenomen
+
+clients: set[asyncio.StreamWriter] = set()
+
+
+def _drop(w: asyncio.StreamWriter) -> None:
+    clients.discard(w)
+    w.transport.abort()  # close() zou eerst de hele achterstand nog willen versturen
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    clients.add(writer)
+    try:
+        while line := await reader.readline():
+            for w in tuple(clients):
+                if w.transport.get_write_buffer_size() > MAX_BUFFER_BYTES:
+                    print(f"live broker: {w.get_extra_info('peername')} leest niet bij; losgekoppeld")
+                    _drop(w)
+                    continue
+                try:
+                    w.write(line)
+                except Exception:
+                    _drop(w)
+    finally:
+        clients.discard(writer)
+        writer.close()
+
+
+async def main(addr: str):
+    host, port = addr.rsplit(":", 1)
+    server = await asyncio.start_server(handle, host, int(port))
+    print(f"live broker luistert op {addr}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1:7655"))
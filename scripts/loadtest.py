@@ -0,0 +1,368 @@
+# scripts/loadtest.py
+"""
+Load-test van de belangrijkste endpoints met een realistische mix.
+
+Zaait een dataset met de generator uit scripts/seed.py (grootte instelbaar),
+start de app in-process (httpx via ASGI, met lifespan) of onder uvicorn
+(--uvicorn, echte TCP + workers) en laat --concurrency virtuele gebruikers
+--duration seconden lang requests doen:
+
+  heartbeat     POST /progress/                       leerling werkt voortgang bij
+  my_trainings  GET  /progress/me/trainings           leerling opent dashboard
+  stats         GET  /organizations/{slug}/stats/     manager-dashboard pollt
+  list_users    GET  /users?slug=...                  admin bladert
+  search_users  GET  /users?slug=...&q=...            admin zoekt
+  companies     GET  /organizations/{slug}/companies/ manager bladert
+  enroll        POST /organizations/{slug}/trainings/{id}/enroll  bulk (100 e-mails)
+
+Per endpoint: aantal, fouten per status, foutpercentage, throughput en
+p50/p95/p99. Latency en throughput tellen alleen geslaagde (2xx/3xx)
+responses: een snelle 503 is geen snelle request. Op 429/503 wacht een
+virtuele gebruiker de Retry-After af in plaats van door te hameren.
+De adaptieve concurrency-limiet (app/concurrency.py) staat standaard uit,
+zodat de app gemeten wordt en niet het afwijzen; --concurrency-limit zet
+hem aan.
+
+Het resultaat gaat als JSON naar --out (standaard loadtest-results/), met
+commit, dataset en instellingen erbij, zodat runs tussen commits te
+vergelijken zijn:
+
+    python scripts/loadtest.py run --users 20000 --duration 30 --concurrency 32
+    python scripts/loadtest.py run --uvicorn --workers 4 --database-url postgresql+psycopg://...
+    python scripts/loadtest.py compare loadtest-results/a.json loadtest-results/b.json
+
+compare geeft exit code 1 als een endpoint meer dan --threshold procent
+slechter is (p95 omhoog of throughput omlaag), of als het foutpercentage
+meer dan --error-threshold procentpunt stijgt.
+
+Zonder --database-url draait alles offline op een tijdelijke SQLite-file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from benchutil import ROOT, create_schema, summary, use_database
+
+DEFAULT_MIX = "heartbeat=60,my_trainings=10,stats=10,list_users=8,search_users=6,companies=5,enroll=1"
+
+
+# ─────────────────────────────────────────────
+#   Dataset
+# ─────────────────────────────────────────────
+def build_dataset(args) -> dict:
+    """Via de generator in scripts/seed.py; dezelfde --seed geeft dezelfde dataset."""
+    from sqlalchemy import select
+
+    import seed as seeding
+    from app import models
+    from app.database import engine
+
+    scale = seeding.Scale(
+        orgs=args.orgs, users_per_org=args.users, companies_per_org=args.companies,
+        trainings_per_org=args.trainings, modules_per_training=args.modules,
+        enroll_ratio=args.enroll_ratio, seed=args.seed,
+    )
+    org = seeding.generate(scale, log=lambda msg: None)[0]  # de load-test draait tegen de eerste org
+
+    # werkset voor de leerling-scenario's: een vaste steekproef van progress-rijen
+    P, Mod, T = models.Progress.__table__, models.Module.__table__, models.Training.__table__
+    counts = seeding.table_counts()
+    step = max(1, counts["progress"] // args.orgs // args.learners)
+    with engine.connect() as conn:
+        learners = list(conn.execute(
+            select(P.c.user_id, P.c.module_id)
+            .join(Mod, Mod.c.id == P.c.module_id).join(T, T.c.id == Mod.c.training_id)
+            .where(T.c.org_id == org.id, P.c.id % step == 0).order_by(P.c.id).limit(args.learners)
+        ).tuples())
+    return {
+        "slug": org.slug,
+        "admin_id": org.admin_id,
+        "manager_id": org.manager_id,
+        "training_ids": org.training_ids,
+        "learners": learners,
+        "counts": {"orgs": args.orgs, **counts},
+    }
+
+
+# ─────────────────────────────────────────────
+#   Scenario's
+# ─────────────────────────────────────────────
+class Scenarios:
+    def __init__(self, data: dict, users: int):
+        from app.security import create_access_token
+
+        self.users = users
+        self.slug = data["slug"]
+        self.training_ids = data["training_ids"]
+        self.learners = data["learners"]
+        self.admin = {"Authorization": f"Bearer {create_access_token(data['admin_id'])}"}
+        self.manager = {"Authorization": f"Bearer {create_access_token(data['manager_id'])}"}
+        self.tokens = {u: {"Authorization": f"Bearer {create_access_token(u)}"} for u, _ in self.learners}
+        self.words = ["anna", "bram", "jansen", "visser", "de boer", "eva", "u12", "example"]
+
+    def request(self, name: str, rng: random.Random) -> tuple[str, str, dict, dict | None]:
+        """(method, url, headers, json); rng per virtuele gebruiker, dus reproduceerbaar"""
+        if name == "heartbeat":
+            user_id, module_id = rng.choice(self.learners)
+            body = {"module_id": module_id, "status": "IN_PROGRESS", "percent": float(rng.randint(1, 99))}
+            return "POST", "/progress/", self.tokens[user_id], body
+        if name == "my_trainings":
+            user_id, _ = rng.choice(self.learners)
+            return "GET", "/progress/me/trainings", self.tokens[user_id], None
+        if name == "stats":
+            return "GET", f"/organizations/{self.slug}/stats/", self.manager, None
+        if name == "list_users":
+            return "GET", f"/users?slug={self.slug}&limit=50&offset={rng.randrange(0, 20) * 50}", self.admin, None
+        if name == "search_users":
+            return "GET", f"/users?slug={self.slug}&limit=20&q={rng.choice(self.words)}", self.admin, None
+        if name == "companies":
+            return "GET", f"/organizations/{self.slug}/companies/?limit=50", self.manager, None
+        if name == "enroll":
+            emails = [f"u{rng.randrange(self.users)}@{self.slug}.example" for _ in range(100)]
+            url = f"/organizations/{self.slug}/trainings/{rng.choice(self.training_ids)}/enroll"
+            return "POST", url, self.admin, {"emails": emails}
+        raise ValueError(name)
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def drive(client, scenarios: Scenarios, mix: dict[str, int], args) -> tuple[dict, float]:
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    measure_from = time.perf_counter() + args.warmup
+    stop_at = measure_from + args.duration
+
+    async def user(seed: int):
+        rng = random.Random(seed)
+        while (now := time.perf_counter()) < stop_at:
+            name = rng.choices(names, weights)[0]
+            method, url, headers, body = scenarios.request(name, rng)
+            t0 = time.perf_counter()
+            retry_after = 0.0
+            try:
+                r = await client.request(method, url, headers=headers, json=body)
+                status = r.status_code
+                if status in (429, 503):
+                    retry_after = _retry_after(r.headers.get("retry-after"))
+            except Exception:
+                status = 0  # verbindingsfout/timeout
+            dt = time.perf_counter() - t0
+            if now >= measure_from:
+                statuses[name][status] += 1
+                if 200 <= status < 400:
+                    samples[name].append(dt)
+            if retry_after:
+                await asyncio.sleep(min(retry_after, max(0.0, stop_at - time.perf_counter())))
+
+    await asyncio.gather(*(user(args.seed * 1000 + i) for i in range(args.concurrency)))
+    results = {}
+    for name in names:
+        s = summary(samples[name])
+        s["rps"] = s["n"] / args.duration
+        s["status"] = {str(k): v for k, v in sorted(statuses[name].items())}
+        s["errors"] = sum(v for k, v in statuses[name].items() if not 200 <= k < 400)
+        attempts = sum(statuses[name].values())
+        s["error_rate"] = s["errors"] / attempts if attempts else 0.0
+        results[name] = s
+    total = sum(len(v) for v in samples.values())
+    return results, total / args.duration
+
+
+def _retry_after(value) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+async def run_inprocess(scenarios, mix, args):
+    import httpx
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            return await drive(client, scenarios, mix, args)
+
+
+async def run_uvicorn(scenarios, mix, args):
+    import httpx
+
+    base = f"http://127.0.0.1:{args.port}"
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT, env={**os.environ},
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+            else:
+                raise SystemExit("uvicorn kwam niet op")
+            return await drive(client, scenarios, mix, args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(endpoints: dict) -> None:
+    print(f"{'endpoint':<14} {'n':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'fouten':>7} {'fout%':>6}  status")
+    for name, s in endpoints.items():
+        print(f"{name:<14} {s['n']:7d} {s['rps']:8.1f} {s['p50_ms']:8.1f} {s['p95_ms']:8.1f} "
+              f"{s['p99_ms']:8.1f} {s['errors']:7d} {error_rate(s) * 100:6.1f}  {s['status']}")
+
+
+def error_rate(s: dict) -> float:
+    # oudere resultaten hebben geen error_rate: uit de statustelling afleiden
+    if "error_rate" in s:
+        return s["error_rate"]
+    attempts = sum(s.get("status", {}).values())
+    return s.get("errors", 0) / attempts if attempts else 0.0
+
+
+def cmd_run(args) -> None:
+    # vóór de app-import: de middleware wordt bij import wel of niet geïnstalleerd
+    os.environ["CONCURRENCY_LIMIT_ENABLED"] = "true" if args.concurrency_limit else "false"
+    url = use_database(args.database_url)
+    create_schema()
+
+    t0 = time.perf_counter()
+    data = build_dataset(args)
+    seed_seconds = time.perf_counter() - t0
+    print(f"dataset in {seed_seconds:.1f} s: {data['counts']}")
+
+    mix = parse_mix(args.mix)
+    scenarios = Scenarios(data, args.users)
+    runner = run_uvicorn if args.uvicorn else run_inprocess
+    endpoints, total_rps = asyncio.run(runner(scenarios, mix, args))
+
+    print_table(endpoints)
+    print(f"totaal: {total_rps:.1f} req/s")
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": url.split(":", 1)[0],
+            "server": f"uvicorn x{args.workers}" if args.uvicorn else "in-process",
+        },
+        "config": {k: v for k, v in vars(args).items() if k not in ("func", "database_url", "out")},
+        "dataset": {**data["counts"], "seed_seconds": round(seed_seconds, 2)},
+        "total_rps": total_rps,
+        "endpoints": endpoints,
+    }
+    out = Path(args.out) if args.out else (
+        ROOT / "loadtest-results" / f"{result['meta']['commit']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2))
+    print(f"resultaat: {out}")
+
+
+def cmd_compare(args) -> None:
+    base, new = (json.loads(Path(p).read_text()) for p in (args.base, args.new))
+    print(f"basis {base['meta']['commit']} ({base['meta']['server']})  vs  "
+          f"nieuw {new['meta']['commit']} ({new['meta']['server']})")
+    if base["dataset"].get("users") != new["dataset"].get("users") or base["config"].get("mix") != new["config"].get("mix"):
+        print("let op: dataset of mix verschilt tussen de runs")
+
+    def delta(a: float, b: float) -> float:
+        return (b - a) / a * 100 if a else 0.0
+
+    regressions = []
+    print(f"{'endpoint':<14} {'rps':>16} {'p50 ms':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    for name in new["endpoints"]:
+        a, b = base["endpoints"].get(name), new["endpoints"][name]
+        err_a, err_b = (error_rate(a) if a else 0.0), error_rate(b)
+        if (err_b - err_a) * 100 > args.error_threshold:
+            print(f"{name:<14} foutpercentage {err_a * 100:.1f}% -> {err_b * 100:.1f}%")
+            regressions.append(name)
+            continue
+        if not a or not a["n"] or not b["n"]:
+            print(f"{name:<14} (geen vergelijking)")
+            continue
+        cols = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            cols.append(f"{b[key]:8.1f} {delta(a[key], b[key]):+6.1f}%")
+        print(f"{name:<14} " + "  ".join(f"{c:>16}" for c in cols))
+        if delta(a["p95_ms"], b["p95_ms"]) > args.threshold or -delta(a["rps"], b["rps"]) > args.threshold:
+            regressions.append(name)
+    print(f"{'totaal':<14} {new['total_rps']:8.1f} {delta(base['total_rps'], new['total_rps']):+6.1f}%")
+    if regressions:
+        print(f"regressie (> {args.threshold:.0f}%): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="dataset zaaien en de mix draaien")
+    run.add_argument("--database-url", help="standaard: tijdelijke SQLite-file")
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument("--orgs", type=int, default=1, help="extra orgs maken de tabellen groter; getest wordt de eerste")
+    run.add_argument("--users", type=int, default=10_000, help="users per org")
+    run.add_argument("--companies", type=int, default=500, help="per org")
+    run.add_argument("--trainings", type=int, default=20, help="per org")
+    run.add_argument("--modules", type=int, default=5, help="per training")
+    run.add_argument("--enroll-ratio", type=float, default=0.3, help="deel van de trainingen per user")
+    run.add_argument("--learners", type=int, default=2000, help="leerlingen die heartbeats sturen")
+    run.add_argument("--mix", default=DEFAULT_MIX)
+    run.add_argument("--concurrency", type=int, default=16)
+    run.add_argument("--duration", type=float, default=20.0)
+    run.add_argument("--warmup", type=float, default=3.0)
+    run.add_argument("--uvicorn", action="store_true", help="onder uvicorn via TCP i.p.v. in-process")
+    run.add_argument("--workers", type=int, default=1)
+    run.add_argument("--port", type=int, default=8765)
+    run.add_argument("--concurrency-limit", action="store_true",
+                     help="adaptieve concurrency-limiet aan laten (standaard uit)")
+    run.add_argument("--out", help="JSON-resultaat (standaard loadtest-results/<commit>-<tijd>.json)")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="twee resultaten vergelijken")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.add_argument("--threshold", type=float, default=10.0, help="procent verslechtering die als regressie telt")
+    cmp_.add_argument("--error-threshold", type=float, default=1.0,
+                      help="stijging van het foutpercentage (procentpunt) die als regressie telt")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = ap.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,40 @@
 # scripts/seed.py
+"""
+Seed-data.
+
+    python scripts/seed.py                      # demo: één org, drie users, één company
+    python scripts/seed.py generate --orgs 4 --users-per-org 250000 \\
+        --trainings-per-org 20 --modules 10 --enroll-ratio 0.05   # ~10M progress-rijen
+
+`generate` is de schaalbare variant voor benchmarks en load-tests:
+
+- Core bulk inserts in batches (--batch-size), geen ORM-objecten
+- één bcrypt-hash, hergebruikt voor alle users (wachtwoord: --password)
+- enrollments en progress als INSERT ... SELECT in de database zelf, per
+  training één statement; Python ziet die rijen nooit
+- deterministisch per --seed: namen, sectoren en wie-in-welke-training en
+  hoe ver iemand is hangen alleen af van de seed en de volgorde van inserten
+
+Voortgang per enrollment (--progress, gewichten): not_started (alle modules
+NOT_STARTED), in_progress (modules vóór een willekeurig punt COMPLETED, dat
+punt IN_PROGRESS, de rest NOT_STARTED) en completed (alles COMPLETED). De
+enrollment-status volgt daaruit.
+
+Per org: slug org<n>, admin@org<n>.example (ADMIN), manager@org<n>.example
+(MANAGER) en u<i>@org<n>.example (EMPLOYEE).
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 
+from sqlalchemy import BigInteger, case, cast, func, insert, literal, select
+
 # Projectroot toevoegen zodat imports werken
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
@@ -63,5 +96,241 @@ def main():
     finally:
         db.close()
 
+
+# ─────────────────────────────────────────────
+#   Schaalbare generator
+# ─────────────────────────────────────────────
+FIRST_NAMES = ["Anna", "Bram", "Chantal", "Daan", "Eva", "Finn", "Gijs", "Hanna", "Iris", "Jeroen",
+               "Kim", "Lars", "Mila", "Noah", "Olga", "Pieter", "Roos", "Sem", "Tess", "Vera"]
+LAST_NAMES = ["de Vries", "Jansen", "Bakker", "Visser", "Smit", "Meijer", "Mulder", "de Boer",
+              "de Jong", "van Dijk", "Bos", "Vos", "Peters", "Hendriks", "van Leeuwen", "Dekker"]
+SECTORS = ["Zorg", "Onderwijs", "Overheid", "Financieel", "Logistiek", "Retail"]
+STAGES = ("not_started", "in_progress", "completed")
+BASE_DATE = datetime(2024, 1, 1)
+
+
+@dataclass
+class Scale:
+    orgs: int = 1
+    users_per_org: int = 1000
+    companies_per_org: int = 50
+    trainings_per_org: int = 10
+    modules_per_training: int = 5
+    enroll_ratio: float = 0.3          # deel van de trainingen waarin een user zit
+    progress: dict[str, int] = field(default_factory=lambda: {"not_started": 40, "in_progress": 35, "completed": 25})
+    seed: int = 1
+    password: str = "Seed!1234"
+    batch_size: int = 20_000
+
+
+@dataclass
+class OrgInfo:
+    id: int
+    slug: str
+    admin_id: int
+    manager_id: int
+    training_ids: list[int]
+
+
+def _hash(*cols, seed: int):
+    """Deterministische pseudo-random 0..9999 uit integer-kolommen; werkt in SQLite en Postgres."""
+    h = seed * 7919
+    for i, c in enumerate(cols):
+        # BigInteger: in Postgres loopt integer * integer anders over
+        h = h + cast(c, BigInteger) * (1_000_003 if i == 0 else 8_191)
+    return (h * 48_271) % 2_147_483_647 % 10_000
+
+
+def _thresholds(progress: dict[str, int]) -> tuple[int, int]:
+    total = sum(progress.get(s, 0) for s in STAGES) or 1
+    a = progress.get("not_started", 0) * 10_000 // total
+    b = a + progress.get("in_progress", 0) * 10_000 // total
+    return a, b
+
+
+def _prepare(conn) -> None:
+    if conn.dialect.name == "sqlite":
+        # alleen deze verbinding; bij een crash halverwege is de seed toch waardeloos
+        for pragma in ("synchronous=OFF", "cache_size=-262144", "temp_store=MEMORY"):
+            conn.exec_driver_sql(f"PRAGMA {pragma}")
+    elif conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET synchronous_commit = off")
+
+
+def generate(scale: Scale, engine=None, log=print) -> list[OrgInfo]:
+    from app.database import engine as default_engine
+
+    engine = engine or default_engine
+    rng = random.Random(scale.seed)
+    pw = hash_password(scale.password)  # één keer bcrypt
+    O, U, M, C, T, Mod, E, P = (models.Organization.__table__, models.User.__table__, models.Membership.__table__,
+                                models.Company.__table__, models.Training.__table__, models.Module.__table__,
+                                models.Enrollment.__table__, models.Progress.__table__)
+    not_started_below, in_progress_below = _thresholds(scale.progress)
+    NOT_STARTED, IN_PROGRESS, COMPLETED = (s.value for s in (
+        models.ProgressStatus.NOT_STARTED, models.ProgressStatus.IN_PROGRESS, models.ProgressStatus.COMPLETED))
+    enroll_below = int(scale.enroll_ratio * 10_000)
+    orgs: list[OrgInfo] = []
+    t0 = time.perf_counter()
+
+    with engine.connect() as conn:
+        _prepare(conn)
+        first_org = conn.execute(select(func.count()).select_from(O)).scalar_one()
+        for o in range(first_org, first_org + scale.orgs):
+            slug = f"org{o}"
+            org_id = conn.execute(insert(O).values(name=f"Organisatie {o}", slug=slug, created_at=BASE_DATE)
+                                  .returning(O.c.id)).scalar_one()
+
+            def user_row(email: str, name: str) -> dict:
+                return {"email": email, "name": name, "password_hash": pw, "is_active": True,
+                        "created_at": BASE_DATE}
+
+            admin_id, manager_id = (
+                conn.execute(insert(U).values(**user_row(f"{r}@{slug}.example", r.title())).returning(U.c.id)).scalar_one()
+                for r in ("admin", "manager")
+            )
+            conn.execute(insert(M), [
+                {"user_id": admin_id, "org_id": org_id, "role": models.Role.ADMIN.value},
+                {"user_id": manager_id, "org_id": org_id, "role": models.Role.MANAGER.value},
+            ])
+
+            first_user = None
+            for start in range(0, scale.users_per_org, scale.batch_size):
+                rows = [
+                    user_row(f"u{i}@{slug}.example", f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+                    for i in range(start, min(scale.users_per_org, start + scale.batch_size))
+                ]
+                conn.execute(insert(U), rows)
+                if first_user is None:
+                    first_user = conn.execute(select(U.c.id).where(U.c.email == rows[0]["email"])).scalar_one()
+            # ids van één org liggen aaneen: ze zijn net achter elkaar ingevoegd
+            if first_user is not None:
+                conn.execute(insert(M).from_select(
+                    ["user_id", "org_id", "role"],
+                    select(U.c.id, literal(org_id), literal(models.Role.EMPLOYEE.value)).where(U.c.id >= first_user),
+                ))
+
+            conn.execute(insert(C), [
+                {"org_id": org_id, "name": f"Bedrijf {o}-{i}", "kvk": f"{rng.randrange(10**7, 10**8)}",
+                 "sector": rng.choice(SECTORS), "email_domain": f"bedrijf{i}.{slug}.example", "is_active": True}
+                for i in range(scale.companies_per_org)
+            ])
+            conn.execute(insert(T), [
+                {"org_id": org_id, "title": f"Training {t}", "description": "Security awareness",
+                 "is_active": True, "created_at": BASE_DATE + timedelta(days=t)}
+                for t in range(scale.trainings_per_org)
+            ])
+            training_ids = list(conn.execute(select(T.c.id).where(T.c.org_id == org_id).order_by(T.c.id)).scalars())
+            conn.execute(insert(Mod), [
+                {"training_id": t, "title": f"Module {j}", "order_index": j, "duration_min": 10,
+                 "content_url": f"https://content.example/{t}/{j}"}
+                for t in training_ids for j in range(1, scale.modules_per_training + 1)
+            ])
+
+            for training_id in training_ids:
+                # wie zit erin en hoe ver: alleen afhankelijk van (user_id, training_id, seed)
+                enrolled = _hash(M.c.user_id, literal(training_id), seed=scale.seed)
+                stage = _hash(literal(training_id), M.c.user_id, seed=scale.seed + 1)
+                conn.execute(insert(E).from_select(
+                    ["user_id", "training_id", "status", "assigned_at", "completed_at"],
+                    select(
+                        M.c.user_id, literal(training_id),
+                        case((stage < not_started_below, literal(models.EnrollmentStatus.ASSIGNED.value)),
+                             (stage < in_progress_below, literal(models.EnrollmentStatus.IN_PROGRESS.value)),
+                             else_=literal(models.EnrollmentStatus.COMPLETED.value)),
+                        literal(BASE_DATE),
+                        case((stage >= in_progress_below, literal(BASE_DATE + timedelta(days=30))), else_=None),
+                    ).where(M.c.org_id == org_id, M.c.role == models.Role.EMPLOYEE.value, enrolled < enroll_below),
+                ))
+
+                # in_progress: modules vóór `reached` klaar, `reached` bezig, de rest niet begonnen
+                reached = _hash(E.c.user_id, literal(training_id), seed=scale.seed + 2) % scale.modules_per_training + 1
+                rows = select(
+                    E.c.user_id, Mod.c.id.label("module_id"),
+                    case(
+                        (E.c.status == models.EnrollmentStatus.ASSIGNED.value, literal(NOT_STARTED)),
+                        (E.c.status == models.EnrollmentStatus.COMPLETED.value, literal(COMPLETED)),
+                        (Mod.c.order_index < reached, literal(COMPLETED)),
+                        (Mod.c.order_index == reached, literal(IN_PROGRESS)),
+                        else_=literal(NOT_STARTED),
+                    ).label("status"),
+                ).select_from(E.join(Mod, Mod.c.training_id == E.c.training_id)).where(
+                    E.c.training_id == training_id
+                ).subquery()
+                conn.execute(insert(P).from_select(
+                    ["user_id", "module_id", "status", "percent", "started_at", "last_event_at", "completed_at"],
+                    select(
+                        rows.c.user_id, rows.c.module_id, rows.c.status,
+                        case((rows.c.status == COMPLETED, 100.0), (rows.c.status == IN_PROGRESS, 50.0), else_=0.0),
+                        case((rows.c.status != NOT_STARTED, literal(BASE_DATE + timedelta(days=1))), else_=None),
+                        literal(BASE_DATE + timedelta(days=2)),
+                        case((rows.c.status == COMPLETED, literal(BASE_DATE + timedelta(days=3))), else_=None),
+                    ),
+                ))
+            conn.commit()
+            orgs.append(OrgInfo(org_id, slug, admin_id, manager_id, training_ids))
+            log(f"{slug}: klaar na {time.perf_counter() - t0:.1f} s")
+    return orgs
+
+
+def table_counts(engine=None) -> dict[str, int]:
+    from app.database import engine as default_engine
+
+    tables = {"users": models.User, "companies": models.Company, "trainings": models.Training,
+              "modules": models.Module, "enrollments": models.Enrollment, "progress": models.Progress}
+    with (engine or default_engine).connect() as conn:
+        return {name: conn.execute(select(func.count()).select_from(m.__table__)).scalar_one()
+                for name, m in tables.items()}
+
+
+def _parse_progress(spec: str) -> dict[str, int]:
+    out = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in STAGES:
+            raise argparse.ArgumentTypeError(f"onbekende fase {name!r} (kies uit {', '.join(STAGES)})")
+        out[name.strip()] = int(weight)
+    return out
+
+
+def cli():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd")
+    gen = sub.add_parser("generate", help="schaalbare synthetische dataset")
+    d = Scale()
+    gen.add_argument("--orgs", type=int, default=d.orgs)
+    gen.add_argument("--users-per-org", type=int, default=d.users_per_org)
+    gen.add_argument("--companies-per-org", type=int, default=d.companies_per_org)
+    gen.add_argument("--trainings-per-org", type=int, default=d.trainings_per_org)
+    gen.add_argument("--modules", type=int, default=d.modules_per_training, help="modules per training")
+    gen.add_argument("--enroll-ratio", type=float, default=d.enroll_ratio)
+    gen.add_argument("--progress", type=_parse_progress, default=d.progress,
+                     help="gewichten, bv. not_started=40,in_progress=35,completed=25")
+    gen.add_argument("--seed", type=int, default=d.seed)
+    gen.add_argument("--password", default=d.password)
+    gen.add_argument("--batch-size", type=int, default=d.batch_size)
+    gen.add_argument("--create-schema", action="store_true", help="tabellen eerst aanmaken (create_all)")
+    args = ap.parse_args()
+
+    if args.cmd != "generate":
+        main()
+        return
+
+    if args.create_schema:
+        from app.database import Base, engine
+        from app import search  # noqa: F401  (zoekindex + triggers)
+        Base.metadata.create_all(engine)
+    scale = Scale(
+        orgs=args.orgs, users_per_org=args.users_per_org, companies_per_org=args.companies_per_org,
+        trainings_per_org=args.trainings_per_org, modules_per_training=args.modules,
+        enroll_ratio=args.enroll_ratio, progress=args.progress, seed=args.seed,
+        password=args.password, batch_size=args.batch_size,
+    )
+    t0 = time.perf_counter()
+    orgs = generate(scale)
+    print(f"✅ {len(orgs)} org(s) in {time.perf_counter() - t0:.1f} s: {table_counts()}")
+    print(f"  admin@{orgs[0].slug}.example / {scale.password} (ADMIN)")
+
+
 if __name__ == "__main__":
-    main()
+    cli()